@@ -0,0 +1,71 @@
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 2**20
+DEFAULT_MAX_ITEMS = 512
+
+
+class Artifact(NamedTuple):
+    data: bytes
+    mime_type: str
+
+
+class Artifact_Store:
+    """
+    Process-wide in-memory store of rendered artifacts (chart images). Nodes put the bytes here and keep
+    only the returned id in the graph state, so nothing is written to the temp dir. Entries are kept in
+    an LRU bounded by total bytes and count; reading an entry refreshes it. Evicted ids return None.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_items: int = DEFAULT_MAX_ITEMS):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self._entries: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes, mime_type: str) -> str:
+        artifact_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[artifact_id] = Artifact(data, mime_type)
+            self._bytes += len(data)
+            # the newest entry always stays, even when it alone exceeds the budget
+            while len(self._entries) > 1 and (self._bytes > self.max_bytes or len(self._entries) > self.max_items):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.data)
+                self._evictions += 1
+        return artifact_id
+
+    def get(self, artifact_id: str) -> Optional[Artifact]:
+        with self._lock:
+            artifact = self._entries.get(artifact_id)
+            if artifact is not None:
+                self._entries.move_to_end(artifact_id)
+            return artifact
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"items": len(self._entries), "bytes": self._bytes, "evictions": self._evictions}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_default_store: Optional[Artifact_Store] = None
+_default_lock = threading.Lock()
+
+
+def get_artifact_store() -> Artifact_Store:
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = Artifact_Store()
+        return _default_store
@@ -0,0 +1,337 @@
+import os
+import uuid
+import weakref
+import tempfile
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Rows materialized into pandas for prompts, generated EDA code and plotting
+SAMPLE_ROWS = 100_000
+# Rows per Arrow batch when streaming a table through generated pandas code
+BATCH_ROWS = 250_000
+
+_SCANS = {
+    ".csv": "read_csv_auto",
+    ".parquet": "read_parquet",
+    ".json": "read_json_auto",
+    ".jsonl": "read_json_auto",
+    ".ndjson": "read_json_auto",
+}
+_ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+# Input row number carried through map_batches(distinct=True) to restore the original order
+_ROW_ID = "__row_id"
+
+SUPPORTED_EXTENSIONS = tuple(_SCANS) + _ARROW_EXTENSIONS
+
+_NUMERIC_TYPES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "DOUBLE", "REAL", "DECIMAL",
+)
+
+
+def quote_ident(name: Any) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def quote_literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def supports_out_of_core(file_name: str) -> bool:
+    return os.path.splitext(file_name)[1].lower() in SUPPORTED_EXTENSIONS
+
+
+class Out_Of_Core_Table:
+    """
+    Handle to a dataset that stays on disk and is queried through an embedded DuckDB engine.
+
+    Only aggregates and bounded samples are ever materialized into pandas; DuckDB spills to
+    `temp_dir` when an operator (DISTINCT, quantiles, ...) does not fit in `memory_limit`.
+    """
+
+    def __init__(self, path: str, name: Optional[str] = None, memory_limit: str = "4GB",
+                 temp_dir: Optional[str] = ".cache/duckdb"):
+        self.path = os.path.abspath(path)
+        self.name = name or os.path.basename(path)
+        self.memory_limit = memory_limit
+        self.temp_dir = os.path.abspath(temp_dir) if temp_dir else None
+        self.ext = os.path.splitext(self.path)[1].lower()
+        if self.ext not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Out-of-core mode does not support {self.name}")
+        self._columns: Optional[Dict[str, str]] = None
+        self._row_count: Optional[int] = None
+        self._samples: Dict[Tuple[int, int], pd.DataFrame] = {}
+
+    def __repr__(self) -> str:
+        return f"Out_Of_Core_Table({self.name!r}, path={self.path!r})"
+
+    # ---------- connection ----------
+    def _open(self) -> "duckdb.DuckDBPyConnection":
+        config = {"memory_limit": self.memory_limit}
+        if self.temp_dir:
+            os.makedirs(self.temp_dir, exist_ok=True)
+            config["temp_directory"] = self.temp_dir
+        return duckdb.connect(config=config)
+
+    def _connect(self) -> Tuple["duckdb.DuckDBPyConnection", str]:
+        """Open a fresh in-process connection and return it with the FROM clause for this table."""
+        con = self._open()
+        if self.ext in _ARROW_EXTENSIONS:
+            # Arrow IPC files are memory-mapped and scanned in place
+            table = pa.ipc.open_file(pa.memory_map(self.path, "r")).read_all()
+            con.register("source_table", table)
+            return con, "source_table"
+        return con, f"{_SCANS[self.ext]}({quote_literal(self.path)})"
+
+    def _query_df(self, sql: str) -> pd.DataFrame:
+        con, source = self._connect()
+        try:
+            return con.execute(sql.replace("{source}", source)).df()
+        finally:
+            con.close()
+
+    # ---------- metadata ----------
+    @property
+    def columns(self) -> Dict[str, str]:
+        """Column name -> DuckDB type name."""
+        if self._columns is None:
+            described = self._query_df("DESCRIBE SELECT * FROM {source}")
+            self._columns = dict(zip(described["column_name"], described["column_type"]))
+        return self._columns
+
+    def row_count(self) -> int:
+        if self._row_count is None:
+            self._row_count = int(self._query_df("SELECT COUNT(*) AS n FROM {source}")["n"].iloc[0])
+        return self._row_count
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.row_count(), len(self.columns)
+
+    def numeric_columns(self):
+        return [c for c, t in self.columns.items() if t.upper().startswith(_NUMERIC_TYPES)]
+
+    # ---------- materialization ----------
+    def sample(self, n: int = SAMPLE_ROWS, seed: int = 42) -> pd.DataFrame:
+        """Bounded, reproducible reservoir sample of the table as a pandas DataFrame (memoized)."""
+        key = (int(n), int(seed))
+        if key not in self._samples:
+            self._samples[key] = self._query_df(
+                f"SELECT * FROM {{source}} USING SAMPLE reservoir({key[0]} ROWS) REPEATABLE ({key[1]})"
+            )
+        return self._samples[key]
+
+    def iter_batches(self, batch_rows: int = BATCH_ROWS) -> Iterator[pd.DataFrame]:
+        con, source = self._connect()
+        try:
+            reader = con.execute(f"SELECT * FROM {source}").to_arrow_reader(batch_rows)
+            for batch in reader:
+                yield batch.to_pandas()
+        finally:
+            con.close()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Full-table statistics computed in a single pushed-down aggregate query:
+        row/column counts, per-column null counts and numeric min/max/mean/std/quartiles.
+        """
+        aggs = []
+        for i, col in enumerate(self.columns):
+            aggs.append(f"COUNT(*) - COUNT({quote_ident(col)}) AS nulls_{i}")
+        numeric = self.numeric_columns()
+        for i, col in enumerate(numeric):
+            q = quote_ident(col)
+            aggs.append(
+                f"MIN({q}) AS min_{i}, MAX({q}) AS max_{i}, AVG({q}) AS mean_{i}, "
+                f"STDDEV_SAMP({q}) AS std_{i}, APPROX_QUANTILE({q}, [0.25, 0.5, 0.75]) AS q_{i}"
+            )
+        select_list = ", ".join(["COUNT(*) AS row_count"] + aggs)
+        row = self._query_df(f"SELECT {select_list} FROM {{source}}").iloc[0]
+
+        def _num(v):
+            return None if pd.isna(v) else float(v)
+
+        stats = {}
+        for i, col in enumerate(numeric):
+            quartiles = row[f"q_{i}"]
+            quartiles = list(quartiles) if quartiles is not None else [None, None, None]
+            stats[str(col)] = {
+                "min": _num(row[f"min_{i}"]),
+                "25%": _num(quartiles[0]),
+                "50%": _num(quartiles[1]),
+                "75%": _num(quartiles[2]),
+                "max": _num(row[f"max_{i}"]),
+                "mean": _num(row[f"mean_{i}"]),
+                "std": _num(row[f"std_{i}"]),
+            }
+        self._row_count = int(row["row_count"])
+        return {
+            "row_count": self._row_count,
+            "column_count": len(self.columns),
+            "dtypes": {str(c): t for c, t in self.columns.items()},
+            "missing_counts": {str(c): int(row[f"nulls_{i}"]) for i, c in enumerate(self.columns)},
+            "numeric_summary": stats,
+        }
+
+    def cleaning_stats(self) -> Dict[str, Any]:
+        """
+        Table-wide statistics a cleaning function run batch by batch cannot compute from one batch, in the
+        shape of frame_cleaning_stats(): approximate quartiles of every numeric column (for the IQR fences)
+        and the columns that are entirely empty or hold a single distinct value. One streaming query.
+        """
+        aggs = []
+        for i, col in enumerate(self.columns):
+            q = quote_ident(col)
+            aggs.append(f"COALESCE(COUNT({q}) = 0 OR MIN({q}) = MAX({q}), FALSE) AS constant_{i}")
+        numeric = self.numeric_columns()
+        for i, col in enumerate(numeric):
+            aggs.append(f"APPROX_QUANTILE(CAST({quote_ident(col)} AS DOUBLE), [0.25, 0.75]) AS q_{i}")
+        row = self._query_df(f"SELECT {', '.join(aggs)} FROM {{source}}").iloc[0]
+
+        quartiles = {}
+        for i, col in enumerate(numeric):
+            values = row[f"q_{i}"]
+            if values is not None and not any(pd.isna(v) for v in values):
+                quartiles[str(col)] = [float(v) for v in values]
+        return {
+            "quartiles": quartiles,
+            "constant_columns": [str(c) for i, c in enumerate(self.columns) if bool(row[f"constant_{i}"])],
+        }
+
+    # ---------- transformation ----------
+    def _result_dir(self) -> str:
+        return os.path.join(self.temp_dir or tempfile.gettempdir(), "results")
+
+    def map_batches(self, func: Callable[[pd.DataFrame], pd.DataFrame], out_dir: Optional[str] = None,
+                    distinct: bool = False, subset: Optional[List[str]] = None, keep: str = "first",
+                    batch_rows: int = BATCH_ROWS) -> "Out_Of_Core_Table":
+        """
+        Stream the table through `func` one Arrow batch at a time and write the result to Parquet.
+
+        Row-local cleaning (casts, string normalisation, dropping nulls) is exact. With `distinct`,
+        duplicate rows are then removed by DuckDB over the whole output, so de-duplication is global
+        rather than per batch. As in DataFrame.drop_duplicates, rows are compared on `subset` (default:
+        every column) and the first or last occurrence is kept (`keep`), in the original order.
+        Every batch must come back with the column types of the first one (values are never
+        truncated to fit); otherwise a ValueError is raised.
+
+        The output goes to `out_dir` (default: a `results` directory under `temp_dir`, never the
+        source's directory) and belongs to the returned table: the file is removed when that table is
+        garbage-collected or the process exits. Intermediate files are removed on failure too.
+        """
+        if keep not in ("first", "last"):
+            raise ValueError(f"keep must be 'first' or 'last', not {keep!r}")
+        out_dir = os.path.abspath(out_dir or self._result_dir())
+        os.makedirs(out_dir, exist_ok=True)
+        stem = f"{os.path.splitext(os.path.basename(self.path))[0]}.{uuid.uuid4().hex[:8]}"
+        batches_path = os.path.join(out_dir, f"{stem}.batches.parquet")
+        out_path = os.path.join(out_dir, f"{stem}.cleaned.parquet")
+
+        try:
+            columns = self._write_batches(func, batches_path, distinct, batch_rows)
+            if distinct:
+                missing = [c for c in subset or [] if c not in columns]
+                if missing:
+                    raise ValueError(f"De-duplication columns {missing} are not in the output of {self.name}")
+                listed = ", ".join(quote_ident(c) for c in columns)
+                keys = ", ".join(quote_ident(c) for c in subset) if subset else listed
+                source = f"read_parquet({quote_literal(batches_path)})"
+                pick = "MIN" if keep == "first" else "MAX"
+                con = self._open()
+                try:
+                    # semi-join on the kept row ids: a hash aggregate and join, both of which spill
+                    con.execute(
+                        f"COPY (SELECT {listed} FROM {source} WHERE {_ROW_ID} IN "
+                        f"(SELECT {pick}({_ROW_ID}) FROM {source} GROUP BY {keys}) ORDER BY {_ROW_ID}) "
+                        f"TO {quote_literal(out_path)} (FORMAT PARQUET)"
+                    )
+                finally:
+                    con.close()
+            else:
+                os.replace(batches_path, out_path)
+        except BaseException:
+            _remove(out_path)
+            raise
+        finally:
+            _remove(batches_path)
+
+        logger.info("Wrote out-of-core result for %s to %s", self.name, out_path)
+        result = Out_Of_Core_Table(out_path, name=self.name, memory_limit=self.memory_limit,
+                                   temp_dir=self.temp_dir)
+        weakref.finalize(result, _remove, out_path)
+        return result
+
+    def _write_batches(self, func: Callable[[pd.DataFrame], pd.DataFrame], path: str, row_ids: bool,
+                       batch_rows: int) -> List[str]:
+        """Write func(batch) for every batch to `path`; returns the output columns."""
+        writer = None
+        offset = 0
+        try:
+            for number, part in enumerate(self.iter_batches(batch_rows), start=1):
+                result = func(part)
+                if not isinstance(result, pd.DataFrame):
+                    raise ValueError("Batch function did not return a pandas DataFrame")
+                table = pa.Table.from_pandas(result, preserve_index=False)
+                if row_ids:
+                    # output position, so de-duplication can keep first occurrences in order
+                    table = table.append_column(_ROW_ID, pa.array(range(offset, offset + table.num_rows), pa.int64()))
+                    offset += table.num_rows
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                elif not table.schema.equals(writer.schema):
+                    table = self._conform(table, writer.schema, number)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            raise ValueError(f"{self.name} produced no batches")
+        return [name for name in writer.schema.names if name != _ROW_ID]
+
+    def _conform(self, table: pa.Table, schema: pa.Schema, number: int) -> pa.Table:
+        """Cast a batch to the first batch's schema without losing values, or explain the mismatch."""
+        try:
+            # dtype inference can differ between batches (e.g. int64 vs float64 with the same values)
+            return table.cast(schema, safe=True)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError) as e:
+            got = {f.name: str(f.type) for f in table.schema}
+            diff = {f.name: f"{got.get(f.name)} (first batch: {f.type})" for f in schema
+                    if got.get(f.name) != str(f.type)}
+            raise ValueError(
+                f"Batch {number} of {self.name} does not match the columns of the first batch: "
+                f"{diff or got}. The batch function must return the same columns and dtypes for every "
+                f"batch (e.g. cast explicitly instead of relying on inference). {e}"
+            ) from e
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_open_tables: Dict[Tuple[str, float], Out_Of_Core_Table] = {}
+_open_lock = threading.Lock()
+
+
+def open_table(path: str, name: Optional[str] = None) -> Out_Of_Core_Table:
+    """
+    Return a process-wide handle for `path`, so Streamlit reruns reuse its row count and sample
+    instead of rescanning the file. A modified file (new mtime) gets a fresh handle.
+    """
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    with _open_lock:
+        table = _open_tables.get(key)
+        if table is None:
+            table = _open_tables[key] = Out_Of_Core_Table(path, name=name)
+        return table
@@ -0,0 +1,380 @@
+import os
+import time
+import uuid
+import pickle
+import shutil
+import logging
+import builtins
+import tempfile
+import importlib
+import threading
+import traceback
+import contextvars
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_MAX_RSS_BYTES = 2 * 1024 ** 3
+MAX_WORKERS = os.cpu_count() or 2
+# How often a waiting call checks the worker's deadline, memory and cancellation
+POLL_SECONDS = 0.05
+
+
+class SandboxError(RuntimeError):
+    """Generated code could not be run to completion in a worker process."""
+
+
+class SandboxTimeout(SandboxError):
+    pass
+
+
+class SandboxMemoryError(SandboxError):
+    pass
+
+
+class SandboxCancelled(SandboxError):
+    pass
+
+
+class Sandbox_Result(NamedTuple):
+    value: Any
+    compile_seconds: float
+    compiled_cached: bool
+    execute_seconds: float
+
+
+# ---------- cancellation ----------
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "sandbox_cancel_event", default=None)
+
+
+@contextmanager
+def cancel_scope(event: Optional[threading.Event] = None) -> Iterator[threading.Event]:
+    """
+    Make `event` the cancellation signal for sandboxed calls started in this context, including graph
+    nodes (LangGraph copies the context into node threads). Setting it kills the workers still running
+    those calls.
+    """
+    event = event or threading.Event()
+    token = _cancel_event.set(event)
+    try:
+        yield event
+    finally:
+        _cancel_event.reset(token)
+
+
+# ---------- frame transport ----------
+def enable_copy_on_write() -> None:
+    """Turn on pandas copy-on-write where it is optional (pandas < 3; always on from 3.0)."""
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def _transfer_dir(nbytes: int) -> str:
+    # tmpfs on Linux keeps the exchange files in RAM, unless it is too small (e.g. Docker's 64 MB default)
+    # for the input and output frames; otherwise fall back to the temp directory
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK) and shutil.disk_usage(shm).free > 2 * nbytes:
+        return shm
+    return tempfile.gettempdir()
+
+
+def write_frame(df: pd.DataFrame, path: str) -> str:
+    """
+    Write `df` to `path` as an Arrow IPC file. Numeric columns without nulls are wrapped rather than
+    converted, so numpy-backed frames go out as a single batch that the reader maps back without a copy.
+    Chunked (Arrow-backed) columns are written chunk by chunk rather than concatenated first, so the
+    parent never holds a second copy of the frame; the reader restores them as Arrow-backed columns
+    over the mapped chunks. Only columns that need converting (e.g. strings) are copied on the way in.
+    Frames Arrow cannot represent (mixed-type object columns, duplicate column names) fall back to a
+    pickle file. Returns the format.
+    """
+    try:
+        table = pa.Table.from_pandas(df)
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        return "arrow"
+    except (pa.ArrowException, ValueError, TypeError):
+        with open(path, "wb") as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return "pickle"
+
+
+def read_frame(path: str, fmt: str, zero_copy: bool = False) -> pd.DataFrame:
+    """
+    Read a frame written by `write_frame`. With zero_copy, columns Arrow can hand over without
+    conversion stay read-only views of the memory-mapped file; see `_input_view`.
+    """
+    if fmt == "arrow":
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+            return table.to_pandas(split_blocks=True) if zero_copy else table.to_pandas()
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _input_view(source: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copy-on-write view of a zero-copy input frame for the generated code. While `source` is alive the
+    view's columns are shared, so the first write to a column copies just that column instead of
+    failing on the read-only mapping; columns the code only reads are never copied.
+    """
+    return source.copy(deep=False)
+
+
+def _remove(path: Optional[str]) -> None:
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# ---------- worker process ----------
+def _import_ref(ref: str) -> Callable:
+    module, _, attr = ref.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def _worker_main(conn) -> None:
+    from Data_Science_Agent.PYTHON_Data_Analyst.Code_Compiler import code_compiler
+
+    enable_copy_on_write()
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        task_id, task = message
+        try:
+            make_env = _import_ref(task["env"]) if task["env"] else None
+            loaded = code_compiler.load(task["source"], task["name"], make_env, task["env_key"])
+            source = read_frame(task["input"], task["input_format"], zero_copy=True)
+            df = _input_view(source)
+            started = time.perf_counter()
+            if task["runner"]:
+                result = _import_ref(task["runner"])(loaded.func, df, **task["kwargs"])
+            else:
+                result = loaded.func(df)
+            elapsed = time.perf_counter() - started
+            del df, source
+            if task["output"] and isinstance(result, pd.DataFrame):
+                payload = ("frame", write_frame(result, task["output"]))
+            else:
+                payload = ("value", result)
+            conn.send((task_id, "ok", payload, loaded.compile_seconds, loaded.cached, elapsed))
+        except BaseException as e:
+            conn.send((task_id, "error", (type(e).__name__, str(e), traceback.format_exc()), 0.0, False, 0.0))
+
+
+def _rebuild_exception(name: str, message: str, trace: str) -> BaseException:
+    """Re-create builtin exception types so callers keep their except clauses (TypeError, NameError...)."""
+    exc_type = getattr(builtins, name, None)
+    if isinstance(exc_type, type) and issubclass(exc_type, Exception):
+        try:
+            exc = exc_type(message)
+        except Exception:
+            exc = SandboxError(f"{name}: {message}")
+    else:
+        exc = SandboxError(f"{name}: {message}")
+    exc.__cause__ = SandboxError(f"Worker traceback:\n{trace}")
+    return exc
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """
+    Private resident memory of `pid`: RssAnon on Linux, which leaves out the input frame's pages mapped
+    from /dev/shm (RssShmem) and file-backed pages, so reading a large input does not count against the
+    limit while the columns the code copies or builds do. Elsewhere psutil's RSS.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), name="sandbox-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class Sandbox_Executor:
+    """
+    Pool of worker processes that run LLM-generated functions away from the Streamlit server.
+
+    Each call ships the source, the function name and the input frame (as an Arrow IPC file on tmpfs,
+    memory-mapped by the worker) to an idle worker, which compiles the source once into its own LRU and
+    calls the function. The caller polls the worker: past `timeout` seconds, above `max_rss_bytes`
+    private resident memory (see `_rss_bytes`), or when the active cancel scope fires, the worker is killed and replaced.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, timeout: float = DEFAULT_TIMEOUT,
+                 max_rss_bytes: Optional[int] = DEFAULT_MAX_RSS_BYTES, start_method: str = "spawn"):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_rss_bytes = max_rss_bytes
+        self._ctx = mp.get_context(start_method)
+        self._idle: List[_Worker] = []
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+
+    def _checkout(self) -> _Worker:
+        self._slots.acquire()
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+        try:
+            return _Worker(self._ctx)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, worker: _Worker, healthy: bool) -> None:
+        if healthy:
+            with self._lock:
+                self._idle.append(worker)
+        else:
+            worker.kill()
+        self._slots.release()
+
+    def _wait(self, worker: _Worker, task_id: str, timeout: float, max_rss: Optional[int],
+              cancel: Optional[threading.Event]):
+        deadline = time.monotonic() + timeout
+        while True:
+            if worker.conn.poll(POLL_SECONDS):
+                try:
+                    reply = worker.conn.recv()
+                except EOFError:
+                    raise SandboxError(f"Sandbox worker exited (code {worker.process.exitcode})")
+                if reply[0] == task_id:
+                    return reply
+                continue  # stale reply from an abandoned call
+            if not worker.process.is_alive():
+                raise SandboxError(f"Sandbox worker exited (code {worker.process.exitcode})")
+            if cancel is not None and cancel.is_set():
+                raise SandboxCancelled("Generated code was cancelled")
+            if time.monotonic() > deadline:
+                raise SandboxTimeout(f"Generated code exceeded the {timeout:.0f}s time limit")
+            if max_rss:
+                rss = _rss_bytes(worker.process.pid)
+                if rss is not None and rss > max_rss:
+                    raise SandboxMemoryError(
+                        f"Generated code exceeded the memory limit ({rss / 1024 ** 2:.0f} MB > {max_rss / 1024 ** 2:.0f} MB)")
+
+    def run(self, source: str, frame: pd.DataFrame, name: Optional[str] = None, env: Optional[str] = None,
+            env_key: str = "default", runner: Optional[str] = None, return_frame: bool = False,
+            timeout: Optional[float] = None, max_rss_bytes: Optional[int] = None,
+            cancel: Optional[threading.Event] = None, **kwargs: Any) -> Sandbox_Result:
+        """
+        Run function `name` from `source` on `frame` in a worker and return its result.
+
+        env: "module:function" building the globals the source runs in.
+        runner: "module:function" called as runner(func, frame, **kwargs) in the worker instead of func(frame).
+        return_frame: a DataFrame result comes back through an Arrow IPC file rather than the pipe.
+        Exceptions raised by the generated code are re-raised here with their builtin type where possible.
+        """
+        cancel = cancel or _cancel_event.get()
+        if cancel is not None and cancel.is_set():
+            raise SandboxCancelled("Generated code was cancelled")
+        task_id = uuid.uuid4().hex
+        nbytes = int(frame.memory_usage(index=True, deep=False).sum())
+        stem = os.path.join(_transfer_dir(nbytes), f"sandbox-{os.getpid()}-{task_id}")
+        input_path = f"{stem}.in"
+        output_path = f"{stem}.out" if return_frame else None
+        task = {
+            "source": source, "name": name, "env": env, "env_key": env_key, "runner": runner,
+            "kwargs": kwargs, "input": input_path, "output": output_path,
+        }
+        worker = None
+        healthy = False
+        try:
+            task["input_format"] = write_frame(frame, input_path)
+            worker = self._checkout()
+            worker.conn.send((task_id, task))
+            _, status, payload, compile_seconds, cached, elapsed = self._wait(
+                worker, task_id, timeout or self.timeout, max_rss_bytes or self.max_rss_bytes, cancel)
+            healthy = True
+            if status == "error":
+                raise _rebuild_exception(*payload)
+            kind, value = payload
+            if kind == "frame":
+                value = read_frame(output_path, value)
+            return Sandbox_Result(value, compile_seconds, cached, elapsed)
+        finally:
+            if worker is not None:
+                self._checkin(worker, healthy)
+            _remove(input_path)
+            _remove(output_path)
+
+    def map(self, fn: Callable[[T], R], items: Sequence[T]) -> List[R]:
+        """
+        Call `fn` on every item from one dispatch thread per worker and return the results in item order.
+        `fn` is expected to handle its own per-item errors; each call runs in a copy of the caller's
+        context, so the active cancel scope still applies.
+        """
+        if len(items) <= 1 or self.max_workers <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)),
+                                thread_name_prefix="sandbox-dispatch") as pool:
+            futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+            return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+_default_executor: Optional[Sandbox_Executor] = None
+_default_lock = threading.Lock()
+
+
+def get_sandbox_executor() -> Sandbox_Executor:
+    """Process-wide sandbox pool shared by every session."""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = Sandbox_Executor()
+        return _default_executor
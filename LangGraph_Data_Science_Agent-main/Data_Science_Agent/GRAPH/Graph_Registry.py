@@ -0,0 +1,75 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def credentials_fingerprint(*secrets: Optional[str]) -> str:
+    """One-way fingerprint of API keys, so registry keys never hold the secrets themselves."""
+    h = hashlib.sha256()
+    for secret in secrets:
+        h.update((secret or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+class Graph_Registry:
+    """
+    Process-wide store of configured LLM clients and compiled graphs.
+
+    Streamlit reruns the script for every chat message and session; building the graph each time
+    re-instantiates every node (including the profiling report server probe). Entries are keyed by
+    model and credentials fingerprint, built once under a per-key lock and kept in a small LRU.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_build(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._entries:  # built by another session while we waited
+                    return self._entries[key]
+            value = factory()
+            with self._lock:
+                self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+            logger.info("Registered %s", key[0] if isinstance(key, tuple) else key)
+            return value
+
+    def get_llm(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        return self._get_or_build(("llm", key), factory)
+
+    def get_graph(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        return self._get_or_build(("graph", key), factory)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+
+
+_default_registry: Optional[Graph_Registry] = None
+_default_lock = threading.Lock()
+
+
+def get_graph_registry() -> Graph_Registry:
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = Graph_Registry()
+        return _default_registry
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from Data_Science_Agent.STATE.Python_Analyst_State import PythonAnalystState
 
 from Data_Science_Agent.PYTHON_Data_Analyst.Data_Cleaning_Node import Data_Cleaning_Node
@@ -6,47 +8,86 @@ from Data_Science_Agent.PYTHON_Data_Analyst.Python_Profiling_Node import Report
 from Data_Science_Agent.PYTHON_Data_Analyst.RCA_Node import RCA_Node
 from Data_Science_Agent.PYTHON_Data_Analyst.Visual_Node import Visual_Node
 from Data_Science_Agent.PYTHON_Data_Analyst.Output_Node import Output_Node
+from Data_Science_Agent.PYTHON_Data_Analyst.Context_Builder import DEFAULT_TOKEN_BUDGET
 
 from langgraph.graph import START , END , StateGraph
 
 class Graph_Builder:
 
-    def __init__(self,llm,langsmith_client=None):
+    def __init__(self,llm,langsmith_client=None,token_budget: int = DEFAULT_TOKEN_BUDGET,visual_from_eda: bool = False,use_async: bool = False,
+                 max_cleaning_attempts: int = 3,llm_judge: bool = False,reuse_cleaning_code: bool = True,
+                 chunked_eda: Optional[bool] = None,correlation_method: str = "exact",image_format: str = "png"):
+        """
+        visual_from_eda: start the visualization plan right after EDA, in parallel with RCA, instead of
+                         after RCA (the plan then gets no RCA summary).
+        use_async: register the `a*` coroutine variant of every node; the compiled graph must then be
+                   driven with `astream`/`ainvoke`.
+        max_cleaning_attempts: retry budget of the Clean -> Check loop.
+        llm_judge: let the LLM decide borderline results of the rule-based cleaning validator.
+        reuse_cleaning_code: skip cleaning code generation for uploads whose schema fingerprint has a
+                             validated cleaning function on record.
+        chunked_eda: compute the EDA checklist chunk by chunk with mergeable accumulators. None (default)
+                     does so for out-of-core tables only, True for every table, False never.
+        correlation_method: "exact" (default), "sample", "projection" or "auto" for the EDA checklist's
+                            correlated pairs; approximations report an error bound in eda_result.
+        image_format: "png" (default), "webp" or "svg" for rendered charts, kept in memory.
+        """
         self.llm = llm
         self.langsmith_client = langsmith_client
+        self.token_budget = token_budget
+        self.visual_from_eda = visual_from_eda
+        self.use_async = use_async
+        self.max_cleaning_attempts = max_cleaning_attempts
+        self.llm_judge = llm_judge
+        self.reuse_cleaning_code = reuse_cleaning_code
+        self.chunked_eda = chunked_eda
+        self.correlation_method = correlation_method
+        self.image_format = image_format
+
+    def _node(self, node, method: str):
+        return getattr(node, f"a{method}" if self.use_async else method)
 
     def py_graph(self):
         self.graph_builder = StateGraph(PythonAnalystState)
 
-        cleaning_node = Data_Cleaning_Node(self.llm)
-        eda_node = EDA_Node(self.llm)
-        rca_node = RCA_Node(self.llm)
-        visual_node = Visual_Node(self.llm)
-        output_node = Output_Node(self.llm)
+        cleaning_node = Data_Cleaning_Node(self.llm, token_budget=self.token_budget,
+                                           max_cleaning_attempts=self.max_cleaning_attempts, llm_judge=self.llm_judge,
+                                           reuse_cleaning_code=self.reuse_cleaning_code)
+        eda_node = EDA_Node(self.llm, token_budget=self.token_budget, chunked_eda=self.chunked_eda,
+                            correlation_method=self.correlation_method)
+        rca_node = RCA_Node(self.llm, token_budget=self.token_budget)
+        visual_node = Visual_Node(self.llm, token_budget=self.token_budget, image_format=self.image_format)
+        output_node = Output_Node(self.llm, token_budget=self.token_budget)
         report_node = Report(self.llm)
 
-        self.graph_builder.add_node("Clean_Code_Generator", cleaning_node.generate_cleaning_code)
-        self.graph_builder.add_node("Cleaning_Code_Executor", cleaning_node.execute_cleaning_code)
-        self.graph_builder.add_node("Check",cleaning_node.check)
-        self.graph_builder.add_node("EDA_Analysis", eda_node.perform_eda_analysis)
-        self.graph_builder.add_node("EDA_Code_Executor", eda_node.execute_eda_code)
-        self.graph_builder.add_node("RCA_Node", rca_node.rca_node)
-        self.graph_builder.add_node("Visual_Analysis", visual_node.generate_visual_code)
-        self.graph_builder.add_node("Visual_Code_Executor", visual_node.execute_visual_code)
-        self.graph_builder.add_node("Pandas Profiling Report", report_node.pandas_report)
-        self.graph_builder.add_node("Output", output_node.output_parser)
-
-        self.graph_builder.add_edge(START, "Clean_Code_Generator")
+        self.graph_builder.add_node("Cleaning_Cache_Lookup", self._node(cleaning_node, "lookup_cached_cleaning"))
+        self.graph_builder.add_node("Clean_Code_Generator", self._node(cleaning_node, "generate_cleaning_code"))
+        self.graph_builder.add_node("Cleaning_Code_Executor", self._node(cleaning_node, "execute_cleaning_code"))
+        self.graph_builder.add_node("Check", self._node(cleaning_node, "check"))
+        self.graph_builder.add_node("EDA_Analysis", self._node(eda_node, "perform_eda_analysis"))
+        self.graph_builder.add_node("EDA_Code_Executor", self._node(eda_node, "execute_eda_code"))
+        self.graph_builder.add_node("RCA_Node", self._node(rca_node, "rca_node"))
+        self.graph_builder.add_node("Visual_Analysis", self._node(visual_node, "generate_visual_code"))
+        self.graph_builder.add_node("Visual_Code_Executor", self._node(visual_node, "execute_visual_code"))
+        self.graph_builder.add_node("Pandas Profiling Report", self._node(report_node, "pandas_report"))
+        self.graph_builder.add_node("Output", self._node(output_node, "output_parser"))
+
+        self.graph_builder.add_edge(START, "Cleaning_Cache_Lookup")
+        self.graph_builder.add_conditional_edges("Cleaning_Cache_Lookup",cleaning_node.cache_route,{"Hit":"Cleaning_Code_Executor","Miss":"Clean_Code_Generator"})
         self.graph_builder.add_edge(START, "Pandas Profiling Report")
         self.graph_builder.add_edge("Clean_Code_Generator", "Cleaning_Code_Executor")
         self.graph_builder.add_edge("Cleaning_Code_Executor", "Check")
         self.graph_builder.add_conditional_edges("Check",cleaning_node.next_route,{"Valid":"EDA_Analysis","Reject":"Clean_Code_Generator"})
         self.graph_builder.add_edge("EDA_Analysis", "EDA_Code_Executor")
         self.graph_builder.add_edge("EDA_Code_Executor", "RCA_Node")
-        self.graph_builder.add_edge("RCA_Node", "Visual_Analysis")
+        # The final summary only needs EDA + RCA, so it runs concurrently with the visualization branch
+        self.graph_builder.add_edge("RCA_Node", "Output")
+        if self.visual_from_eda:
+            self.graph_builder.add_edge("EDA_Code_Executor", "Visual_Analysis")
+        else:
+            self.graph_builder.add_edge("RCA_Node", "Visual_Analysis")
         self.graph_builder.add_edge("Visual_Analysis", "Visual_Code_Executor")
-        self.graph_builder.add_edge("Visual_Code_Executor", "Output")
-        self.graph_builder.add_edge("Output", END)
+        self.graph_builder.add_edge(["Output", "Visual_Code_Executor"], END)
         self.graph_builder.add_edge("Pandas Profiling Report", END)
 
     def setup_graph(self,usecase : str):
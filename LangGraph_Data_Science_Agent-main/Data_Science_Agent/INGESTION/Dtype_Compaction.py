@@ -0,0 +1,99 @@
+import logging
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A string column becomes categorical when its distinct values are at most this share of its rows
+CATEGORY_RATIO = 0.5
+
+
+def _arrow_string_dtype():
+    """Arrow strings with NaN for missing values, like object/str columns (pandas >= 2.3); else None."""
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except (TypeError, ImportError):
+        return None
+
+
+# pd.StringDtype("pyarrow") alone would turn missing values into pd.NA under the generated code
+ARROW_STRING_DTYPE = _arrow_string_dtype()
+
+
+def format_bytes(n: int) -> str:
+    value = float(n)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def _compact_strings(s: pd.Series, category_ratio: float) -> pd.Series:
+    if pd.api.types.infer_dtype(s, skipna=True) != "string":
+        return s  # mixed objects (lists, dicts, numbers) are left alone
+    non_null = s.count()
+    if non_null and s.nunique(dropna=True) <= category_ratio * non_null:
+        return s.astype("category")
+    if ARROW_STRING_DTYPE is None or s.dtype == ARROW_STRING_DTYPE:
+        return s
+    return s.astype(ARROW_STRING_DTYPE)
+
+
+def _compact_numbers(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_integer_dtype(s.dtype):
+        kind = "unsigned" if s.min() >= 0 else "integer"
+        return pd.to_numeric(s, downcast=kind)
+    if s.dtype == np.float64:
+        # Only downcast when float32 round-trips every value exactly
+        as32 = s.astype(np.float32)
+        if ((as32.astype(np.float64) == s) | s.isna()).all():
+            return as32
+    return s
+
+
+def compact_dtypes(df: pd.DataFrame, category_ratio: float = CATEGORY_RATIO) -> Tuple[pd.DataFrame, int]:
+    """
+    Shrink a freshly parsed frame: low-cardinality strings become categoricals, other strings use the
+    Arrow string dtype (missing values stay NaN), integers are downcast and float64 becomes float32
+    where lossless. Arrow-backed columns are already compact and are not touched. Categoricals reject
+    values outside their categories, so cleaning expands them again (see `expand_categoricals`).
+    Returns (frame, bytes_saved).
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    compacted = df.copy(deep=False)
+    for i, (col, s) in enumerate(df.items()):
+        try:
+            if isinstance(s.dtype, (pd.ArrowDtype, pd.CategoricalDtype)) or pd.api.types.is_bool_dtype(s.dtype):
+                continue
+            if s.dtype == object or isinstance(s.dtype, pd.StringDtype):
+                new = _compact_strings(s, category_ratio)
+            elif pd.api.types.is_numeric_dtype(s.dtype) and not s.empty:
+                new = _compact_numbers(s)
+            else:
+                continue
+        except Exception as e:
+            logger.warning("Could not compact column %r: %s", col, e)
+            continue
+        if new is not s:
+            compacted.isetitem(i, new)
+    after = int(compacted.memory_usage(deep=True).sum())
+    return compacted, before - after
+
+
+def expand_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Undo the categorical compaction for code that may write new values (fillna("Unknown"), assigning
+    labels): categorical columns go back to the dtype of their categories, NaN for missing values.
+    Other columns are shared, not copied.
+    """
+    positions = [i for i, t in enumerate(df.dtypes) if isinstance(t, pd.CategoricalDtype)]
+    if not positions:
+        return df
+    expanded = df.copy(deep=False)
+    for i in positions:
+        s = df.iloc[:, i]
+        expanded.isetitem(i, s.astype(s.cat.categories.dtype))
+    return expanded
@@ -0,0 +1,77 @@
+import io
+import os
+from functools import partial
+from typing import Callable, Dict, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# File extension -> pandas reader for row-oriented formats. Every reader receives a binary file-like object.
+READERS: Dict[str, Callable[..., pd.DataFrame]] = {
+    ".csv": pd.read_csv,
+    ".xlsx": pd.read_excel,
+    ".json": pd.read_json,
+    ".jsonl": partial(pd.read_json, lines=True),
+    ".ndjson": partial(pd.read_json, lines=True),
+}
+
+# Columnar formats are read through pyarrow and kept Arrow-backed (no copy into numpy/object arrays)
+COLUMNAR_EXTENSIONS = (".parquet", ".feather", ".arrow", ".ipc")
+
+SUPPORTED_EXTENSIONS = tuple(READERS) + COLUMNAR_EXTENSIONS
+
+
+def get_extension(file_name: str) -> str:
+    """Return the lower-cased extension of an uploaded file name (e.g. '.csv')."""
+    return os.path.splitext(file_name)[1].lower()
+
+
+def is_supported(file_name: str) -> bool:
+    return get_extension(file_name) in SUPPORTED_EXTENSIONS
+
+
+def is_columnar(file_name: str) -> bool:
+    return get_extension(file_name) in COLUMNAR_EXTENSIONS
+
+
+def read_uploaded_bytes(file_name: str, data: Union[bytes, memoryview]) -> pd.DataFrame:
+    """Parse the raw bytes of an uploaded file with the reader registered for its extension."""
+    if is_columnar(file_name):
+        return arrow_to_pandas(read_arrow_table(file_name, data))
+    ext = get_extension(file_name)
+    reader = READERS.get(ext)
+    if reader is None:
+        raise ValueError(f"Unsupported file format: {file_name}")
+    return reader(io.BytesIO(data))
+
+
+def read_arrow_table(file_name: str, data: Union[bytes, memoryview]) -> pa.Table:
+    """Read a Parquet or Arrow IPC (Feather v2, file or stream layout) upload into an Arrow table."""
+    # py_buffer wraps the upload bytes without copying them
+    buf = pa.BufferReader(pa.py_buffer(data))
+    if get_extension(file_name) == ".parquet":
+        return pq.read_table(buf)
+    try:
+        return pa.ipc.open_file(buf).read_all()
+    except pa.ArrowInvalid:
+        buf.seek(0)
+        return pa.ipc.open_stream(buf).read_all()
+
+
+def arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Wrap an Arrow table as a DataFrame of ArrowDtype columns; the Arrow buffers are shared, not copied."""
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def write_ipc_file(table: pa.Table, path: str) -> None:
+    """Write an uncompressed Arrow IPC file so it can later be memory-mapped."""
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_mapped_ipc(path: str) -> pd.DataFrame:
+    """Memory-map an Arrow IPC file; column buffers point into the mapping instead of the Python heap."""
+    source = pa.memory_map(path, "r")
+    return arrow_to_pandas(pa.ipc.open_file(source).read_all())
@@ -0,0 +1,288 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import pandas as pd
+
+from Data_Science_Agent.INGESTION.Dtype_Compaction import compact_dtypes
+from Data_Science_Agent.INGESTION.File_Readers import (
+    arrow_to_pandas,
+    get_extension,
+    is_columnar,
+    read_arrow_table,
+    read_mapped_ipc,
+    read_uploaded_bytes,
+    write_ipc_file,
+)
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK = 8 * 1024 * 1024
+# Upload identities remembered with their content key, so reruns skip hashing the bytes
+_MAX_IDENTITIES = 4096
+
+
+def upload_buffer(file: Any) -> memoryview:
+    """Return the bytes of a Streamlit UploadedFile (or any file-like) without copying when possible."""
+    if hasattr(file, "getbuffer"):
+        return file.getbuffer()
+    if hasattr(file, "getvalue"):
+        return memoryview(file.getvalue())
+    file.seek(0)
+    return memoryview(file.read())
+
+
+def upload_identity(file: Any) -> Optional[Tuple[str, int, Any]]:
+    """
+    Cheap identity of an upload: (name, size, file_id) for Streamlit uploads, (path, size, mtime) for
+    files opened from disk, or None when only the content can identify it.
+    """
+    name = getattr(file, "name", None)
+    if name is None:
+        return None
+    file_id = getattr(file, "file_id", None)
+    if file_id and getattr(file, "size", None) is not None:
+        return str(name), int(file.size), file_id
+    try:
+        info = os.stat(name)
+    except (OSError, TypeError, ValueError):
+        return None
+    return os.path.abspath(name), info.st_size, info.st_mtime_ns
+
+
+def fingerprint_bytes(data: memoryview) -> str:
+    """Content hash of the uploaded bytes; identical uploads map to the same key whatever their name."""
+    h = hashlib.blake2b(digest_size=20)
+    for start in range(0, len(data), _HASH_CHUNK):
+        h.update(data[start:start + _HASH_CHUNK])
+    return h.hexdigest()
+
+
+class Ingestion_Cache:
+    """
+    Parse-once cache for uploaded files.
+
+    Frames are keyed by a fingerprint of the uploaded bytes plus the file extension, kept in an
+    in-process LRU bounded by total frame memory, and spilled to Parquet under `spill_dir` so a
+    restarted server can skip the parse as well. The bytes are hashed once per upload: reruns find
+    the key from the upload's identity (name, size and Streamlit file_id or mtime). Parquet and Arrow uploads are instead stored once as
+    an uncompressed Arrow IPC file and memory-mapped, so their frames stay Arrow-backed and off-heap.
+    """
+
+    def __init__(self, max_bytes: int = 4 * 1024 ** 3, spill_dir: Optional[str] = ".cache/ingestion",
+                 max_spill_bytes: int = 20 * 1024 ** 3):
+        self.max_bytes = max_bytes
+        self.max_spill_bytes = max_spill_bytes
+        self.spill_dir = os.path.abspath(spill_dir) if spill_dir else None
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+        self._frames: "OrderedDict[str, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._keys: "OrderedDict[Tuple[str, int, Any], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, outcome: str) -> None:
+        # loads run concurrently on the ingestion thread pool
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    # ---------- in-memory LRU ----------
+    def _get(self, key: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            item = self._frames.get(key)
+            if item is None:
+                return None
+            self._frames.move_to_end(key)
+            return item[0]
+
+    def _put(self, key: str, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if key in self._frames:
+                self._total_bytes -= self._frames.pop(key)[1]
+            if size > self.max_bytes:
+                logger.info("Frame %s (%d bytes) exceeds in-memory cache limit; not cached", key, size)
+                return
+            self._frames[key] = (df, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and self._frames:
+                evicted_key, (_, evicted_size) = self._frames.popitem(last=False)
+                self._total_bytes -= evicted_size
+                logger.info("Evicted %s from ingestion cache (%d bytes)", evicted_key, evicted_size)
+
+    # ---------- Parquet spill ----------
+    def _spill_path(self, key: str, suffix: str = ".parquet") -> Optional[str]:
+        return os.path.join(self.spill_dir, f"{key}{suffix}") if self.spill_dir else None
+
+    def _read_spill(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._spill_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)  # keep spill eviction LRU by access time
+            return df
+        except Exception as e:
+            logger.warning("Failed to read spilled frame %s: %s", path, e)
+            return None
+
+    def _write_spill(self, key: str, df: pd.DataFrame) -> None:
+        path = self._spill_path(key)
+        if not path:
+            return
+        tmp_path = path + ".tmp"
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # Non-string column names, mixed object columns etc. cannot always be stored as Parquet
+            logger.warning("Could not spill %s to Parquet: %s", key, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict_spill(keep=path)
+
+    # ---------- memory-mapped Arrow ----------
+    def _ensure_arrow_file(self, key: str, file_name: str, data: memoryview) -> str:
+        """Write a columnar upload once as an uncompressed Arrow IPC file and return its path."""
+        path = self._spill_path(key, ".arrow")
+        if os.path.exists(path):
+            self._count("hits")
+            os.utime(path)
+            return path
+        self._count("misses")
+        tmp_path = path + ".tmp"
+        try:
+            write_ipc_file(read_arrow_table(file_name, data), tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._evict_spill(keep=path)
+        return path
+
+    def _load_columnar(self, key: str, file_name: str, data: memoryview) -> pd.DataFrame:
+        if not self.spill_dir:
+            self._count("misses")
+            return arrow_to_pandas(read_arrow_table(file_name, data))
+        try:
+            path = self._ensure_arrow_file(key, file_name, data)
+        except Exception as e:
+            logger.warning("Could not write Arrow file for %s: %s", key, e)
+            return arrow_to_pandas(read_arrow_table(file_name, data))
+        return read_mapped_ipc(path)
+
+    def _evict_spill(self, keep: Optional[str] = None) -> None:
+        entries = []
+        total = 0
+        for name in os.listdir(self.spill_dir):
+            p = os.path.join(self.spill_dir, name)
+            if os.path.isfile(p) and not name.endswith(".tmp"):
+                info = os.stat(p)
+                total += info.st_size
+                if p != keep:
+                    entries.append((info.st_mtime, info.st_size, p))
+        for _, size, p in sorted(entries):
+            if total <= self.max_spill_bytes:
+                break
+            try:
+                os.remove(p)
+                total -= size
+            except OSError:
+                pass
+
+    # ---------- public API ----------
+    def cache_key(self, file_name: str, data: memoryview) -> str:
+        return f"{fingerprint_bytes(data)}{get_extension(file_name).replace('.', '-')}"
+
+    def upload_key(self, file: Any) -> str:
+        """cache_key of an upload, hashing its bytes only the first time this upload is seen."""
+        identity = upload_identity(file)
+        if identity is not None:
+            with self._lock:
+                key = self._keys.get(identity)
+                if key is not None:
+                    self._keys.move_to_end(identity)
+                    return key
+        key = self.cache_key(file.name, upload_buffer(file))
+        if identity is not None:
+            with self._lock:
+                self._keys[identity] = key
+                while len(self._keys) > _MAX_IDENTITIES:
+                    self._keys.popitem(last=False)
+        return key
+
+    def source_path(self, file: Any) -> str:
+        """
+        Persist an upload under the spill directory without parsing it and return the file path, for
+        engines that scan the file themselves. Columnar uploads are stored as Arrow IPC.
+        """
+        if not self.spill_dir:
+            raise ValueError("Ingestion cache has no spill directory to store sources in")
+        key = self.upload_key(file)
+        if is_columnar(file.name):
+            return self._ensure_arrow_file(key, file.name, upload_buffer(file))
+        path = self._spill_path(key, ".source" + get_extension(file.name))
+        if not os.path.exists(path):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as out:
+                out.write(upload_buffer(file))
+            os.replace(tmp_path, path)
+            self._evict_spill(keep=path)
+        return path
+
+    def load(self, file: Any, compact: bool = False) -> pd.DataFrame:
+        """
+        Return the parsed DataFrame for an uploaded file, parsing it only on a cache miss.
+
+        With `compact`, row-format uploads go through the dtype compaction pass once and the bytes it
+        saved are recorded in `df.attrs["compaction_saved_bytes"]` (kept in the Parquet spill too).
+        """
+        key = self.upload_key(file)
+        if compact and not is_columnar(file.name):
+            key += "-compact"
+
+        df = self._get(key)
+        if df is not None:
+            self._count("hits")
+            return df
+
+        if is_columnar(file.name):
+            df = self._load_columnar(key, file.name, upload_buffer(file))
+            self._put(key, df)
+            return df
+
+        df = self._read_spill(key)
+        if df is not None:
+            self._count("hits")
+            logger.info("Loaded %s from Parquet spill", file.name)
+            self._put(key, df)
+            return df
+
+        self._count("misses")
+        df = read_uploaded_bytes(file.name, upload_buffer(file))
+        if compact and not is_columnar(file.name):
+            df, saved = compact_dtypes(df)
+            df.attrs["compaction_saved_bytes"] = saved
+        self._put(key, df)
+        if not df.empty and len(df.columns) > 0:
+            self._write_spill(key, df)
+        return df
+
+
+_default_cache: Optional[Ingestion_Cache] = None
+_default_lock = threading.Lock()
+
+
+def get_ingestion_cache() -> Ingestion_Cache:
+    """Process-wide cache shared by every Streamlit session and rerun."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = Ingestion_Cache()
+        return _default_cache
@@ -0,0 +1,391 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Defaults sized for free-tier Gemini/Groq keys; raise them for paid quotas
+REQUESTS_PER_MINUTE = 30
+TOKENS_PER_MINUTE = 200_000
+MAX_IN_FLIGHT = 4
+MAX_RETRIES = 5
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+# Output tokens charged up front per call; corrected from usage metadata afterwards
+EXPECTED_OUTPUT_TOKENS = 1024
+
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_TRANSIENT_NAMES = (
+    "RateLimit", "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "APIConnectionError", "APITimeoutError", "Timeout", "ConnectionError",
+)
+_TRANSIENT_MESSAGES = ("429", "rate limit", "resource exhausted", "quota", "overloaded", "temporarily unavailable")
+
+_run_counts: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "llm_governor_run_counts", default=None)
+
+
+@contextmanager
+def count_governor_calls(counts: Optional[Dict[str, float]] = None) -> Iterator[Dict[str, float]]:
+    """
+    Count the governed calls, their queue wait and retries made in this context (graph nodes included,
+    LangGraph copies the context into node threads), apart from other sessions and models sharing the
+    process-wide governors. Pass the yielded dict to re-enter the same count from another thread.
+    """
+    counts = counts if counts is not None else {"calls": 0, "queue_wait_seconds": 0.0, "retries": 0, "throttled": 0}
+    token = _run_counts.set(counts)
+    try:
+        yield counts
+    finally:
+        _run_counts.reset(token)
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(exc, attr, None)
+        value = getattr(value, "value", value)  # HTTPStatus / grpc enums
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Rate limits, timeouts and 5xx responses are worth retrying; everything else fails fast."""
+    code = _status_code(exc)
+    if code is not None:
+        return code in TRANSIENT_STATUS_CODES
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    if any(name in type(exc).__name__ for name in _TRANSIENT_NAMES):
+        return True
+    message = str(exc).lower()
+    return any(marker in message for marker in _TRANSIENT_MESSAGES)
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Server-requested delay from a Retry-After header, if the error carries one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class Token_Bucket:
+    """
+    Thread-safe token bucket refilled at `per_minute / 60` tokens per second.
+
+    `reserve` always succeeds and returns how long the caller must wait before spending the tokens; the
+    bucket may go negative, so callers are served in arrival order without polling.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity or per_minute)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        with self._lock:
+            self._refill()
+            self._tokens -= min(amount, self.capacity)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Charge tokens after the fact (e.g. actual usage above the estimate) without waiting."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+
+class LLM_Governor:
+    """
+    Shared admission control for one provider/model: request and token buckets, a cap on in-flight
+    calls and jittered exponential retry on transient errors. One instance is shared by every Streamlit
+    session (see `get_llm_governor`), so limits hold for the whole process.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: Optional[float] = TOKENS_PER_MINUTE, max_in_flight: int = MAX_IN_FLIGHT,
+                 max_retries: int = MAX_RETRIES, base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.requests = Token_Bucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = Token_Bucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0, "in_flight": 0,
+                       "queue_wait_seconds": 0.0, "max_queue_wait_seconds": 0.0}
+
+    # ---------- metrics ----------
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+            run = _run_counts.get()
+            if run is not None and key in run:
+                run[key] += amount
+
+    def _record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["queue_wait_seconds"] += seconds
+            self._stats["max_queue_wait_seconds"] = max(self._stats["max_queue_wait_seconds"], seconds)
+            run = _run_counts.get()
+            if run is not None:
+                run["calls"] += 1
+                run["queue_wait_seconds"] += seconds
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._stats)
+
+    # ---------- admission ----------
+    def _bucket_delay(self, tokens: int) -> float:
+        delay = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        return delay
+
+    def acquire(self, tokens: int) -> float:
+        """Block until a slot and rate budget are available; returns the time spent queued."""
+        start = time.monotonic()
+        self._slots.acquire()
+        try:
+            delay = self._bucket_delay(tokens)
+            if delay > 0:
+                self.sleep(delay)
+        except BaseException:
+            self._slots.release()
+            raise
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        self._count("in_flight")
+        return waited
+
+    async def aacquire(self, tokens: int) -> float:
+        start = time.monotonic()
+        # The semaphore is shared with sync callers in other threads, so poll instead of blocking the loop
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        try:
+            delay = self._bucket_delay(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._slots.release()  # cancelled while queued
+            raise
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        self._count("in_flight")
+        return waited
+
+    def release(self, tokens_charged: int = 0, tokens_used: Optional[int] = None) -> None:
+        self._count("in_flight", -1)
+        self._slots.release()
+        if self.tokens and tokens_used is not None and tokens_used > tokens_charged:
+            self.tokens.consume(tokens_used - tokens_charged)
+
+    # ---------- retry ----------
+    def backoff(self, attempt: int, exc: BaseException) -> Optional[float]:
+        """Delay before retry number `attempt` (0-based), or None when the error should be raised."""
+        if attempt >= self.max_retries or not is_transient(exc):
+            self._count("failures")
+            return None
+        if _status_code(exc) == 429 or "429" in str(exc):
+            self._count("throttled")
+        self._count("retries")
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))  # full jitter
+        server_delay = retry_after(exc)
+        if server_delay is not None:
+            delay = max(delay, min(server_delay, self.max_delay))
+        logger.warning("Transient LLM error (%s), retry %d/%d in %.1fs", exc, attempt + 1, self.max_retries, delay)
+        return delay
+
+    def call(self, fn: Callable[[], T], tokens: int, usage: Callable[[T], Optional[int]] = lambda r: None) -> T:
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            used = None
+            try:
+                result = fn()
+                used = usage(result)
+                return result
+            except Exception as e:
+                delay = self.backoff(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                self.release(tokens, used)
+            self.sleep(delay)
+            attempt += 1
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], tokens: int,
+                    usage: Callable[[T], Optional[int]] = lambda r: None) -> T:
+        attempt = 0
+        while True:
+            await self.aacquire(tokens)
+            used = None
+            try:
+                result = await fn()
+                used = usage(result)
+                return result
+            except Exception as e:
+                delay = self.backoff(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                self.release(tokens, used)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def estimate_request_tokens(messages: List[BaseMessage], expected_output: int = EXPECTED_OUTPUT_TOKENS) -> int:
+    chars = sum(len(m.content) if isinstance(m.content, str) else len(str(m.content)) for m in messages)
+    return chars // 4 + 1 + expected_output
+
+
+def _result_tokens(result: ChatResult) -> Optional[int]:
+    for generation in result.generations:
+        usage = getattr(generation.message, "usage_metadata", None)
+        if usage:
+            return usage.get("total_tokens")
+    return None
+
+
+class Governed_Chat_Model(BaseChatModel):
+    """
+    Chat model wrapper that routes every call of `inner` through an `LLM_Governor`.
+
+    Response caching belongs on this wrapper (not on `inner`) so cache hits skip rate limiting.
+    Streams are retried only if they fail before the first chunk.
+    """
+
+    inner: BaseChatModel
+    governor: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return f"governed-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        # Some providers (e.g. Groq) leave the model out of their params; the response cache key needs it
+        model = getattr(self.inner, "model_name", None) or getattr(self.inner, "model", None)
+        return {"model": model, **self.inner._identifying_params}
+
+    def bind_tools(self, tools, **kwargs):
+        # Let the provider format tools, then bind the resulting kwargs to this wrapper
+        return self.bind(**self.inner.bind_tools(tools, **kwargs).kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None,
+                  **kwargs: Any) -> ChatResult:
+        return self.governor.call(
+            lambda: self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            estimate_request_tokens(messages), _result_tokens,
+        )
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None,
+                         **kwargs: Any) -> ChatResult:
+        return await self.governor.acall(
+            lambda: self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            estimate_request_tokens(messages), _result_tokens,
+        )
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        tokens = estimate_request_tokens(messages)
+        attempt = 0
+        while True:
+            self.governor.acquire(tokens)
+            started, used = False, None
+            try:
+                for chunk in self.inner._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    started = True
+                    usage = getattr(chunk.message, "usage_metadata", None)
+                    used = usage.get("total_tokens") if usage else used
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self.governor.backoff(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                self.governor.release(tokens, used)
+            self.governor.sleep(delay)
+            attempt += 1
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = estimate_request_tokens(messages)
+        attempt = 0
+        while True:
+            await self.governor.aacquire(tokens)
+            started, used = False, None
+            try:
+                async for chunk in self.inner._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    started = True
+                    usage = getattr(chunk.message, "usage_metadata", None)
+                    used = usage.get("total_tokens") if usage else used
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self.governor.backoff(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                self.governor.release(tokens, used)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+_governors: Dict[str, LLM_Governor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_llm_governor(name: str, **limits: Any) -> LLM_Governor:
+    """Process-wide governor for `name` (e.g. "gemini:gemini-2.5-flash"); `limits` apply on first use only."""
+    with _governors_lock:
+        governor = _governors.get(name)
+        if governor is None:
+            governor = _governors[name] = LLM_Governor(**limits)
+        return governor
+
+
+def governor_stats() -> Dict[str, float]:
+    """Metrics summed over every governor in the process (see `count_governor_calls` for one run's)."""
+    total: Dict[str, float] = {}
+    with _governors_lock:
+        governors = list(_governors.values())
+    for governor in governors:
+        for key, value in governor.stats().items():
+            if key == "max_queue_wait_seconds":
+                total[key] = max(total.get(key, 0.0), value)
+            else:
+                total[key] = total.get(key, 0) + value
+    return total
@@ -0,0 +1,193 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import warnings
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("response_cache_bypass", default=False)
+_call_counts: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    "response_cache_call_counts", default=None)
+
+
+@contextmanager
+def bypass_response_cache(active: bool = True) -> Iterator[None]:
+    """
+    LLM calls made in this context (when `active`) neither read nor write the response cache. Retries
+    after a rejected response use it: the same prompt would otherwise get the rejected answer back.
+    """
+    token = _bypass.set(active or _bypass.get())
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+@contextmanager
+def count_cache_calls(counts: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, int]]:
+    """
+    Count the cache hits, misses and bypassed calls of LLM calls made in this context (graph nodes
+    included, LangGraph copies the context into node threads), apart from other sessions sharing the
+    process-wide cache. Pass the yielded dict to re-enter the same count from another thread.
+    """
+    counts = counts if counts is not None else {"hits": 0, "misses": 0, "bypassed": 0}
+    token = _call_counts.set(counts)
+    try:
+        yield counts
+    finally:
+        _call_counts.reset(token)
+
+
+class SQLite_Response_Cache(BaseCache):
+    """
+    Disk-backed LangChain LLM cache stored in SQLite.
+
+    Entries are keyed by a hash of LangChain's `llm_string` (model name plus sampling params and
+    bound tools) and the prompt. Entries older than `ttl_seconds` are ignored and removed; when the
+    stored payload exceeds `max_bytes` or `max_entries`, least recently used entries are evicted.
+    Calls inside `bypass_response_cache()` skip the cache entirely.
+    """
+
+    def __init__(self, path: str = ".cache/llm_responses.sqlite", ttl_seconds: Optional[float] = 7 * 24 * 3600,
+                 max_bytes: int = 256 * 1024 ** 2, max_entries: int = 50_000):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT, payload TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A short-lived connection per call keeps the cache usable from any Streamlit/LangGraph thread
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        h = hashlib.sha256()
+        h.update(llm_string.encode("utf-8"))
+        h.update(b"\0")
+        h.update(prompt.encode("utf-8"))
+        return h.hexdigest()
+
+    @staticmethod
+    def _model_name(llm_string: str) -> str:
+        for marker in ("'model': '", "'model_name': '", '"model": "', '"model_name": "', "('model', '"):
+            start = llm_string.find(marker)
+            if start >= 0:
+                start += len(marker)
+                return llm_string[start:llm_string.find(llm_string[start - 1], start)]
+        return ""
+
+    def _count(self, outcome: str) -> None:
+        # callers hold self._lock
+        if outcome != "bypassed":
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        counts = _call_counts.get()
+        if counts is not None:
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if _bypass.get():
+            with self._lock:
+                self._count("bypassed")
+            return None
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock, self._connect() as con:
+            row = con.execute("SELECT payload, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                con.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._count("misses")
+                return None
+            con.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._count("hits")
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                return loads(row[0], allowed_objects="core")
+        except Exception as e:
+            logger.warning("Discarding unreadable cache entry %s: %s", key[:12], e)
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if _bypass.get():
+            return
+        try:
+            payload = dumps(list(return_val))
+        except Exception as e:
+            logger.warning("Response not cacheable: %s", e)
+            return
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock, self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO responses (key, model, payload, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self._model_name(llm_string), payload, len(payload), now, now),
+            )
+            self._evict(con, now)
+
+    def _evict(self, con: sqlite3.Connection, now: float) -> None:
+        if self.ttl_seconds is not None:
+            con.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        count, total = con.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk from least recently used, dropping rows until both limits hold
+        drop = []
+        for key, size in con.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            drop.append((key,))
+            count -= 1
+            total -= size
+        con.executemany("DELETE FROM responses WHERE key = ?", drop)
+        logger.info("Evicted %d cached LLM responses", len(drop))
+
+    def clear(self, **kwargs) -> None:
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        """Process-wide totals across every session; use `count_cache_calls` for a single run."""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_default_cache: Optional[SQLite_Response_Cache] = None
+_default_lock = threading.Lock()
+
+
+def get_response_cache() -> SQLite_Response_Cache:
+    """Process-wide response cache in the working directory, shared by every LLM wrapper."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SQLite_Response_Cache()
+        return _default_cache
@@ -1,5 +1,7 @@
 import os
 import streamlit as st
+from Data_Science_Agent.LLM.Response_Cache import get_response_cache
+from Data_Science_Agent.LLM.Rate_Limiter import Governed_Chat_Model, get_llm_governor
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 class GeminiLLM:
@@ -13,7 +15,11 @@ class GeminiLLM:
             if gemini_api_key=='' and os.environ["GOOGLE_API_KEY"] =='':
                 st.error("Please Enter the Groq API KEY")
 
-            llm=ChatGoogleGenerativeAI(api_key=gemini_api_key,model=select_gemini_model)
+            # Disk-backed response cache unless the user opted out in the sidebar
+            cache=get_response_cache() if self.user_controls_input.get("use_response_cache", True) else None
+            # Retries are owned by the governor, which also enforces the shared rate and concurrency limits
+            inner=ChatGoogleGenerativeAI(api_key=gemini_api_key,model=select_gemini_model,max_retries=0)
+            llm=Governed_Chat_Model(inner=inner,governor=get_llm_governor(f"gemini:{select_gemini_model}"),cache=cache)
 
         except Exception as e:
             raise ValueError(f"Error Ocuured With Exception : {e}")
@@ -1,5 +1,7 @@
 import os
 import streamlit as st
+from Data_Science_Agent.LLM.Response_Cache import get_response_cache
+from Data_Science_Agent.LLM.Rate_Limiter import Governed_Chat_Model, get_llm_governor
 from langchain_groq import ChatGroq
 
 class GroqLLM:
@@ -13,7 +15,11 @@ class GroqLLM:
             if groq_api_key=='' and os.environ["GROQ_API_KEY"] =='':
                 st.error("Please Enter the Groq API KEY")
 
-            llm=ChatGroq(api_key=groq_api_key,model=selected_groq_model)
+            # Disk-backed response cache unless the user opted out in the sidebar
+            cache=get_response_cache() if self.user_controls_input.get("use_response_cache", True) else None
+            # Retries are owned by the governor, which also enforces the shared rate and concurrency limits
+            inner=ChatGroq(api_key=groq_api_key,model=selected_groq_model,max_retries=0)
+            llm=Governed_Chat_Model(inner=inner,governor=get_llm_governor(f"groq:{selected_groq_model}"),cache=cache)
 
         except Exception as e:
             raise ValueError(f"Error Ocuured With Exception : {e}")
@@ -0,0 +1,112 @@
+import ast
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+# Methods that summarize a whole column or frame: called inside clean_data on an out-of-core batch, they
+# would only see that batch (per-batch IQR fences, per-batch constant columns, ...)
+TABLE_AGGREGATES = {
+    "quantile", "percentile", "nanpercentile", "nanquantile", "describe", "median", "mean", "std", "var",
+    "min", "max", "sum", "count", "all", "any", "mode", "nunique", "unique", "value_counts", "duplicated",
+}
+_KEEP = ("first", "last")
+
+
+class Batch_Plan(NamedTuple):
+    """How a cleaning function is applied to an out-of-core table batch by batch."""
+    dedup: bool                   # the function drops duplicate rows, so DuckDB redoes it over the whole output
+    subset: Optional[List[str]]   # drop_duplicates(subset=...), None for every column
+    keep: str                     # drop_duplicates(keep=...): "first" or "last"
+
+
+def _not_batch_safe(node: ast.AST, reason: str) -> ValueError:
+    return ValueError(
+        f"Cleaning function is not batch-safe (line {getattr(node, 'lineno', '?')}): {reason}. On an out-of-core "
+        f"table it runs on one batch at a time."
+    )
+
+
+def _selects_columns(node: ast.AST) -> bool:
+    """df["x"] or df[["x", "y"]]: a column selection rather than the frame."""
+    return isinstance(node, ast.Subscript) and isinstance(node.slice, (ast.Constant, ast.List))
+
+
+def _reads_table_stats(node: ast.AST) -> bool:
+    return any(isinstance(n, ast.Attribute) and n.attr == "attrs" for n in ast.walk(node))
+
+
+def _argument(call: ast.Call, position: int, keyword: str) -> Optional[ast.AST]:
+    for kw in call.keywords:
+        if kw.arg == keyword:
+            return kw.value
+    return call.args[position] if len(call.args) > position else None
+
+
+def _dedup_options(call: ast.Call) -> tuple:
+    """(subset, keep) of a drop_duplicates call, from literal arguments only."""
+    try:
+        subset = _argument(call, 0, "subset")
+        subset = None if subset is None else ast.literal_eval(subset)
+        keep = _argument(call, 1, "keep")
+        keep = "first" if keep is None else ast.literal_eval(keep)
+    except (ValueError, TypeError, SyntaxError):
+        raise _not_batch_safe(call, "drop_duplicates() arguments are not literals") from None
+    if keep not in _KEEP:
+        # keep=False drops rows duplicated within a batch even when the other copies were elsewhere
+        raise _not_batch_safe(call, f"drop_duplicates(keep={keep!r}) cannot be redone over the whole table")
+    if isinstance(subset, str):
+        subset = (subset,)
+    if subset is not None:
+        subset = tuple(str(c) for c in subset)
+    return subset, keep
+
+
+def plan_batches(code: str) -> Batch_Plan:
+    """
+    Read how the cleaning function `code` can run on an out-of-core table from its syntax tree. Duplicate
+    removal (with its literal subset/keep) is reported so it can be redone over the whole output, and
+    calls that need the whole table (quantiles, distinct counts, ...) raise a ValueError naming the line.
+    Comments and strings never count.
+    """
+    options = set()
+    for node in ast.walk(ast.parse(code)):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+            continue
+        method = node.func.attr
+        if method == "drop_duplicates":
+            if _selects_columns(node.func.value):
+                raise _not_batch_safe(node, "drop_duplicates() on a column selection")
+            options.add(_dedup_options(node))
+        elif method in TABLE_AGGREGATES and not _reads_table_stats(node.func.value):
+            raise _not_batch_safe(node, f".{method}() summarizes the batch, not the table; read "
+                                  f"table-wide values from df.attrs['table_stats'] instead")
+        elif method == "dropna" and getattr(_argument(node, 0, "axis"), "value", 0) in (1, "columns"):
+            raise _not_batch_safe(node, "dropna(axis=1) drops the columns that are empty in the batch; "
+                                  "drop df.attrs['table_stats']['constant_columns'] instead")
+    if len(options) > 1:
+        raise ValueError(f"Cleaning function removes duplicates in several ways: {sorted(map(str, options))}")
+    if not options:
+        return Batch_Plan(dedup=False, subset=None, keep="first")
+    subset, keep = options.pop()
+    return Batch_Plan(dedup=True, subset=list(subset) if subset else None, keep=keep)
+
+
+def frame_cleaning_stats(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Table-wide statistics handed to clean_data as df.attrs["table_stats"]: the quartiles of every numeric
+    column and the columns that are entirely empty or hold a single distinct value. The out-of-core
+    equivalent is Out_Of_Core_Table.cleaning_stats().
+    """
+    quartiles = {}
+    constant = []
+    for i, name in enumerate(df.columns):
+        col = df.iloc[:, i]
+        if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col) and col.notna().any():
+            q1, q3 = col.dropna().astype("float64").quantile([0.25, 0.75]).tolist()
+            quartiles[str(name)] = [q1, q3]
+        try:
+            if col.nunique(dropna=True) <= 1:
+                constant.append(str(name))
+        except TypeError:
+            continue  # unhashable cells
+    return {"quartiles": quartiles, "constant_columns": constant}
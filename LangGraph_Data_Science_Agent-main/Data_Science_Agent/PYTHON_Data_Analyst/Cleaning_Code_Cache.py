@@ -0,0 +1,116 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Distinct counts for the fingerprint are taken on at most this many rows
+FINGERPRINT_SAMPLE_ROWS = 10_000
+LOW_CARDINALITY = 50
+
+
+def _cardinality_bucket(s: pd.Series) -> str:
+    try:
+        distinct = s.nunique(dropna=True)
+    except TypeError:
+        return "unhashable"
+    if distinct <= 1:
+        return "constant"
+    if distinct <= LOW_CARDINALITY:
+        return "low"
+    return "high" if distinct > 0.5 * max(1, s.count()) else "medium"
+
+
+def schema_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Fingerprint of a table's shape of data rather than its content: column names, dtypes and a rough
+    cardinality class per column (constant / low / medium / high), so the same daily extract maps to
+    the same key while a column turning from categorical to free text does not.
+    """
+    sample = df if len(df) <= FINGERPRINT_SAMPLE_ROWS else df.sample(n=FINGERPRINT_SAMPLE_ROWS, random_state=42)
+    parts = [
+        (str(name), str(dtype), _cardinality_bucket(sample.iloc[:, i]))
+        for i, (name, dtype) in enumerate(df.dtypes.items())
+    ]
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Cleaning_Code_Cache:
+    """
+    SQLite store of cleaning functions that passed validation, keyed by schema fingerprint.
+    Least recently used entries are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, path: str = ".cache/cleaning_functions.sqlite", max_entries: int = 1000):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS cleaning_functions ("
+                " fingerprint TEXT PRIMARY KEY, code TEXT NOT NULL, created_at REAL NOT NULL,"
+                " used_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        with self._lock, self._connect() as con:
+            row = con.execute("SELECT code FROM cleaning_functions WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            if row is None:
+                return None
+            con.execute("UPDATE cleaning_functions SET used_at = ?, hits = hits + 1 WHERE fingerprint = ?",
+                        (time.time(), fingerprint))
+        return row[0]
+
+    def put(self, fingerprint: str, code: str) -> None:
+        now = time.time()
+        with self._lock, self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO cleaning_functions (fingerprint, code, created_at, used_at, hits)"
+                " VALUES (?, ?, ?, ?, 0)",
+                (fingerprint, code, now, now),
+            )
+            con.execute(
+                "DELETE FROM cleaning_functions WHERE fingerprint IN ("
+                " SELECT fingerprint FROM cleaning_functions ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def invalidate(self, fingerprints: Iterable[str]) -> None:
+        keys = [(fp,) for fp in fingerprints]
+        with self._lock, self._connect() as con:
+            con.executemany("DELETE FROM cleaning_functions WHERE fingerprint = ?", keys)
+        logger.info("Invalidated %d cached cleaning function(s)", len(keys))
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM cleaning_functions")
+
+
+_default_cache: Optional[Cleaning_Code_Cache] = None
+_default_lock = threading.Lock()
+
+
+def get_cleaning_code_cache() -> Cleaning_Code_Cache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = Cleaning_Code_Cache()
+        return _default_cache
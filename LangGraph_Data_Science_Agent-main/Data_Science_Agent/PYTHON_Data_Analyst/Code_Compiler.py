@@ -0,0 +1,73 @@
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def source_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class Loaded_Function(NamedTuple):
+    func: Callable
+    source_hash: str
+    compile_seconds: float  # 0.0 when served from the LRU
+    cached: bool
+
+
+class Code_Compiler:
+    """
+    LRU of functions built from generated source. The source is compiled to a code object and executed
+    once in a fresh namespace; the resulting function is reused by every table, retry and later run that
+    submits the same source (keyed by its SHA-256 hash, the wanted function name and the namespace kind).
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._functions: "OrderedDict[Hashable, Callable]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, source: str, name: Optional[str] = None,
+             make_env: Optional[Callable[[], Dict[str, Any]]] = None, env_key: str = "default") -> Loaded_Function:
+        """
+        Return the function `name` defined by `source` (or the first callable it defines when `name` is
+        None or missing). `make_env` builds the globals the code runs in; `env_key` must identify it.
+        Compilation and definition errors propagate and are not cached.
+        """
+        digest = source_hash(source)
+        key = (digest, name, env_key)
+        with self._lock:
+            func = self._functions.get(key)
+            if func is not None:
+                self._functions.move_to_end(key)
+                self.hits += 1
+                return Loaded_Function(func, digest, 0.0, True)
+            self.misses += 1
+
+        start = time.perf_counter()
+        code = compile(source, f"<generated-{digest[:12]}>", "exec")
+        namespace = make_env() if make_env else {}
+        predefined = set(namespace)
+        exec(code, namespace, namespace)
+        func = namespace.get(name) if name else None
+        if not callable(func):
+            func = next((v for k, v in namespace.items() if k not in predefined and callable(v)), None)
+        if func is None:
+            raise ValueError(f"No callable function{f' named {name!r}' if name else ''} found in the generated code")
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._functions[key] = func
+            while len(self._functions) > self.max_entries:
+                self._functions.popitem(last=False)
+        logger.info("Compiled generated code %s in %.1f ms", digest[:12], elapsed * 1000)
+        return Loaded_Function(func, digest, elapsed, False)
+
+
+code_compiler = Code_Compiler()
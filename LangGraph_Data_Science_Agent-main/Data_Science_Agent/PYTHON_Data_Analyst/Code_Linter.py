@@ -0,0 +1,390 @@
+import re
+import ast
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+
+from Data_Science_Agent.LLM.Response_Cache import bypass_response_cache
+
+logger = logging.getLogger(__name__)
+
+# rule -> what to do instead, quoted back to the LLM when a finding cannot be rewritten
+RULES: Dict[str, str] = {
+    "iterrows": "row loop over DataFrame.iterrows(); use vectorized column operations, np.where/np.select or merges",
+    "apply_axis1": "row-wise DataFrame.apply(axis=1); use vectorized column arithmetic, np.where/np.select or .str/.dt accessors",
+    "index_loop": "Python loop over the rows (df.index / range(len(df))) with per-row indexing; use vectorized column operations",
+    "concat_in_loop": "pd.concat inside a loop (quadratic copying); collect the pieces in a list and concat once after the loop",
+}
+
+_ROW_ACCESSORS = {"loc", "iloc", "at", "iat"}
+_VECTOR_BINOPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+                  ast.BitAnd, ast.BitOr, ast.BitXor)
+_VECTOR_UNARYOPS = (ast.USub, ast.UAdd, ast.Invert)
+_VECTOR_CMPOPS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+
+
+class Lint_Finding(NamedTuple):
+    rule: str
+    line: int
+    message: str
+    fixed: bool
+
+
+class Lint_Result(NamedTuple):
+    code: str
+    findings: List[Lint_Finding]  # findings in the code as generated, `fixed` when rewritten
+    regenerated: bool
+    remaining: int  # row-wise patterns left in the returned code
+
+    def summary(self) -> Dict[str, Any]:
+        return combined_summary([self])
+
+
+def combined_summary(results: List[Lint_Result]) -> Dict[str, Any]:
+    """One state entry for a node that generated several functions (one per schema group)."""
+    return {
+        "findings": [f._asdict() for r in results for f in r.findings],
+        "rewritten": sum(f.fixed for r in results for f in r.findings),
+        "regenerated": any(r.regenerated for r in results),
+        "remaining": sum(r.remaining for r in results),
+    }
+
+
+# ---------- detection ----------
+def _is_plain_ref(node: ast.AST) -> bool:
+    """Name or attribute chain (df, self.df): safe to repeat in rewritten code."""
+    while isinstance(node, ast.Attribute):
+        node = node.value
+    return isinstance(node, ast.Name)
+
+
+def _const_key(node: ast.Subscript) -> bool:
+    # only column labels: row[0] is positional on a Series row but a key lookup on a dict or frame
+    return isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str)
+
+
+def _only_keyed_uses(body: List[ast.stmt], name: str) -> bool:
+    """True when `name` is only used as `name["const"]` (read or write) within `body`."""
+    keyed = set()
+    for stmt in body:
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id == name:
+                if not _const_key(node):
+                    return False
+                keyed.add(id(node.value))
+    for stmt in body:
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Name) and node.id == name and id(node) not in keyed:
+                return False
+    return True
+
+
+def _vector_expr(node: ast.AST, row: str) -> bool:
+    """Expression built only from row["col"], constants and element-wise operators."""
+    if isinstance(node, ast.Subscript):
+        return isinstance(node.value, ast.Name) and node.value.id == row and _const_key(node)
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, (int, float, str)) and not isinstance(node.value, bool)
+    if isinstance(node, ast.BinOp):
+        return isinstance(node.op, _VECTOR_BINOPS) and _vector_expr(node.left, row) and _vector_expr(node.right, row)
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, _VECTOR_UNARYOPS) and _vector_expr(node.operand, row)
+    if isinstance(node, ast.Compare):
+        return (len(node.ops) == 1 and isinstance(node.ops[0], _VECTOR_CMPOPS)
+                and _vector_expr(node.left, row) and _vector_expr(node.comparators[0], row))
+    return False
+
+
+def _axis_is_rows(call: ast.Call) -> bool:
+    for kw in call.keywords:
+        if kw.arg == "axis" and isinstance(kw.value, ast.Constant) and kw.value.value in (1, "columns"):
+            return True
+    return False
+
+
+def _range_over_len(node: ast.AST) -> Optional[ast.AST]:
+    """Return X for range(len(X)), range(0, len(X)) or range(X.shape[0])."""
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "range"):
+        return None
+    if not node.args or len(node.args) > 2:
+        return None
+    stop = node.args[-1]
+    if isinstance(stop, ast.Call) and isinstance(stop.func, ast.Name) and stop.func.id == "len" and len(stop.args) == 1:
+        return stop.args[0]
+    if (isinstance(stop, ast.Subscript) and isinstance(stop.value, ast.Attribute) and stop.value.attr == "shape"
+            and isinstance(stop.slice, ast.Constant) and stop.slice.value == 0):
+        return stop.value.value
+    return None
+
+
+def _indexes_rows(body: List[ast.stmt], frame: ast.AST) -> bool:
+    target = ast.dump(frame)
+    for stmt in body:
+        for node in ast.walk(stmt):
+            if (isinstance(node, ast.Attribute) and node.attr in _ROW_ACCESSORS
+                    and ast.dump(node.value) == target):
+                return True
+    return False
+
+
+class _Analyzer(ast.NodeVisitor):
+    def __init__(self, source: str):
+        self.source = source
+        self.findings: List[Lint_Finding] = []
+        self.edits: List[Tuple[ast.AST, str]] = []  # (node to replace, replacement source)
+        self._loops = 0
+        self._loop_iters = set()  # iterrows() calls already reported with their for loop
+
+    def _segment(self, node: ast.AST) -> str:
+        return ast.get_source_segment(self.source, node)
+
+    def _add(self, rule: str, node: ast.AST, fixed: bool = False) -> None:
+        self.findings.append(Lint_Finding(rule, node.lineno, RULES[rule], fixed))
+
+    # functions start a new loop scope: a concat in a helper called from a loop is not flagged
+    def visit_FunctionDef(self, node):
+        loops, self._loops = self._loops, 0
+        self.generic_visit(node)
+        self._loops = loops
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+    visit_Lambda = visit_FunctionDef
+
+    def _visit_loop(self, node):
+        self.visit(node.iter if isinstance(node, ast.For) else node.test)
+        self._loops += 1
+        for stmt in node.body + node.orelse:
+            self.visit(stmt)
+        self._loops -= 1
+
+    def visit_While(self, node):
+        self._visit_loop(node)
+
+    def visit_For(self, node):
+        it = node.iter
+        if isinstance(it, ast.Call) and isinstance(it.func, ast.Attribute) and it.func.attr == "iterrows":
+            self._loop_iters.add(id(it))
+            self._iterrows(node, it)
+        elif isinstance(it, ast.Attribute) and it.attr == "index":
+            self._add("index_loop", node)
+        else:
+            frame = _range_over_len(it)
+            if frame is not None and _indexes_rows(node.body, frame):
+                self._add("index_loop", node)
+        self._visit_loop(node)
+
+    def _iterrows(self, loop: ast.For, call: ast.Call) -> None:
+        frame = call.func.value
+        target = loop.target
+        fixable = (
+            not call.args and not call.keywords and _is_plain_ref(frame)
+            and isinstance(target, ast.Tuple) and len(target.elts) == 2
+            and all(isinstance(e, ast.Name) for e in target.elts)
+            and _only_keyed_uses(loop.body + loop.orelse, target.elts[1].id)
+        )
+        if fixable:
+            # rows only read/written by key: dict records behave the same and skip building a Series per row
+            ref = self._segment(frame)
+            self.edits.append((call, f'zip({ref}.index, {ref}.to_dict("records"))'))
+        self._add("iterrows", loop, fixed=fixable)
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr == "apply" and _axis_is_rows(node):
+            self._add("apply_axis1", node, fixed=self._rewrite_apply(node))
+        elif isinstance(func, ast.Attribute) and func.attr == "iterrows" and id(node) not in self._loop_iters:
+            self._add("iterrows", node)  # e.g. inside a comprehension
+        elif self._loops and (
+            (isinstance(func, ast.Attribute) and func.attr == "concat"
+             and isinstance(func.value, ast.Name) and func.value.id in ("pd", "pandas"))
+            or (isinstance(func, ast.Name) and func.id == "concat")
+        ):
+            self._add("concat_in_loop", node)
+        self.generic_visit(node)
+
+    def _rewrite_apply(self, call: ast.Call) -> bool:
+        frame = call.func.value
+        if not (_is_plain_ref(frame) and len(call.args) == 1 and len(call.keywords) == 1):
+            return False
+        fn = call.args[0]
+        if not (isinstance(fn, ast.Lambda) and len(fn.args.args) == 1 and not fn.args.vararg
+                and not fn.args.kwarg and not fn.args.kwonlyargs and not fn.args.defaults):
+            return False
+        row = fn.args.args[0].arg
+        if not _vector_expr(fn.body, row):
+            return False
+        ref = self._segment(frame)
+        body = self._segment(fn.body)
+        # Replace row[...] by frame[...] inside the lambda body, right to left to keep offsets valid
+        subs = sorted(
+            (n for n in ast.walk(fn.body) if isinstance(n, ast.Subscript)),
+            key=lambda n: (n.lineno, n.col_offset), reverse=True,
+        )
+        lines = body.splitlines(keepends=True)
+        base_line, base_col = fn.body.lineno, fn.body.col_offset
+        for sub in subs:
+            line = sub.value.lineno - base_line
+            start = _char_col(lines[line], sub.value.col_offset - (base_col if line == 0 else 0))
+            end = _char_col(lines[line], sub.value.end_col_offset - (base_col if line == 0 else 0))
+            lines[line] = lines[line][:start] + ref + lines[line][end:]
+        self.edits.append((call, f"({''.join(lines)})"))
+        return True
+
+
+def _char_col(line: str, byte_col: int) -> int:
+    """AST column offsets count UTF-8 bytes; convert one to a character index within `line`."""
+    return len(line.encode("utf-8")[:byte_col].decode("utf-8", errors="ignore"))
+
+
+def _apply_edits(source: str, edits: List[Tuple[ast.AST, str]]) -> str:
+    lines = source.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    def position(lineno: int, byte_col: int) -> int:
+        return offsets[lineno - 1] + _char_col(lines[lineno - 1], byte_col)
+
+    spans = sorted(
+        ((position(n.lineno, n.col_offset), position(n.end_lineno, n.end_col_offset), text) for n, text in edits),
+        reverse=True,
+    )
+    last_start = len(source) + 1
+    for start, end, text in spans:
+        if end > last_start:
+            continue  # overlaps an edit already applied
+        source = source[:start] + text + source[end:]
+        last_start = start
+    return source
+
+
+def lint_code(source: str) -> List[Lint_Finding]:
+    """Report row-wise anti-patterns in generated code; `fixed` marks the ones `rewrite_code` can remove."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []  # reported when the code is compiled
+    analyzer = _Analyzer(source)
+    analyzer.visit(tree)
+    return analyzer.findings
+
+
+def rewrite_code(source: str) -> Tuple[str, List[Lint_Finding]]:
+    """
+    Rewrite the anti-patterns that have a behavior-preserving vectorized form and return the new source
+    with the findings of the original:
+      - `for i, row in df.iterrows()` where `row` is only used as row["col"] -> iterate over dict records
+      - `df.apply(lambda r: <arithmetic/comparison of r["col"] and constants>, axis=1)` -> the same
+        expression on whole columns
+    Other findings are left for regeneration.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return source, []
+    analyzer = _Analyzer(source)
+    analyzer.visit(tree)
+    if not analyzer.edits:
+        return source, analyzer.findings
+    rewritten = _apply_edits(source, analyzer.edits)
+    try:
+        ast.parse(rewritten)
+    except SyntaxError:
+        logger.warning("Discarding linter rewrite that does not parse")
+        return source, [f._replace(fixed=False) for f in analyzer.findings]
+    return rewritten, analyzer.findings
+
+
+def format_findings(findings: List[Lint_Finding]) -> str:
+    return "\n".join(f"- line {f.line}: {f.message}" for f in findings)
+
+
+# ---------- regeneration ----------
+def _regeneration_chain(llm):
+    prompt = PromptTemplate(
+        template=(
+            "The following generated Python function is correct in intent but too slow for large pandas "
+            "DataFrames.\n\n```python\n{code}\n```\n\n"
+            "A static check found these row-wise patterns:\n{findings}\n\n"
+            "Rewrite the function with vectorized pandas/numpy operations. Keep the function name `{name}`, "
+            "its signature, its imports and its return value unchanged.\n"
+            "Output only a single fenced python block with the complete function."
+        ),
+        input_variables=["code", "findings", "name"],
+    )
+    return prompt | llm | StrOutputParser()
+
+
+def _extract_code(text: str) -> str:
+    match = re.search(r"```python(.*?)```", text, re.DOTALL)
+    return match.group(1).strip() if match else text.strip()
+
+
+def _unresolved(findings: List[Lint_Finding]) -> int:
+    return sum(not f.fixed for f in findings)
+
+
+def _pick(name: str, original: Tuple[str, List[Lint_Finding]], regenerated_text: str) -> Lint_Result:
+    code, findings = original
+    kept = Lint_Result(code, findings, False, _unresolved(findings))
+    candidate, candidate_findings = rewrite_code(_extract_code(regenerated_text))
+    try:
+        ast.parse(candidate)
+    except SyntaxError:
+        logger.warning("Regenerated %s does not parse; keeping the original", name)
+        return kept
+    if f"def {name}" not in candidate:
+        logger.warning("Regenerated code lost function %s; keeping the original", name)
+        return kept
+    remaining = _unresolved(candidate_findings)
+    if remaining >= kept.remaining:
+        logger.info("Regenerated %s did not remove the row-wise patterns; keeping the original", name)
+        return kept
+    return Lint_Result(candidate, findings, True, remaining)
+
+
+def _log(name: str, result: Lint_Result) -> None:
+    if not result.findings:
+        logger.info("Linter: %s has no row-wise patterns", name)
+        return
+    for f in result.findings:
+        logger.info("Linter: %s line %d [%s]%s", name, f.line, f.rule, " rewritten" if f.fixed else "")
+    if result.regenerated:
+        logger.info("Linter: %s was regenerated once from the findings (%d pattern(s) left)", name, result.remaining)
+
+
+def review_code(code: str, llm=None, name: str = "function") -> Lint_Result:
+    """
+    Lint generated code, apply the safe rewrites and, if findings remain and an LLM is given, ask it once
+    for a vectorized version. The regenerated code is kept only if it parses, still defines `name` and
+    has fewer unresolved findings.
+    """
+    original = rewrite_code(code)
+    unresolved = [f for f in original[1] if not f.fixed]
+    if unresolved and llm is not None:
+        # a cached regeneration may be one _pick rejected before: always ask again
+        with bypass_response_cache():
+            text = _regeneration_chain(llm).invoke(
+                {"code": original[0], "findings": format_findings(unresolved), "name": name})
+        result = _pick(name, original, text)
+    else:
+        result = Lint_Result(*original, False, len(unresolved))
+    _log(name, result)
+    return result
+
+
+async def areview_code(code: str, llm=None, name: str = "function") -> Lint_Result:
+    original = rewrite_code(code)
+    unresolved = [f for f in original[1] if not f.fixed]
+    if unresolved and llm is not None:
+        # a cached regeneration may be one _pick rejected before: always ask again
+        with bypass_response_cache():
+            text = await _regeneration_chain(llm).ainvoke(
+                {"code": original[0], "findings": format_findings(unresolved), "name": name})
+        result = _pick(name, original, text)
+    else:
+        result = Lint_Result(*original, False, len(unresolved))
+    _log(name, result)
+    return result
@@ -0,0 +1,269 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Total prompt tokens shared by all tables of one prompt
+DEFAULT_TOKEN_BUDGET = 6000
+# Column statistics are computed on at most this many rows
+STATS_ROWS = 1_000_000
+TOP_K = 5
+SAMPLE_ROWS = 20
+MAX_CELL_CHARS = 60
+# Rows hashed from each of the head, middle and tail of a frame for its fingerprint
+FINGERPRINT_BLOCK_ROWS = 1000
+# EDA result sections fit_to_budget never drops: the answer to the user's own question
+KEEP_KEYS = ("question_specific",)
+
+
+def _hash_block(block: pd.DataFrame) -> np.ndarray:
+    try:
+        return pd.util.hash_pandas_object(block, index=False).to_numpy()
+    except TypeError:
+        # unhashable cells (lists, dicts): hash their string form instead
+        return pd.util.hash_pandas_object(block.astype(str), index=False).to_numpy()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Cheap content fingerprint: schema, shape and row hashes of three sampled blocks (head, middle,
+    tail). Cost is independent of the row count. Edits confined to unsampled rows that keep shape and
+    dtypes are not detected, which is acceptable for prompt digests.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((df.shape, [(str(c), str(t)) for c, t in df.dtypes.items()])).encode())
+    n, b = len(df), FINGERPRINT_BLOCK_ROWS
+    starts = sorted({0, max(0, n // 2 - b // 2), max(0, n - b)})
+    for start in starts:
+        h.update(_hash_block(df.iloc[start:start + b]).tobytes())
+    return h.hexdigest()
+
+
+class Digest_Cache:
+    """
+    Process-wide LRU for row samples and rendered digests keyed by frame fingerprint, so the
+    Clean -> Check loop, the EDA prompt and follow-up questions on the same upload reuse them.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+digest_cache = Digest_Cache()
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/markdown)."""
+    return len(text) // 4 + 1
+
+
+def _fmt(value) -> str:
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.4g}"
+    text = str(value)
+    return text if len(text) <= MAX_CELL_CHARS else text[:MAX_CELL_CHARS - 3] + "..."
+
+
+def _column_line(name, s: pd.Series, top_k: int) -> str:
+    null_rate = float(s.isna().mean()) if len(s) else 0.0
+    parts = [f"- `{name}` ({s.dtype}) nulls={null_rate:.1%}"]
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        clean = s.dropna()
+        if len(clean):
+            q = clean.quantile([0, 0.25, 0.5, 0.75, 1.0]).tolist()
+            parts.append("min/25/50/75/max=" + "/".join(_fmt(v) for v in q))
+    else:
+        counts = s.value_counts(dropna=True)
+        parts.append(f"distinct={len(counts)}")
+        if len(counts):
+            parts.append("top=" + ", ".join(f"{_fmt(v)} ({c})" for v, c in counts.head(top_k).items()))
+    return " ".join(parts)
+
+
+def _strata_column(df: pd.DataFrame) -> Optional[str]:
+    """Lowest-cardinality categorical column with 2..20 values, used to stratify the row sample."""
+    best, best_n = None, None
+    for col in df.columns:
+        s = df[col]
+        if s.dtype == object or isinstance(s.dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            try:
+                n = s.nunique(dropna=False)
+            except TypeError:
+                continue  # unhashable values
+            if 2 <= n <= 20 and (best_n is None or n < best_n):
+                best, best_n = col, n
+    return best
+
+
+def stratified_sample(df: pd.DataFrame, n: int, random_state: int = 42) -> pd.DataFrame:
+    """Small row sample that covers every level of the lowest-cardinality categorical column."""
+    if len(df) <= n:
+        return df
+    pool = df.sample(n=min(len(df), 50 * n), random_state=random_state)
+    col = _strata_column(pool) if df.columns.is_unique else None
+    if col is None:
+        return pool.head(n)
+    groups = pool[col].nunique(dropna=False)
+    rank = pool.groupby(col, observed=True, dropna=False, sort=False).cumcount()
+    picked = pool[rank < max(1, n // groups)]
+    if len(picked) < n:
+        picked = pd.concat([picked, pool.drop(picked.index).head(n - len(picked))])
+    return picked.head(n)
+
+
+def _render_rows(sample: pd.DataFrame) -> str:
+    shown = sample.rename(columns={c: str(c) for c in sample.columns})
+    shown = shown.apply(lambda s: s.map(_fmt) if s.dtype == object or isinstance(s.dtype, pd.StringDtype) else s)
+    try:
+        return shown.to_markdown(index=False)
+    except Exception:
+        return shown.to_string(index=False)
+
+
+def cached_sample(df: pd.DataFrame, n: int, fingerprint: Optional[str] = None) -> pd.DataFrame:
+    """stratified_sample(df, n) memoized on the frame fingerprint."""
+    key = ("sample", fingerprint or frame_fingerprint(df), n)
+    sample = digest_cache.get(key)
+    if sample is None:
+        sample = stratified_sample(df, n)
+        digest_cache.put(key, sample)
+    return sample
+
+
+def build_table_digest(df: pd.DataFrame, title: str, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                       sample_rows: int = SAMPLE_ROWS, top_k: int = TOP_K) -> str:
+    """
+    Compact description of one table for an LLM prompt: shape, per-column dtype, null rate,
+    distinct count and top-k values (categorical) or quantiles (numeric), and a small stratified
+    row sample. The sample, then the column list, are shrunk until the digest fits `token_budget`.
+    Digests are memoized in `digest_cache` by frame fingerprint.
+    """
+    fingerprint = frame_fingerprint(df)
+    key = ("digest", fingerprint, title, token_budget, sample_rows, top_k)
+    digest = digest_cache.get(key)
+    if digest is None:
+        digest = _build_table_digest(df, fingerprint, title, token_budget, sample_rows, top_k)
+        digest_cache.put(key, digest)
+    return digest
+
+
+def _build_table_digest(df: pd.DataFrame, fingerprint: str, title: str, token_budget: int,
+                        sample_rows: int, top_k: int) -> str:
+    n_rows, n_cols = df.shape
+    stats_df = df if n_rows <= STATS_ROWS else df.sample(n=STATS_ROWS, random_state=42)
+    header = f"{title}: {n_rows:,} rows x {n_cols} columns"
+    if stats_df is not df:
+        header += f" (column stats from a {STATS_ROWS:,}-row sample)"
+
+    column_lines = []
+    for i, col in enumerate(df.columns):
+        try:
+            column_lines.append(_column_line(col, stats_df.iloc[:, i], top_k))
+        except Exception as e:
+            column_lines.append(f"- `{col}` ({df.dtypes.iloc[i]}) stats unavailable: {e}")
+
+    rows = sample_rows
+    while True:
+        sample_text = _render_rows(cached_sample(df, rows, fingerprint)) if rows > 0 else ""
+        digest = "\n".join([header, "Columns:", *column_lines])
+        if sample_text:
+            digest += f"\nSample rows ({min(rows, n_rows)}):\n{sample_text}"
+        if estimate_tokens(digest) <= token_budget:
+            return digest
+        if rows > 0:
+            rows = rows // 2 if rows > 2 else 0
+            continue
+        # Still too large without rows: keep as many column lines as fit
+        budget_chars = token_budget * 4 - len(header) - 64
+        kept, used = [], 0
+        for line in column_lines:
+            if used + len(line) + 1 > budget_chars:
+                break
+            kept.append(line)
+            used += len(line) + 1
+        omitted = len(column_lines) - len(kept)
+        return "\n".join([header, "Columns:", *kept, f"... {omitted} more columns omitted"])
+
+
+def _clip(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 0:
+        return "[omitted]"
+    return text[:max_chars] + f" ... [truncated {len(text) - max_chars:,} characters]"
+
+
+def _fit_sections(result: dict, max_chars: int) -> str:
+    """
+    One line per key of an EDA result. KEEP_KEYS come first and are cut only if they alone exceed
+    the budget; the other keys share the rest, smallest first, so short sections stay whole and only
+    the largest ones (describe tables, correlations) are trimmed.
+    """
+    sections = [(str(k), v if isinstance(v, str) else repr(v)) for k, v in result.items()]
+    lines = {}
+    left = max_chars
+    for key, text in sections:
+        if key in KEEP_KEYS:
+            lines[key] = f"{key}: {_clip(text, left - len(key) - 2)}"
+            left -= len(lines[key]) + 1
+    rest = [(key, text) for key, text in sections if key not in KEEP_KEYS]
+    for pos, (key, text) in enumerate(sorted(rest, key=lambda kv: len(kv[1]))):
+        share = max(0, left) // (len(rest) - pos)
+        lines[key] = f"{key}: {_clip(text, share - len(key) - 3)}"
+        left -= len(lines[key]) + 1
+    return "\n".join(lines[key] for key, _ in sections)
+
+
+def fit_to_budget(text: Any, token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """
+    Trim free-form prompt text to roughly `token_budget` tokens. EDA results (a dict per table, or a
+    list of them) are trimmed per key within an even share of the budget per table, and their
+    `question_specific` section is always kept; anything else is cut at the end.
+    """
+    max_chars = token_budget * 4
+    rendered = str(text)
+    if len(rendered) <= max_chars:
+        return rendered
+    results = [text] if isinstance(text, dict) else text
+    if isinstance(results, list) and results and all(isinstance(r, dict) for r in results):
+        per_table = max_chars // len(results) - 16
+        return "\n\n".join(f"Table {i}:\n{_fit_sections(r, per_table)}" for i, r in enumerate(results, start=1))
+    return rendered[:max_chars] + f"\n... [truncated {len(rendered) - max_chars:,} characters]"
+
+
+def build_prompt_context(frames: List[pd.DataFrame], label: str = "File",
+                         token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """Digest of every DataFrame in `frames`, with the token budget split evenly across tables."""
+    tables = [df for df in frames or [] if isinstance(df, pd.DataFrame)]
+    if not tables:
+        return "No data available."
+    per_table = max(200, token_budget // len(tables))
+    return "\n\n".join(
+        build_table_digest(df, f"{label} {i}", per_table) for i, df in enumerate(tables, start=1)
+    )
@@ -0,0 +1,180 @@
+import math
+import logging
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from Data_Science_Agent.PYTHON_Data_Analyst.EDA_Accumulators import Co_Moments
+
+logger = logging.getLogger(__name__)
+
+CORRELATION_THRESHOLD = 0.5
+# Memory budget of one float32 row block of the numeric columns
+BLOCK_BYTES = 64 * 2**20
+# Upper bound on rows per block, so float32 products sum over few rows before reaching the float64 totals
+MAX_BLOCK_ROWS = 65_536
+# Rows of the correlation matrix scanned at a time when extracting pairs
+PAIR_BAND_ROWS = 256
+# "auto" switches to an approximation from this many numeric columns on
+WIDE_COLUMNS = 1_000
+SAMPLE_ROWS = 20_000
+PROJECTION_DIM = 4_096
+# ... and enough rows for the dim x k^2 Gram product to be much cheaper than the exact n x k^2 one
+AUTO_MIN_ROWS = 64 * PROJECTION_DIM
+# Confidence of the reported approximation error bounds
+BOUND_CONFIDENCE = 0.95
+
+METHODS = ("exact", "sample", "projection", "auto")
+
+
+def block_rows(k: int) -> int:
+    return int(max(256, min(MAX_BLOCK_ROWS, BLOCK_BYTES // (4 * max(k, 1)))))
+
+
+def _block(columns: Sequence[np.ndarray], start: int, stop: int, shift: np.ndarray) -> np.ndarray:
+    """float32 (rows, k) block of the columns, shifted in float64 before the cast."""
+    out = np.empty((stop - start, len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        np.subtract(col[start:stop], shift[j], out=out[:, j], casting="unsafe")
+    return out
+
+
+def _means(columns: Sequence[np.ndarray], rows: int) -> np.ndarray:
+    return np.array([np.nanmean(c[:rows]) if np.isfinite(c[:rows]).any() else 0.0 for c in columns])
+
+
+def accumulate(moments: Co_Moments, columns: Sequence[np.ndarray]) -> None:
+    """Fold float64 column arrays into `moments` one float32 row block at a time."""
+    n = len(columns[0]) if len(columns) else 0
+    if not n:
+        return
+    step = block_rows(len(columns))
+    if moments.shift is None:
+        moments.shift = _means(columns, step)
+    for start in range(0, n, step):
+        moments.update(_block(columns, start, min(n, start + step), moments.shift), shifted=True)
+
+
+def correlation_matrix(columns: Sequence[np.ndarray]) -> np.ndarray:
+    """Exact pairwise-complete Pearson matrix (same as DataFrame.corr)."""
+    moments = Co_Moments(len(columns))
+    accumulate(moments, columns)
+    return moments.correlation()
+
+
+def _simultaneous_z(k: int) -> float:
+    """Normal quantile that holds for all k(k-1)/2 pairs at once at BOUND_CONFIDENCE (Bonferroni)."""
+    pairs = max(k * (k - 1) // 2, 1)
+    return NormalDist().inv_cdf(1 - (1 - BOUND_CONFIDENCE) / (2 * pairs))
+
+
+def sampled_correlation(columns: Sequence[np.ndarray], rows: int = SAMPLE_ROWS, seed: int = 0):
+    """
+    Pairwise-complete correlations of a uniform row sample. The bound is simultaneous for all pairs at
+    BOUND_CONFIDENCE (Fisher z standard error with a Bonferroni correction; assumes roughly
+    bivariate-normal columns).
+    """
+    n = len(columns[0])
+    pick = np.sort(np.random.default_rng(seed).choice(n, size=min(rows, n), replace=False))
+    corr = correlation_matrix([c[pick] for c in columns])
+    return corr, min(1.0, _simultaneous_z(len(columns)) / math.sqrt(max(len(pick) - 3, 1)))
+
+
+def projected_correlation(columns: Sequence[np.ndarray], dim: int = PROJECTION_DIM, seed: int = 0):
+    """
+    Correlations from a CountSketch random projection of the rows: each row is added, with a random
+    sign, to one of `dim` buckets, so the n x k centred data shrinks to dim x k in one O(n k) pass and
+    the Gram product costs dim * k^2 instead of n * k^2. Missing values are imputed with the column mean.
+    For unit vectors the estimate is unbiased with variance at most 2 / dim; the reported bound is the
+    normal-approximation interval for all pairs at once at BOUND_CONFIDENCE.
+    """
+    n, k = len(columns[0]), len(columns)
+    rng = np.random.default_rng(seed)
+    shift = np.array([np.nanmean(c) if np.isfinite(c).any() else 0.0 for c in columns])
+    sketch = np.zeros((dim, k))
+    sum_sq = np.zeros(k)
+    step = block_rows(k)
+    for start in range(0, n, step):
+        x = _block(columns, start, min(n, start + step), shift)
+        np.nan_to_num(x, copy=False, nan=0.0)
+        sum_sq += np.einsum("ij,ij->j", x, x, dtype="float64")
+        x *= rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=len(x))[:, None]
+        buckets = rng.integers(dim, size=len(x))
+        order = np.argsort(buckets, kind="stable")
+        sorted_buckets = buckets[order]
+        starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+        sketch[sorted_buckets[starts]] += np.add.reduceat(x[order], starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sketch /= np.sqrt(sum_sq)
+        y = sketch.astype(np.float32)
+        corr = (y.T @ y).astype("float64")
+    corr[:, sum_sq == 0] = np.nan
+    corr[sum_sq == 0, :] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr, min(1.0, _simultaneous_z(k) * math.sqrt(2.0 / dim))
+
+
+def extract_pairs(names: List[str], corr: np.ndarray, threshold: Optional[float] = CORRELATION_THRESHOLD,
+                  top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Upper-triangle pairs with |r| > threshold (and/or the top_k strongest), strongest first. The matrix
+    is scanned in row bands with vectorized masks, so no Python loop runs over the k^2 entries.
+    """
+    k = len(names)
+    found_i, found_j, found_r = [], [], []
+    columns = np.arange(k)
+    for start in range(0, k, PAIR_BAND_ROWS):
+        band = corr[start:start + PAIR_BAND_ROWS]
+        strength = np.abs(band)
+        keep = (columns[None, :] > np.arange(start, start + len(band))[:, None]) & ~np.isnan(band)
+        if threshold is not None:
+            keep &= strength > threshold
+        bi, bj = np.nonzero(keep)
+        found_i.append(bi + start)
+        found_j.append(bj)
+        found_r.append(band[bi, bj])
+        if top_k is not None:
+            # keep only the running top_k so memory stays O(top_k) on dense matrices
+            i, j, r = np.concatenate(found_i), np.concatenate(found_j), np.concatenate(found_r)
+            if len(r) > top_k:
+                best = np.argpartition(-np.abs(r), top_k - 1)[:top_k]
+                i, j, r = i[best], j[best], r[best]
+            found_i, found_j, found_r = [i], [j], [r]
+    if not found_r:
+        return []
+    i, j, r = np.concatenate(found_i), np.concatenate(found_j), np.concatenate(found_r)
+    order = np.argsort(-np.abs(r), kind="stable")[:top_k]
+    return [{"column_a": names[a], "column_b": names[b], "corr": round(float(v), 4)}
+            for a, b, v in zip(i[order], j[order], r[order])]
+
+
+def correlation_report(names: List[str], columns: Sequence[np.ndarray],
+                       threshold: Optional[float] = CORRELATION_THRESHOLD, top_k: Optional[int] = None,
+                       method: str = "exact") -> Dict[str, Any]:
+    """
+    Correlated numeric pairs as {"pairs", "method", "error_bound"}. method is "exact" (pairwise-complete,
+    blockwise float32), "sample", "projection", or "auto" (the projection from WIDE_COLUMNS columns and
+    AUTO_MIN_ROWS rows on, exact otherwise).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method {method!r}; expected one of {METHODS}")
+    k = len(columns)
+    if k < 2:
+        return {"pairs": [], "method": "exact", "error_bound": 0.0}
+    n = len(columns[0])
+    if method == "auto":
+        method = "projection" if k >= WIDE_COLUMNS and n >= AUTO_MIN_ROWS else "exact"
+    if method == "sample" and n <= SAMPLE_ROWS or method == "projection" and n <= PROJECTION_DIM:
+        method = "exact"
+
+    if method == "sample":
+        corr, bound = sampled_correlation(columns)
+    elif method == "projection":
+        corr, bound = projected_correlation(columns)
+    else:
+        corr, bound = correlation_matrix(columns), 0.0
+    if method != "exact":
+        logger.info("Correlations of %d columns approximated by %s (error bound %.3f)", k, method, bound)
+    return {"pairs": extract_pairs(names, corr, threshold, top_k), "method": method,
+            "error_bound": round(bound, 4)}
@@ -5,26 +5,32 @@ from typing import Literal
 from langchain_core.output_parsers import BaseOutputParser
 import re
 import pandas as pd
-from typing import List
-import logging
+from typing import Any, Dict, List, Optional
+import time
+import asyncio
 import logging
+from Data_Science_Agent.PYTHON_Data_Analyst.Context_Builder import DEFAULT_TOKEN_BUDGET, build_prompt_context
+from Data_Science_Agent.PYTHON_Data_Analyst.Data_Validator import validate_tables
+from Data_Science_Agent.ENGINE.Sandbox_Executor import get_sandbox_executor
+from Data_Science_Agent.PYTHON_Data_Analyst.Code_Linter import areview_code, combined_summary, review_code
+from Data_Science_Agent.PYTHON_Data_Analyst.Cleaning_Code_Cache import get_cleaning_code_cache, schema_fingerprint
+from Data_Science_Agent.LLM.Response_Cache import bypass_response_cache
+from Data_Science_Agent.INGESTION.Dtype_Compaction import expand_categoricals
+from Data_Science_Agent.PYTHON_Data_Analyst.Batch_Cleaning import frame_cleaning_stats, plan_batches
 logger = logging.getLogger(__name__)
 
-def dynamic_sample(df: pd.DataFrame, random_state: int = 42) -> pd.DataFrame:
-    n = len(df)
-    if n < 200:
-        frac = 1.0
-    elif n <= 500:
-        frac = 0.5
-    elif n < 10_000:
-        frac = 1.0
-    elif n < 100_000:
-        frac = 0.1
-    elif n < 1_000_000:
-        frac = 0.03
-    else:
-        frac = 0.01
-    return df.sample(frac=frac, random_state=random_state)
+
+def run_clean_data(func, df: pd.DataFrame, table_stats: Optional[Dict[str, Any]] = None):
+    """Sandbox runner: hand the table-wide statistics to clean_data as df.attrs["table_stats"]."""
+    df.attrs["table_stats"] = table_stats or {"quartiles": {}, "constant_columns": []}
+    result = func(df)
+    if isinstance(result, pd.DataFrame):
+        result.attrs.pop("table_stats", None)
+    return result
+
+
+# Import reference resolved inside the sandbox workers
+CLEANING_RUNNER = f"{__name__}:run_clean_data"
 
 class Routes(BaseModel):
     route : Literal["Valid","Reject"] = Field(description="Return 'Valid' if the data is cleaned, else return 'Reject' to regenerate it.")
@@ -37,29 +43,70 @@ class PythonOutputParser(BaseOutputParser):
         return match.group(1).strip() if match else text.strip()
 
 class Data_Cleaning_Node:
-    def __init__(self, llm):
+    def __init__(self, llm, token_budget: int = DEFAULT_TOKEN_BUDGET, max_cleaning_attempts: int = 3,
+                 llm_judge: bool = False, reuse_cleaning_code: bool = True):
+        """
+        max_cleaning_attempts: cleaning code generations allowed before the last result is accepted as is.
+        llm_judge: ask the LLM for a Valid/Reject decision when the rule-based validator is borderline
+                   (otherwise borderline results are accepted).
+        reuse_cleaning_code: reuse validated cleaning functions for uploads with a known schema fingerprint.
+        """
         self.llm = llm
+        self.token_budget = token_budget
+        self.max_cleaning_attempts = max_cleaning_attempts
+        self.llm_judge = llm_judge
         self.logger = logging.getLogger(__name__)
-        self.router = llm.with_structured_output(Routes)
+        self.router = llm.with_structured_output(Routes) if llm_judge else None
+        self.code_cache = get_cleaning_code_cache() if reuse_cleaning_code else None
+        self.executor = get_sandbox_executor()
 
-    def generate_cleaning_code(self, state: PythonAnalystState) -> dict:
+    def _check_generation_inputs(self, state: PythonAnalystState) -> None:
         if "raw_data" not in state or not state["raw_data"]:
             raise ValueError("Raw data not found or empty in state")
         if "question" not in state or not state["question"]:
             raise ValueError("User question not found in state")
 
-        # build sample_text from raw_data; ensure columns shown as strings
-        sample_parts = []
         for i, df in enumerate(state["raw_data"], start=1):
-            if isinstance(df, pd.DataFrame):
-                sample_df = dynamic_sample(df)
-                # ensure column names are cast to str for the sample display
-                sample_df = sample_df.rename(columns={c: str(c) for c in sample_df.columns})
-                sample_parts.append(f"File {i} Sample:\n{sample_df.to_string(index=False)}")
-            else:
+            if not isinstance(df, pd.DataFrame):
                 raise ValueError(f"Item {i} in raw_data is not a valid DataFrame")
-        sample_text = "\n\n".join(sample_parts) if sample_parts else "No sample available."
 
+    def lookup_cached_cleaning(self, state: PythonAnalystState) -> dict:
+        """Fingerprint every table's schema and load validated cleaning functions when all tables have one."""
+        self._check_generation_inputs(state)
+        fingerprints = [schema_fingerprint(df) for df in state["raw_data"]]
+        codes = [self.code_cache.get(fp) for fp in fingerprints] if self.code_cache else []
+        if not codes or not all(codes):
+            return {"schema_fingerprints": fingerprints, "cleaning_from_cache": False}
+
+        self.logger.info("Reusing cached cleaning function(s) for %d table(s)", len(codes))
+        return {
+            "schema_fingerprints": fingerprints,
+            "cleaning_from_cache": True,
+            "cleaning_code": codes[0],
+            "cleaning_codes": codes if len(set(codes)) > 1 else [],
+        }
+
+    async def alookup_cached_cleaning(self, state: PythonAnalystState) -> dict:
+        return await asyncio.to_thread(self.lookup_cached_cleaning, state)
+
+    def cache_route(self, state: PythonAnalystState) -> str:
+        return "Hit" if state.get("cleaning_from_cache") else "Miss"
+
+    def _update_code_cache(self, state: PythonAnalystState, report: dict, route: str) -> None:
+        """Store freshly validated functions; drop cached ones that fail validation on new data."""
+        fingerprints = state.get("schema_fingerprints") or []
+        if self.code_cache is None or not fingerprints:
+            return
+        if route == "Valid":
+            if not state.get("cleaning_from_cache"):
+                codes = state.get("cleaning_codes") or []
+                for i, fp in enumerate(fingerprints):
+                    self.code_cache.put(fp, codes[i] if i < len(codes) and codes[i] else state["cleaning_code"])
+        elif state.get("cleaning_from_cache"):
+            rejected = [fp for fp, table in zip(fingerprints, report["tables"]) if table["verdict"] == "Reject"]
+            self.code_cache.invalidate(rejected or fingerprints)
+
+    def _cleaning_chain(self):
         # Prompt: keep original column names (no renaming). Ask for function named clean_data.
         unified_prompt = PromptTemplate(
             template=(
@@ -69,15 +116,22 @@ class Data_Cleaning_Node:
                 "Reason through each step before coding. Ensure:\n"
                 "- Correct handling of missing values, duplicates, types, outliers, inconsistencies, and irrelevant data.\n"
                 "- Code is clean, efficient, and executable.\n\n"
-                "Sample data:\n{sample_text}\n\n"
+                "The function may receive one batch of a larger table, so it must not compute statistics from df itself\n"
+                "(no quantile, describe, nunique, value_counts, mean, min/max, sum, any/all ...). Table-wide values are in\n"
+                "df.attrs['table_stats']: 'quartiles' maps numeric columns to [Q1, Q3] and 'constant_columns' lists the columns\n"
+                "that are entirely empty or hold a single value.\n\n"
+                "Data digest (schema, null rates, top values, quantiles and sample rows):\n{sample_text}\n\n"
                 "User question:\n{user_question}\n\n"
+                "{feedback}"
                 "Cleaning steps to implement (behavioral requirements):\n"
                 "1. Drop all rows with any missing values (NaNs).\n"
-                "2. Remove all exact duplicate rows.\n"
+                "2. Remove all exact duplicate rows with df.drop_duplicates() (literal arguments only).\n"
                 "3. DO NOT change column names or case; preserve them exactly as in the DataFrame.\n"
-                "4. Detect & handle outliers in numeric columns using the IQR method (clip values).\n"
+                "4. Detect & handle outliers in numeric columns using the IQR method (clip values), with Q1/Q3 taken from\n"
+                "   df.attrs['table_stats']['quartiles'] (skip columns missing there). Integer columns use pandas\n"
+                "   nullable integer dtypes (Int8...Int64); cast them with .astype('Float64') before clipping to fractional bounds.\n"
                 "5. Fix inconsistent values in object columns: strip whitespace, unify case if appropriate, normalize common categories (e.g., 'Yes', 'YES' -> 'yes').\n"
-                "6. Remove irrelevant columns (entirely empty or constant).\n"
+                "6. Remove irrelevant columns: those in df.attrs['table_stats']['constant_columns'] (entirely empty or constant).\n"
                 "7. Reset the index after cleaning.\n\n"
                 "At the start, import:\n- pandas as pd\n- numpy as np\n\n"
                 "Output in EXACT format: a single fenced python block containing the function definition only.\n\n"
@@ -86,25 +140,162 @@ class Data_Cleaning_Node:
                 "    ...\n"
                 "```\n"
             ),
-            input_variables=["sample_text", "user_question"]
+            input_variables=["sample_text", "user_question", "feedback"]
         )
 
-        chain = unified_prompt | self.llm | PythonOutputParser()
-        raw = chain.invoke({
-            "sample_text": sample_text,
-            "user_question": state["question"]
-        })
+        return unified_prompt | self.llm | PythonOutputParser()
 
-        self.logger.info("Generated cleaning code length=%d", len(raw) if raw else 0)
-        return {"cleaning_code": raw}
+    def _feedback(self, state: PythonAnalystState) -> str:
+        """Validator findings from a rejected attempt, so the next generation fixes them."""
+        report = state.get("validation_report") or {}
+        if state.get("cleaned_or_not") != "Reject" or not report.get("issues"):
+            return ""
+        issues = "\n".join(f"- {issue}" for issue in report["issues"])
+        return f"The previous cleaning function was rejected by the data validator. Fix these problems:\n{issues}\n\n"
 
-    def execute_cleaning_code(self, state: PythonAnalystState) -> dict:
+    @staticmethod
+    def _is_retry(state: PythonAnalystState) -> bool:
+        return state.get("cleaned_or_not") == "Reject"
+
+    def generate_cleaning_code(self, state: PythonAnalystState) -> dict:
+        self._check_generation_inputs(state)
+        # token-budgeted digest (schema, null rates, top values, quantiles, stratified rows)
+        sample_text = build_prompt_context(state["raw_data"], "File", self.token_budget)
+
+        # a retry after a rejection must not get the rejected function back from the response cache
+        with bypass_response_cache(self._is_retry(state)):
+            raw = self._cleaning_chain().invoke({
+                "sample_text": sample_text,
+                "user_question": state["question"],
+                "feedback": self._feedback(state),
+            })
+
+            self.logger.info("Generated cleaning code length=%d", len(raw) if raw else 0)
+            # Rewrite row-wise patterns where safe, else regenerate once from the findings
+            review = review_code(raw, self.llm, "clean_data")
+        return {
+            "cleaning_code": review.code,
+            # one function for every table: drop per-table codes left by a rejected cache hit
+            "cleaning_codes": [],
+            "lint_findings": {"cleaning": review.summary()},
+            "cleaning_attempts": state.get("cleaning_attempts", 0) + 1,
+            "cleaning_from_cache": False,
+        }
+
+    async def agenerate_cleaning_code(self, state: PythonAnalystState) -> dict:
+        """
+        Async variant: tables are grouped by schema (column names + dtypes) and one cleaning function is
+        generated per group concurrently. With several groups, `cleaning_codes` maps each table to its code.
         """
-        Execute generated cleaning code, but first cast integer columns to float64 on the copy
-        passed into the generated clean_data(df) function to avoid 'incompatible dtype' warnings/errors.
+        self._check_generation_inputs(state)
+        raw_data = state["raw_data"]
+        groups: Dict[tuple, List[int]] = {}
+        for idx, df in enumerate(raw_data):
+            schema = tuple((str(c), str(t)) for c, t in df.dtypes.items())
+            groups.setdefault(schema, []).append(idx)
+
+        chain = self._cleaning_chain()
+        feedback = self._feedback(state)
+        with bypass_response_cache(self._is_retry(state)):
+            codes = await asyncio.gather(*(
+                chain.ainvoke({
+                    "sample_text": build_prompt_context([raw_data[i] for i in members], "File", self.token_budget),
+                    "user_question": state["question"],
+                    "feedback": feedback,
+                })
+                for members in groups.values()
+            ))
+
+            reviews = await asyncio.gather(*(areview_code(code, self.llm, "clean_data") for code in codes))
+        codes = [review.code for review in reviews]
+
+        cleaning_codes: List[str] = [""] * len(raw_data)
+        for members, code in zip(groups.values(), codes):
+            for i in members:
+                cleaning_codes[i] = code
+        self.logger.info("Generated %d cleaning function(s) for %d table(s)", len(codes), len(raw_data))
+        return {
+            "cleaning_code": codes[0],
+            "cleaning_codes": cleaning_codes if len(codes) > 1 else [],
+            "cleaning_attempts": state.get("cleaning_attempts", 0) + 1,
+            "cleaning_from_cache": False,
+            "lint_findings": {"cleaning": combined_summary(reviews)},
+        }
+
+    def _prepare_frame(self, df: pd.DataFrame, nullable_ints: bool = True) -> pd.DataFrame:
+        """
+        Return df ready for the generated clean_data(df) function. Integer columns become pandas
+        nullable integers of the same width (int8 -> Int8) so missing values fit without widening to
+        float64; with nullable_ints=False they are cast to float64 as before. Categoricals from dtype
+        compaction go back to plain strings, since the generated code may write values outside their
+        categories. Only the cast columns are converted: the sandbox ships the frame to its worker, so
+        df is never copied as a whole here.
         """
         import numpy as np
         import warnings
+
+        df = expand_categoricals(df)
+        if nullable_ints:
+            numpy_ints = df.select_dtypes(include=[np.integer]).columns.tolist()
+            if numpy_ints:
+                logger.info("Casting integer columns to nullable integer dtypes before running cleaning function: %s", numpy_ints)
+                # "int16" -> "Int16", "uint32" -> "UInt32"
+                df = df.astype({c: df[c].dtype.name.replace("uint", "UInt").replace("int", "Int") for c in numpy_ints})
+            return df
+
+        int_cols = []
+        try:
+            nullable_int_cols = df.select_dtypes(include=["Int8", "Int16", "Int32", "Int64", "UInt8", "UInt16", "UInt32", "UInt64"]).columns.tolist()
+        except Exception:
+            nullable_int_cols = []
+        numpy_ints = df.select_dtypes(include=[np.integer, "int64", "int32", "int16", "int8", "uint64", "uint32"]).columns.tolist()
+        for c in (nullable_int_cols + numpy_ints):
+            if c not in int_cols:
+                int_cols.append(c)
+
+        if int_cols:
+            logger.info("Casting integer-like columns to float64 before running cleaning function: %s", int_cols)
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", category=FutureWarning)
+                    df = df.astype(dict.fromkeys(int_cols, "float64"))
+            except Exception as cast_exc:
+                logger.warning("Casting int->float failed for columns %s: %s", int_cols, cast_exc)
+        return df
+
+    def _run_cleaning(self, code: str, df: pd.DataFrame, timings: Dict[str, float],
+                      table_stats: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Run clean_data in a sandbox worker on nullable-integer input, falling back to the float64 cast
+        if it rejects it. `table_stats` (the whole table's, also for a batch) reach the function as
+        df.attrs["table_stats"]. Compile/execute times of every attempt are added to `timings`.
+        """
+        def attempt(frame: pd.DataFrame) -> Any:
+            started = time.perf_counter()
+            try:
+                result = self.executor.run(code, frame, "clean_data", env_key="cleaning", runner=CLEANING_RUNNER,
+                                           return_frame=True, table_stats=table_stats)
+            finally:
+                timings["execute_seconds"] += time.perf_counter() - started
+            timings["compile_seconds"] += result.compile_seconds
+            timings["compiled_cache_hits"] += int(result.compiled_cached)
+            return result.value
+
+        try:
+            return attempt(self._prepare_frame(df))
+        except (TypeError, ValueError) as e:
+            # e.g. clipping an Int column to fractional IQR bounds
+            logger.info("Cleaning function rejected nullable integer input (%s); retrying with float64 columns", e)
+            return attempt(self._prepare_frame(df, nullable_ints=False))
+
+    def execute_cleaning_code(self, state: PythonAnalystState) -> dict:
+        """
+        Execute generated cleaning code on a prepared copy of every raw DataFrame, with tables spread
+        over the sandbox pool. Tables loaded in out-of-core mode are streamed through the function
+        batch by batch instead, with statistics and de-duplication computed over the whole table.
+        A table the function fails on keeps its raw data and gets its error in `cleaning_errors`,
+        which makes the validator reject it.
+        """
         logging.basicConfig(level=logging.INFO)
         logger = logging.getLogger(__name__)
 
@@ -114,80 +305,77 @@ class Data_Cleaning_Node:
             raise ValueError("Cleaning code not found in state")
 
         code = state["cleaning_code"]
+        per_table_codes = state.get("cleaning_codes") or []
+        source_tables = state.get("source_tables") or []
         cleaned_dfs: List[pd.DataFrame] = []
+        cleaned_tables: List[Any] = []
+        errors: List[Optional[str]] = []
+        timings = {"compile_seconds": 0.0, "execute_seconds": 0.0, "compiled_cache_hits": 0}
 
-        for i, df in enumerate(state["raw_data"], start=1):
-            if not isinstance(df, pd.DataFrame):
-                logger.warning("Item %s in raw_data is not a DataFrame, skipping...", i)
-                continue
+        def clean_table(item):
+            i, df = item
+            table = source_tables[i - 1] if i - 1 < len(source_tables) else None
+            table_timings = {"compile_seconds": 0.0, "execute_seconds": 0.0, "compiled_cache_hits": 0}
 
-            # Execute in isolated namespace to obtain the cleaning function
-            ns: dict = {}
-            try:
-                exec(code, ns, ns)
-            except Exception as e:
-                logger.error("Error executing cleaning code for DataFrame %s: %s", i, str(e))
-                logger.info("Appending original DataFrame %s due to exec error", i)
-                cleaned_dfs.append(df)
-                continue
+            # Workers compile once per distinct source; later tables and runs reuse the function
+            table_code = per_table_codes[i - 1] if i - 1 < len(per_table_codes) and per_table_codes[i - 1] else code
 
-            # Find function named clean_data first
-            cleaning_func = ns.get("clean_data")
-            if not callable(cleaning_func):
-                # fallback to any callable found
-                for val in ns.values():
-                    if callable(val):
-                        cleaning_func = val
-                        break
-
-            if not callable(cleaning_func):
-                logger.error("No callable cleaning function found in executed code for DataFrame %s", i)
-                cleaned_dfs.append(df)
-                continue
+            if table is not None:
+                # Out-of-core: stream the full table through the function, keep a bounded sample in state.
+                # IQR quartiles and constant columns come from DuckDB over the whole table, and
+                # drop_duplicates in a batch only sees that batch, so DuckDB redoes it over the output
+                try:
+                    plan = plan_batches(table_code)
+                    stats = table.cleaning_stats()
+                    cleaned_table = table.map_batches(
+                        lambda part: self._run_cleaning(table_code, part, table_timings, stats),
+                        distinct=plan.dedup, subset=plan.subset, keep=plan.keep,
+                    )
+                    logger.info("Successfully cleaned out-of-core table %s", table.name)
+                    return cleaned_table.sample(), cleaned_table, table_timings, None
+                except Exception as e:
+                    logger.error("Error running cleaning function on out-of-core table %s: %s", table.name, str(e))
+                    return df, None, table_timings, str(e)
 
             try:
-                df_copy = df.copy()
-                int_cols = []
-                try:
-                    nullable_ints = df_copy.select_dtypes(include=[pd.Int64Dtype()]).columns.tolist()
-                except Exception:
-                    nullable_ints = []
-                numpy_ints = df_copy.select_dtypes(include=[np.integer, "int64", "int32", "int16", "int8", "uint64", "uint32"]).columns.tolist()
-                for c in (nullable_ints + numpy_ints):
-                    if c not in int_cols:
-                        int_cols.append(c)
-
-                if int_cols:
-                    logger.info("Casting integer-like columns to float64 before running cleaning function: %s", int_cols)
-                    try:
-                        with warnings.catch_warnings():
-                            warnings.simplefilter("ignore", category=FutureWarning)
-                            df_copy[int_cols] = df_copy[int_cols].astype("float64")
-                    except Exception as cast_exc:
-                        logger.warning("Casting int->float failed for columns %s: %s", int_cols, cast_exc)
-
-                cleaned = cleaning_func(df_copy)
+                cleaned = self._run_cleaning(table_code, df, table_timings, frame_cleaning_stats(df))
 
                 if not isinstance(cleaned, pd.DataFrame):
                     raise ValueError("Cleaning function did not return a pandas DataFrame")
 
-                cleaned_dfs.append(cleaned)
                 logger.info("Successfully cleaned DataFrame %s", i)
+                return cleaned, None, table_timings, None
 
             except Exception as e:
                 logger.error("Error running cleaning function on DataFrame %s: %s", i, str(e))
                 logger.info("Appending original DataFrame %s due to runtime error", i)
-                cleaned_dfs.append(df)
+                return df, None, table_timings, str(e)
 
-        return {"cleaned_data": cleaned_dfs}
-    
-    def check(self,state:PythonAnalystState):
-        cleaned_preview = []
-        for i, df in enumerate(state.get("cleaned_data", []), start=1):
-            if isinstance(df, pd.DataFrame):
-                preview = dynamic_sample(df).to_string(index=False)
-                cleaned_preview.append(f"Table {i}:\n{preview}")
-        cleaned_summary = "\n\n".join(cleaned_preview)
+        items = []
+        for i, df in enumerate(state["raw_data"], start=1):
+            if not isinstance(df, pd.DataFrame):
+                logger.warning("Item %s in raw_data is not a DataFrame, skipping...", i)
+                continue
+            items.append((i, df))
+
+        # Tables are cleaned concurrently on the sandbox pool; results keep the upload order
+        for cleaned, cleaned_table, table_timings, error in self.executor.map(clean_table, items):
+            cleaned_dfs.append(cleaned)
+            cleaned_tables.append(cleaned_table)
+            errors.append(error)
+            for key, value in table_timings.items():
+                timings[key] += value
+
+        logger.info("Cleaning code: compile %.1f ms, execute %.1f ms",
+                    timings["compile_seconds"] * 1000, timings["execute_seconds"] * 1000)
+        return {"cleaned_data": cleaned_dfs, "cleaned_tables": cleaned_tables, "cleaning_errors": errors,
+                "execution_timings": {"cleaning": timings}}
+
+    async def aexecute_cleaning_code(self, state: PythonAnalystState) -> dict:
+        # CPU-bound pandas work: run it off the event loop
+        return await asyncio.to_thread(self.execute_cleaning_code, state)
+
+    def _check_chain(self):
         prompt = PromptTemplate(template=("You are a data quality inspector.\n\n"
         "Given this cleaned data: {cleaned_data}\n\n"
         "Determine whether it is properly cleaned.\n"
@@ -195,15 +383,45 @@ class Data_Cleaning_Node:
         "- 'Valid' if the data looks clean\n"
         "- 'Reject' if it still looks dirty and needs cleaning again."),
                                 input_variables=["cleaned_data"])
-        chain = prompt | self.router
-        response = chain.invoke({"cleaned_data":cleaned_summary})
-        return {"cleaned_or_not":response.route}
+        return prompt | self.router
+
+    def _rule_route(self, report: dict) -> str:
+        """Valid/Reject from the validator verdict, or "" when a borderline result goes to the LLM judge."""
+        verdict = report["verdict"]
+        if verdict == "Borderline":
+            return "" if self.llm_judge else "Valid"
+        return verdict
+
+    def check(self, state: PythonAnalystState):
+        """Rule-based quality gate (vectorized, no LLM call unless the judge is enabled and the result is borderline)."""
+        report = validate_tables(state.get("cleaned_data", []), state.get("cleaning_errors"))
+        route = self._rule_route(report)
+        if not route:
+            cleaned_summary = build_prompt_context(state.get("cleaned_data", []), "Table", self.token_budget)
+            route = self._check_chain().invoke({"cleaned_data": cleaned_summary}).route
+        self._update_code_cache(state, report, route)
+        self.logger.info("Validation verdict=%s route=%s issues=%s", report["verdict"], route, report["issues"])
+        return {"cleaned_or_not": route, "validation_report": report}
+
+    async def acheck(self, state: PythonAnalystState):
+        report = validate_tables(state.get("cleaned_data", []), state.get("cleaning_errors"))
+        route = self._rule_route(report)
+        if not route:
+            cleaned_summary = build_prompt_context(state.get("cleaned_data", []), "Table", self.token_budget)
+            route = (await self._check_chain().ainvoke({"cleaned_data": cleaned_summary})).route
+        self._update_code_cache(state, report, route)
+        self.logger.info("Validation verdict=%s route=%s issues=%s", report["verdict"], route, report["issues"])
+        return {"cleaned_or_not": route, "validation_report": report}
     
     def next_route(self, state: PythonAnalystState):
         logger.info(f"[Routing Decision] Cleaned status = {state['cleaned_or_not']}")
                     
         if state["cleaned_or_not"] == "Valid":
             return "Valid"
+        if state.get("cleaning_attempts", 0) >= self.max_cleaning_attempts:
+            logger.warning("Cleaning retry budget (%d attempts) exhausted; continuing with the last cleaned data",
+                           self.max_cleaning_attempts)
+            return "Valid"
         else:
             return "Reject"
         
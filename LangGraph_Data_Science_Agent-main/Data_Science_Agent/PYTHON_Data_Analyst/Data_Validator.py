@@ -0,0 +1,149 @@
+import logging
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rules other than the duplicate check run on a sample of at most this many rows
+VALIDATION_ROWS = 250_000
+
+# Outliers are counted beyond Tukey's far-out fences (Q1 - 3 IQR, Q3 + 3 IQR), not the 1.5 IQR fences the
+# cleaning step clips to: its quartiles come from the whole table (or DuckDB's approximate quantiles), so
+# clipped values pile up around fences that differ slightly from this sample's, and a skewed column clipped
+# correctly would still show ~8% "outliers" at 1.5 IQR. Beyond 3 IQR only unclipped values remain; a
+# column that was never clipped shows ~1% (exponential) to ~3% (lognormal) there, at most borderline, and
+# only heavier tails (~5% for Pareto, alpha=2) reach the reject threshold.
+OUTLIER_IQR_K = 3.0
+
+# rule -> (warn, fail): a metric above `warn` is borderline, above `fail` rejects the table
+THRESHOLDS: Dict[str, Tuple[float, float]] = {
+    "null_rate": (0.0, 0.01),           # share of missing cells left after cleaning
+    "duplicate_rate": (0.0, 0.01),      # share of exact duplicate rows
+    "mixed_type_columns": (0, 0),       # object columns holding more than one kind of value
+    "outlier_rate": (0.01, 0.05),       # worst per-column share of values beyond the far-out fences
+    "constant_columns": (0, 1),         # columns with a single distinct value
+}
+
+VERDICTS = ("Valid", "Borderline", "Reject")
+
+
+def _duplicate_rate(df: pd.DataFrame) -> float:
+    if len(df) < 2:
+        return 0.0
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+    return float(hashes.duplicated().mean())
+
+
+def _mixed_type_columns(df: pd.DataFrame) -> List[str]:
+    mixed = []
+    for i, name in enumerate(df.columns):
+        col = df.iloc[:, i]
+        if col.dtype == object and pd.api.types.infer_dtype(col, skipna=True).startswith("mixed"):
+            mixed.append(str(name))
+    return mixed
+
+
+def _outlier_rates(df: pd.DataFrame, k: float = OUTLIER_IQR_K) -> Dict[str, float]:
+    """Per-column share of values outside [Q1 - k*IQR, Q3 + k*IQR], computed on one float64 block."""
+    numeric = df.select_dtypes(include="number")
+    if numeric.empty:
+        return {}
+    values = numeric.to_numpy(dtype="float64", na_value=np.nan)
+    with warnings.catch_warnings(), np.errstate(invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        q1, q3 = np.nanpercentile(values, [25, 75], axis=0)
+        iqr = q3 - q1
+        outside = (values < q1 - k * iqr) | (values > q3 + k * iqr)
+        counts = np.count_nonzero(~np.isnan(values), axis=0)
+        rates = np.where(counts > 0, outside.sum(axis=0) / np.maximum(counts, 1), 0.0)
+    return {str(c): float(r) for c, r in zip(numeric.columns, rates)}
+
+
+def _constant_columns(df: pd.DataFrame) -> List[str]:
+    if len(df) < 2:
+        return []
+    constant = []
+    for i, name in enumerate(df.columns):
+        col = df.iloc[:, i]
+        first = col.iloc[0]
+        # Compare against the first value instead of counting distinct values (no hashing)
+        try:
+            if pd.isna(first):
+                same = bool(col.isna().all())
+            else:
+                same = bool(col.notna().all() and (col == first).all())
+        except (TypeError, ValueError):
+            continue  # unhashable / array-like cells
+        if same:
+            constant.append(str(name))
+    return constant
+
+
+def validate_frame(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Rule-based quality report for one cleaned table: residual nulls, duplicate rate, mixed-type columns,
+    far-out IQR outliers left after clipping and constant columns. Returns the metrics, the human-readable
+    issues and a verdict ("Valid", "Borderline" or "Reject") from `THRESHOLDS`.
+    """
+    # Duplicates are counted on the full table: sampling would hide most duplicate pairs
+    duplicate_rate = _duplicate_rate(df)
+    if len(df) > VALIDATION_ROWS:
+        df = df.sample(n=VALIDATION_ROWS, random_state=42)
+
+    null_rate = float(df.isna().to_numpy().mean()) if df.size else 0.0
+    outliers = _outlier_rates(df)
+    worst_outlier = max(outliers.items(), key=lambda kv: kv[1], default=(None, 0.0))
+    mixed = _mixed_type_columns(df)
+    constant = _constant_columns(df)
+    metrics = {
+        "rows": int(len(df)),
+        "null_rate": null_rate,
+        "duplicate_rate": duplicate_rate,
+        "mixed_type_columns": len(mixed),
+        "outlier_rate": worst_outlier[1],
+        "constant_columns": len(constant),
+    }
+    details = {
+        "null_rate": f"{null_rate:.2%} of cells are missing",
+        "duplicate_rate": f"{metrics['duplicate_rate']:.2%} of rows are duplicates",
+        "mixed_type_columns": f"mixed-type columns: {', '.join(mixed)}",
+        "outlier_rate": f"{worst_outlier[1]:.2%} of `{worst_outlier[0]}` lies beyond {OUTLIER_IQR_K:g} IQR of the quartiles",
+        "constant_columns": f"constant columns: {', '.join(constant)}",
+    }
+
+    level = 0
+    issues = []
+    if df.empty:
+        level, issues = 2, ["cleaning removed every row"]
+    for rule, (warn, fail) in THRESHOLDS.items():
+        value = metrics[rule]
+        if value > fail:
+            level = 2
+            issues.append(details[rule])
+        elif value > warn:
+            level = max(level, 1)
+            issues.append(details[rule] + " (borderline)")
+    return {"verdict": VERDICTS[level], "issues": issues, "metrics": metrics}
+
+
+def validate_tables(frames: List[pd.DataFrame], errors: Optional[List[Optional[str]]] = None) -> Dict[str, Any]:
+    """
+    Validate every cleaned table; the overall verdict is the worst per-table verdict. A table whose
+    cleaning function failed (`errors`, aligned with `frames`) still holds its raw data and is rejected.
+    """
+    tables = [validate_frame(df) for df in frames or [] if isinstance(df, pd.DataFrame)]
+    for table, error in zip(tables, errors or []):
+        if error:
+            table["verdict"] = "Reject"
+            table["issues"].insert(0, f"the cleaning function failed: {error}")
+    if not tables:
+        return {"verdict": "Reject", "issues": ["no cleaned tables"], "tables": []}
+    verdict = max((t["verdict"] for t in tables), key=VERDICTS.index)
+    issues = [f"Table {i}: {issue}" for i, t in enumerate(tables, start=1) for issue in t["issues"]]
+    return {"verdict": verdict, "issues": issues, "tables": tables}
@@ -0,0 +1,294 @@
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Mergeable one-pass statistics for chunked EDA. Every accumulator has `update(...)` for a new chunk
+# and `merge(other)` for the partial result of another worker; merging is associative, so chunks can
+# be split across workers in any order.
+
+
+class Moments:
+    """Count, mean, M2 (Welford/Chan parallel form), min and max of one numeric column."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _combine(self, n: int, mean: float, m2: float, lo: float, hi: float) -> None:
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+    def update(self, valid: np.ndarray) -> None:
+        """valid: float64 values of the chunk with NaNs removed."""
+        if valid.size:
+            mean = float(valid.mean())
+            self._combine(int(valid.size), mean, float(np.square(valid - mean).sum()),
+                          float(valid.min()), float(valid.max()))
+
+    def merge(self, other: "Moments") -> None:
+        self._combine(other.n, other.mean, other.m2, other.min, other.max)
+
+    @property
+    def std(self) -> Optional[float]:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else None
+
+
+class KLL_Sketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty). Level h holds items of weight 2**h; a full level is
+    sorted and every other item (random offset) is promoted. Rank error is about 1.7 / k with high
+    probability, independent of the stream length; memory is O(k).
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # an odd item stays behind so the promoted half has exactly double weight
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[int(self._rng.integers(2))::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, valid: np.ndarray) -> None:
+        if valid.size:
+            self.n += int(valid.size)
+            self.levels[0] = np.concatenate([self.levels[0], valid.astype("float64", copy=False)])
+            self._compress()
+
+    def merge(self, other: "KLL_Sketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_h), 2.0 ** h) for h, items_h in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        items, cumulative = self._weighted()
+        if not len(items):
+            return np.full(len(qs), np.nan)
+        targets = np.asarray(qs) * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, targets), len(items) - 1)]
+
+    def rank(self, x: float, inclusive: bool = True) -> float:
+        """Estimated fraction of values <= x (or < x with inclusive=False)."""
+        items, cumulative = self._weighted()
+        if not len(items):
+            return 0.0
+        pos = np.searchsorted(items, x, side="right" if inclusive else "left")
+        return float(cumulative[pos - 1] / cumulative[-1]) if pos else 0.0
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over 64-bit hashes; relative error about 1.04 / sqrt(2**p)."""
+
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        if not hashes.size:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # position of the leftmost 1-bit in the remaining 64-p bits (frexp exponent = bit length)
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rho = (64 - self.p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rho)
+
+    def update(self, values) -> None:
+        """values: a Series or Index; equal values hash equally across chunks and workers."""
+        self.update_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = float(len(self.registers))
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            raw = m * math.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(raw))
+
+
+class Heavy_Hitters:
+    """
+    Misra-Gries summary of the most frequent values: keeps at most `capacity` counters, and every
+    kept count underestimates the true count by at most n / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="float64")
+        # reported when every counter cancelled out (all values about equally rare)
+        self.fallback = None
+
+    def _absorb(self, counts: pd.Series) -> None:
+        combined = self.counts.add(counts.astype("float64"), fill_value=0.0) if len(self.counts) else counts.astype("float64")
+        if len(combined) > self.capacity:
+            cut = combined.nlargest(self.capacity + 1).iloc[-1]
+            combined = combined[combined > cut] - cut
+        self.counts = combined
+
+    def update(self, value_counts: pd.Series) -> None:
+        """value_counts: counts of the chunk's distinct values."""
+        if len(value_counts):
+            if self.fallback is None:
+                self.fallback = value_counts.index[0]
+            self._absorb(value_counts)
+
+    def merge(self, other: "Heavy_Hitters") -> None:
+        if self.fallback is None:
+            self.fallback = other.fallback
+        if len(other.counts):
+            self._absorb(other.counts)
+
+    def top(self):
+        if not len(self.counts):
+            return (self.fallback, 1) if self.fallback is not None else (None, 0)
+        label = self.counts.idxmax()
+        return label, int(self.counts[label])
+
+
+class Co_Moments:
+    """
+    Pairwise-complete co-moment sums for k columns: for every pair (i, j) the row count where both are
+    present, the sums of column i and of its squares over those rows, and the cross products. Values are
+    shifted by a per-column reference (the first chunk's means) for numerical stability; partials with
+    different shifts are rebased before they are added. Until a block with missing values arrives every
+    pair sees the same rows, so the count is a scalar and the per-column sums are vectors; they are
+    expanded to (k, k) matrices on the first NaN. Blocks may be float32 (products are computed in the
+    block's dtype and accumulated in float64).
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.shift: Optional[np.ndarray] = None
+        self.pairwise = False
+        self.count = 0.0
+        self.sum_x = np.zeros(k)       # pairwise: [i, j] = sum of column i over rows where i and j are present
+        self.sum_xx = np.zeros(k)
+        self.sum_xy = np.zeros((k, k))
+
+    def _expand(self) -> None:
+        if not self.pairwise:
+            self.count = np.full((self.k, self.k), float(self.count))
+            self.sum_x = np.repeat(self.sum_x[:, None], self.k, axis=1)
+            self.sum_xx = np.repeat(self.sum_xx[:, None], self.k, axis=1)
+            self.pairwise = True
+
+    def update(self, x: np.ndarray, shifted: bool = False) -> None:
+        """
+        x: (rows, k) block with NaN for missing values; modified in place. With shifted=True the caller
+        has already subtracted self.shift.
+        """
+        if not len(x):
+            return
+        if self.shift is None:
+            self.shift = np.array([np.nanmean(c) if np.isfinite(c).any() else 0.0 for c in x.T])
+        if not shifted:
+            x -= self.shift.astype(x.dtype)
+        mask = ~np.isnan(x)
+        if mask.all():
+            # no missing values in this block: every pair sees every row
+            if self.pairwise:
+                self.count += len(x)
+                self.sum_x += x.sum(axis=0, dtype="float64")[:, None]
+                self.sum_xx += np.einsum("ij,ij->j", x, x, dtype="float64")[:, None]
+            else:
+                self.count += len(x)
+                self.sum_x += x.sum(axis=0, dtype="float64")
+                self.sum_xx += np.einsum("ij,ij->j", x, x, dtype="float64")
+            self.sum_xy += x.T @ x
+            return
+        self._expand()
+        m = mask.astype(x.dtype)
+        np.copyto(x, 0, where=~mask)
+        self.count += m.T @ m
+        self.sum_x += x.T @ m
+        self.sum_xx += (x * x).T @ m
+        self.sum_xy += x.T @ x
+
+    def _rebase(self, shift: np.ndarray) -> None:
+        """Express the sums relative to `shift` instead of self.shift."""
+        d = self.shift - shift
+        if self.pairwise:
+            di, dj = d[:, None], d[None, :]
+            self.sum_xy += dj * self.sum_x + di * self.sum_x.T + di * dj * self.count
+            self.sum_xx += 2 * di * self.sum_x + di * di * self.count
+            self.sum_x += di * self.count
+        else:
+            self.sum_xy += np.outer(self.sum_x, d) + np.outer(d, self.sum_x) + self.count * np.outer(d, d)
+            self.sum_xx += 2 * d * self.sum_x + d * d * self.count
+            self.sum_x += d * self.count
+        self.shift = shift.copy()
+
+    def merge(self, other: "Co_Moments") -> None:
+        """Fold in another partial; `other` is consumed (its sums are rebased in place)."""
+        if other.shift is None:
+            return
+        if self.shift is None:
+            self.__dict__.update(other.__dict__)
+            return
+        if self.pairwise or other.pairwise:
+            self._expand()
+            other._expand()
+        other._rebase(self.shift)
+        self.count += other.count
+        self.sum_x += other.sum_x
+        self.sum_xx += other.sum_xx
+        self.sum_xy += other.sum_xy
+
+    def correlation(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if self.pairwise:
+                cov = self.sum_xy - self.sum_x * self.sum_x.T / self.count
+                var_i = self.sum_xx - self.sum_x ** 2 / self.count
+                corr = cov / np.sqrt(var_i * var_i.T)
+                corr[self.count < 2] = np.nan
+                return corr
+            if self.count < 2:
+                return np.full((self.k, self.k), np.nan)
+            corr = self.sum_xy - np.outer(self.sum_x, self.sum_x / self.count)
+            std = np.sqrt(self.sum_xx - self.sum_x ** 2 / self.count)
+            corr /= std[:, None]
+            corr /= std[None, :]
+            return corr
@@ -0,0 +1,455 @@
+import re
+import logging
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from Data_Science_Agent.PYTHON_Data_Analyst.Correlation_Engine import (
+    CORRELATION_THRESHOLD, accumulate, correlation_report, extract_pairs,
+)
+from Data_Science_Agent.PYTHON_Data_Analyst.EDA_Accumulators import (
+    Co_Moments, Heavy_Hitters, HyperLogLog, KLL_Sketch, Moments,
+)
+
+logger = logging.getLogger(__name__)
+
+IQR_K = 1.5
+MAX_TOP_VALUES = 5
+
+# Column-name hints for the suspicious-value checks
+NON_NEGATIVE_HINT = re.compile(
+    r"age|price|cost|amount|qty|quantity|count|salary|income|revenue|sales|weight|height|distance|duration",
+    re.IGNORECASE)
+POSITIVE_HINT = re.compile(r"price|cost", re.IGNORECASE)
+AGE_HINT = re.compile(r"(^|_)age($|_)", re.IGNORECASE)
+SENTINELS = np.array([-99999, -9999, -999, 999, 9999, 99999, 999999], dtype="float64")
+PLACEHOLDERS = {"", "na", "n/a", "nan", "null", "none", "-", "--", "?", "unknown", "missing", "undefined"}
+
+
+def _numeric_column(name: str, values: np.ndarray) -> Dict[str, Any]:
+    """describe() block, IQR outlier count and suspicious values for one float64 column."""
+    valid = values[~np.isnan(values)]
+    if valid.size == 0:
+        return {"describe": {"count": 0}, "outliers_iqr": 0, "suspicious": {}, "distinct_le_1": True}
+
+    q1, q2, q3 = np.percentile(valid, [25, 50, 75])
+    lo, hi = float(valid.min()), float(valid.max())
+    iqr = q3 - q1
+    describe = {
+        "count": int(valid.size),
+        "mean": float(valid.mean()),
+        "std": float(valid.std(ddof=1)) if valid.size > 1 else None,
+        "min": lo, "25%": float(q1), "50%": float(q2), "75%": float(q3), "max": hi,
+    }
+    outliers = int(np.count_nonzero((valid < q1 - IQR_K * iqr) | (valid > q3 + IQR_K * iqr)))
+
+    suspicious: Dict[str, Any] = {}
+    if NON_NEGATIVE_HINT.search(name) and lo < 0:
+        suspicious["negative_values"] = int(np.count_nonzero(valid < 0))
+    if POSITIVE_HINT.search(name) and lo <= 0:
+        suspicious["non_positive_values"] = int(np.count_nonzero(valid <= 0))
+    if AGE_HINT.search(name) and hi > 120:
+        suspicious["age_above_120"] = int(np.count_nonzero(valid > 120))
+    # placeholder codes such as -999 / 9999 sitting at the extremes of the column
+    for sentinel in SENTINELS[(SENTINELS == lo) | (SENTINELS == hi)]:
+        suspicious.setdefault("sentinel_values", {})[str(int(sentinel))] = int(np.count_nonzero(valid == sentinel))
+    return {"describe": describe, "outliers_iqr": outliers, "suspicious": suspicious, "distinct_le_1": lo == hi}
+
+
+def _other_column(s: pd.Series) -> Dict[str, Any]:
+    """describe() block and suspicious values for a non-numeric column, from one value_counts pass."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        valid = s.dropna()
+        describe = {"count": int(valid.size)}
+        suspicious: Dict[str, Any] = {}
+        if valid.size:
+            describe.update({"min": str(valid.min()), "max": str(valid.max())})
+            now = pd.Timestamp.now(tz=valid.dt.tz)
+            future = int((valid > now).sum())
+            if future:
+                suspicious["future_dates"] = future
+        return {"describe": describe, "suspicious": suspicious,
+                "distinct_le_1": valid.size == 0 or valid.min() == valid.max()}
+
+    try:
+        counts = s.value_counts(dropna=True)
+    except TypeError:  # unhashable cells (lists, dicts)
+        return {"describe": {"count": int(s.notna().sum())}, "suspicious": {}, "distinct_le_1": False}
+
+    describe = {
+        "count": int(counts.sum()),
+        "unique": int(counts.size),
+        "top": str(counts.index[0]) if counts.size else None,
+        "freq": int(counts.iloc[0]) if counts.size else 0,
+    }
+    suspicious = {}
+    # Checks run on the distinct values only and are weighted by their counts
+    labels = pd.Series(counts.index.astype(str), index=counts.index)
+    stripped = labels.str.strip()
+    placeholder = stripped.str.lower().isin(PLACEHOLDERS).to_numpy()
+    if placeholder.any():
+        suspicious["placeholder_values"] = {
+            str(k): int(v) for k, v in counts[placeholder].head(MAX_TOP_VALUES).items()}
+    padded = (stripped != labels).to_numpy() & ~placeholder
+    if padded.any():
+        suspicious["untrimmed_whitespace"] = int(counts[padded].sum())
+    return {"describe": describe, "suspicious": suspicious, "distinct_le_1": counts.size <= 1}
+
+
+def standard_eda(df: pd.DataFrame, correlation_method: str = "exact") -> Dict[str, Any]:
+    """
+    The fixed EDA checklist, computed natively instead of by generated code: shape, dtypes, describe,
+    missing counts, IQR outlier counts, |corr| > 0.5 pairs, constant and mixed-type columns and
+    suspicious values (negative amounts/ages, non-positive prices, sentinel codes, future dates,
+    placeholder strings). Every numeric column is converted to float64 once and all statistics are
+    read from that array. correlation_method is passed to correlation_report; approximate methods add
+    a "correlation_approximation" entry with the error bound. Returns plain Python types only.
+    """
+    names = [str(c) for c in df.columns]
+    result: Dict[str, Any] = {
+        "shape": [int(df.shape[0]), int(df.shape[1])],
+        "dtypes": {name: str(dtype) for name, dtype in zip(names, df.dtypes)},
+        "missing_counts": {name: int(v) for name, v in zip(names, df.isna().sum().to_numpy())},
+    }
+
+    describe: Dict[str, Any] = {}
+    outliers: Dict[str, int] = {}
+    suspicious: Dict[str, Any] = {}
+    constant: List[str] = []
+    mixed: List[str] = []
+    numeric_names: List[str] = []
+    numeric_values: List[np.ndarray] = []
+
+    for i, name in enumerate(names):
+        s = df.iloc[:, i]
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            values = s.to_numpy(dtype="float64", na_value=np.nan)
+            stats = _numeric_column(name, values)
+            numeric_names.append(name)
+            numeric_values.append(values)
+            outliers[name] = stats["outliers_iqr"]
+        else:
+            if s.dtype == object and pd.api.types.infer_dtype(s, skipna=True).startswith("mixed"):
+                mixed.append(name)
+            stats = _other_column(s)
+        describe[name] = stats["describe"]
+        if stats["suspicious"]:
+            suspicious[name] = stats["suspicious"]
+        if stats["distinct_le_1"] and len(df) > 1:
+            constant.append(name)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        correlations = correlation_report(numeric_names, numeric_values, method=correlation_method)
+
+    result.update({
+        "describe": describe,
+        "outliers_iqr": outliers,
+        "high_correlations": correlations["pairs"],
+        "constant_columns": constant,
+        "mixed_type_columns": mixed,
+        "suspicious_values": suspicious,
+    })
+    if correlations["method"] != "exact":
+        result["correlation_approximation"] = {"method": correlations["method"],
+                                               "error_bound": correlations["error_bound"]}
+    return result
+
+
+# ---------------------------------------------------------------------------------------------------
+# Chunked mode: the same checklist from one pass over row chunks, for sources too big to hold in memory.
+# Exact: shape, dtypes, missing counts, count/mean/std/min/max, suspicious-value counts, placeholder and
+# whitespace counts, mixed types and correlations. Estimated: quartiles (KLL), IQR outlier counts (from
+# the sketch ranks), distinct counts (HyperLogLog) and the top value's frequency (Misra-Gries).
+# ---------------------------------------------------------------------------------------------------
+
+# Rows per chunk when an in-memory frame is processed in chunked mode
+CHUNK_ROWS = 250_000
+KLL_K = 1024
+ESTIMATED_FIELDS = ["describe.25%", "describe.50%", "describe.75%", "describe.unique", "describe.freq",
+                    "outliers_iqr"]
+
+
+class _Numeric_Accumulator:
+    def __init__(self, name: str):
+        self.name = name
+        self.moments = Moments()
+        self.sketch = KLL_Sketch(KLL_K)
+        self.negative = 0
+        self.non_positive = 0
+        self.above_120 = 0
+        self.sentinels = np.zeros(len(SENTINELS), dtype="int64")
+
+    def update(self, values: np.ndarray) -> None:
+        valid = values[~np.isnan(values)]
+        self.moments.update(valid)
+        self.sketch.update(valid)
+        self.negative += int(np.count_nonzero(valid < 0))
+        self.non_positive += int(np.count_nonzero(valid <= 0))
+        self.above_120 += int(np.count_nonzero(valid > 120))
+        candidates = valid[np.isin(valid, SENTINELS)]
+        if candidates.size:
+            self.sentinels += (candidates[:, None] == SENTINELS).sum(axis=0)
+
+    def merge(self, other: "_Numeric_Accumulator") -> None:
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self.negative += other.negative
+        self.non_positive += other.non_positive
+        self.above_120 += other.above_120
+        self.sentinels += other.sentinels
+
+    def result(self) -> Dict[str, Any]:
+        m = self.moments
+        if m.n == 0:
+            return {"describe": {"count": 0}, "outliers_iqr": 0, "suspicious": {}, "distinct_le_1": True}
+        q1, q2, q3 = self.sketch.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        below = self.sketch.rank(q1 - IQR_K * iqr, inclusive=False)
+        above = 1.0 - self.sketch.rank(q3 + IQR_K * iqr)
+        describe = {
+            "count": m.n, "mean": m.mean, "std": m.std,
+            "min": m.min, "25%": float(q1), "50%": float(q2), "75%": float(q3), "max": m.max,
+        }
+        suspicious: Dict[str, Any] = {}
+        if NON_NEGATIVE_HINT.search(self.name) and self.negative:
+            suspicious["negative_values"] = self.negative
+        if POSITIVE_HINT.search(self.name) and self.non_positive:
+            suspicious["non_positive_values"] = self.non_positive
+        if AGE_HINT.search(self.name) and self.above_120:
+            suspicious["age_above_120"] = self.above_120
+        for sentinel, n in zip(SENTINELS, self.sentinels):
+            if sentinel in (m.min, m.max):
+                suspicious.setdefault("sentinel_values", {})[str(int(sentinel))] = int(n)
+        return {"describe": describe, "outliers_iqr": int(round((below + above) * m.n)),
+                "suspicious": suspicious, "distinct_le_1": m.min == m.max}
+
+
+class _Datetime_Accumulator:
+    def __init__(self, name: str):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.future = 0
+
+    def _extend(self, count: int, lo, hi, future: int) -> None:
+        if count:
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        self.count += count
+        self.future += future
+
+    def update(self, s: pd.Series) -> None:
+        valid = s.dropna()
+        if valid.size:
+            now = pd.Timestamp.now(tz=valid.dt.tz)
+            self._extend(int(valid.size), valid.min(), valid.max(), int((valid > now).sum()))
+
+    def merge(self, other: "_Datetime_Accumulator") -> None:
+        self._extend(other.count, other.min, other.max, other.future)
+
+    def result(self) -> Dict[str, Any]:
+        describe: Dict[str, Any] = {"count": self.count}
+        if self.count:
+            describe.update({"min": str(self.min), "max": str(self.max)})
+        suspicious = {"future_dates": self.future} if self.future else {}
+        return {"describe": describe, "suspicious": suspicious,
+                "distinct_le_1": self.count == 0 or self.min == self.max}
+
+
+class _Other_Accumulator:
+    def __init__(self, name: str):
+        self.count = 0
+        self.unhashable = False
+        self.distinct = HyperLogLog()
+        self.frequent = Heavy_Hitters()
+        self.placeholders = pd.Series(dtype="int64")
+        self.untrimmed = 0
+        self.kinds: set = set()
+
+    def update(self, s: pd.Series) -> None:
+        if s.dtype == object:
+            self.kinds.add(pd.api.types.infer_dtype(s, skipna=True))
+        try:
+            counts = s.value_counts(dropna=True)
+        except TypeError:  # unhashable cells (lists, dicts)
+            self.unhashable = True
+            self.count += int(s.notna().sum())
+            return
+        self.count += int(counts.sum())
+        self.distinct.update(counts.index)
+        self.frequent.update(counts)
+        labels = pd.Series(counts.index.astype(str), index=counts.index)
+        stripped = labels.str.strip()
+        placeholder = stripped.str.lower().isin(PLACEHOLDERS).to_numpy()
+        if placeholder.any():
+            found = pd.Series(counts[placeholder].to_numpy(), index=labels[placeholder].to_numpy())
+            self.placeholders = self.placeholders.add(found, fill_value=0).astype("int64")
+        self.untrimmed += int(counts[(stripped != labels).to_numpy() & ~placeholder].sum())
+
+    def merge(self, other: "_Other_Accumulator") -> None:
+        self.count += other.count
+        self.unhashable |= other.unhashable
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        self.placeholders = self.placeholders.add(other.placeholders, fill_value=0).astype("int64")
+        self.untrimmed += other.untrimmed
+        self.kinds |= other.kinds
+
+    @property
+    def mixed(self) -> bool:
+        kinds = self.kinds - {"empty"}
+        return any(k.startswith("mixed") for k in kinds) or len(kinds) > 1
+
+    def result(self) -> Dict[str, Any]:
+        if self.unhashable:
+            return {"describe": {"count": self.count}, "suspicious": {}, "distinct_le_1": False}
+        unique = min(self.distinct.estimate(), self.count)
+        top, freq = self.frequent.top()
+        describe = {"count": self.count, "unique": unique,
+                    "top": str(top) if top is not None else None, "freq": freq}
+        suspicious: Dict[str, Any] = {}
+        if len(self.placeholders):
+            top_placeholders = self.placeholders.sort_values(ascending=False).head(MAX_TOP_VALUES)
+            suspicious["placeholder_values"] = {str(k): int(v) for k, v in top_placeholders.items()}
+        if self.untrimmed:
+            suspicious["untrimmed_whitespace"] = self.untrimmed
+        return {"describe": describe, "suspicious": suspicious, "distinct_le_1": unique <= 1}
+
+
+class Table_Accumulator:
+    """
+    Mergeable state of the EDA checklist for one table. `update(chunk)` folds in a row chunk, `merge(other)`
+    folds in the partial result of another worker, and `result()` returns the same dict as standard_eda
+    plus a "chunked" entry listing the estimated fields.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.names: Optional[List[str]] = None
+
+    def _start(self, chunk: pd.DataFrame) -> None:
+        self.names = [str(c) for c in chunk.columns]
+        self.dtypes = {name: str(dtype) for name, dtype in zip(self.names, chunk.dtypes)}
+        self.nulls = np.zeros(len(self.names), dtype="int64")
+        self.columns: List[Any] = []
+        self.numeric: List[int] = []
+        for i, name in enumerate(self.names):
+            s = chunk.iloc[:, i]
+            if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+                self.numeric.append(i)
+                self.columns.append(_Numeric_Accumulator(name))
+            elif pd.api.types.is_datetime64_any_dtype(s):
+                self.columns.append(_Datetime_Accumulator(name))
+            else:
+                self.columns.append(_Other_Accumulator(name))
+        self.correlation = Co_Moments(len(self.numeric))
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if self.names is None:
+            self._start(chunk)
+        self.rows += len(chunk)
+        self.chunks += 1
+        self.nulls += chunk.isna().sum().to_numpy(dtype="int64")
+        block = []
+        for i, column in enumerate(self.columns):
+            s = chunk.iloc[:, i]
+            if isinstance(column, _Numeric_Accumulator):
+                values = s.to_numpy(dtype="float64", na_value=np.nan)
+                column.update(values)
+                block.append(values)
+            else:
+                column.update(s)
+        if len(block) > 1:
+            accumulate(self.correlation, block)
+
+    def merge(self, other: "Table_Accumulator") -> None:
+        if other.names is None:
+            return
+        if self.names is None:
+            self.__dict__.update(other.__dict__)
+            return
+        self.rows += other.rows
+        self.chunks += other.chunks
+        self.nulls += other.nulls
+        for column, partial in zip(self.columns, other.columns):
+            column.merge(partial)
+        self.correlation.merge(other.correlation)
+
+    def result(self) -> Dict[str, Any]:
+        if self.names is None:
+            return standard_eda(pd.DataFrame())
+        describe: Dict[str, Any] = {}
+        outliers: Dict[str, int] = {}
+        suspicious: Dict[str, Any] = {}
+        constant: List[str] = []
+        for name, column in zip(self.names, self.columns):
+            stats = column.result()
+            describe[name] = stats["describe"]
+            if "outliers_iqr" in stats:
+                outliers[name] = stats["outliers_iqr"]
+            if stats["suspicious"]:
+                suspicious[name] = stats["suspicious"]
+            if stats["distinct_le_1"] and self.rows > 1:
+                constant.append(name)
+        numeric_names = [self.names[i] for i in self.numeric]
+        pairs = []
+        if len(numeric_names) > 1:
+            pairs = extract_pairs(numeric_names, self.correlation.correlation(), CORRELATION_THRESHOLD)
+        return {
+            "shape": [self.rows, len(self.names)],
+            "dtypes": self.dtypes,
+            "missing_counts": {name: int(v) for name, v in zip(self.names, self.nulls)},
+            "describe": describe,
+            "outliers_iqr": outliers,
+            "high_correlations": pairs,
+            "constant_columns": constant,
+            "mixed_type_columns": [name for name, column in zip(self.names, self.columns)
+                                   if isinstance(column, _Other_Accumulator) and column.mixed],
+            "suspicious_values": suspicious,
+            "chunked": {"chunks": self.chunks, "estimated": ESTIMATED_FIELDS},
+        }
+
+
+def frame_chunks(df: pd.DataFrame, rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Row slices of an in-memory frame (views, no copies)."""
+    for start in range(0, max(len(df), 1), rows):
+        yield df.iloc[start:start + rows]
+
+
+def chunked_eda(chunks: Iterable[pd.DataFrame], workers: int = 1) -> Dict[str, Any]:
+    """
+    The standard_eda checklist computed chunk by chunk. `workers` threads pull chunks from the shared
+    iterator, each folding them into its own Table_Accumulator, and the partials are merged at the end;
+    only the chunks in flight are held in memory.
+    """
+    source = iter(chunks)
+    lock = threading.Lock()
+
+    def work(_) -> Table_Accumulator:
+        accumulator = Table_Accumulator()
+        while True:
+            with lock:
+                chunk = next(source, None)
+            if chunk is None:
+                return accumulator
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN chunks
+                accumulator.update(chunk)
+
+    if workers <= 1:
+        partials = [work(0)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(work, range(workers)))
+    total = Table_Accumulator()
+    for partial in partials:
+        total.merge(partial)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return total.result()
@@ -1,21 +1,63 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import os
 import re
+import time
+import asyncio
 import logging
-from typing import Literal
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import BaseOutputParser,JsonOutputParser
 from Data_Science_Agent.STATE.Python_Analyst_State import PythonAnalystState
+from Data_Science_Agent.PYTHON_Data_Analyst.Context_Builder import DEFAULT_TOKEN_BUDGET, build_prompt_context
+from Data_Science_Agent.ENGINE.Sandbox_Executor import get_sandbox_executor
+from Data_Science_Agent.PYTHON_Data_Analyst.Code_Linter import Lint_Result, areview_code, review_code
+from Data_Science_Agent.PYTHON_Data_Analyst.EDA_Engine import chunked_eda, frame_chunks, standard_eda
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def dynamic_sample(df: pd.DataFrame, random_state: int = 42) -> pd.DataFrame:
-    n = len(df)
-    frac = 1.0 if n < 10_000 else 0.1 if n < 100_000 else 0.03 if n < 1_000_000 else 0.01
-    return df.sample(frac=frac, random_state=random_state)
+def make_eda_env() -> dict:
+    """Builds a safe execution environment for running generated EDA code without NumPy alias warnings."""
+    env = {
+        "pd": pd,
+        "np": np,
+        "datetime": datetime,
+        "__builtins__": __builtins__,
+        # Use built-in Python types for these
+        "float": float,
+        "int": int,
+        "bool": bool,
+        "object": object,
+    }
+
+    # Only include valid NumPy dtypes (avoid deprecated aliases like np.object, np.int, np.bool)
+    valid_numpy_dtypes = [
+        "float64", "float32", "int64", "int32", "int16", "int8",
+        "uint64", "uint32", "bool_", "complex64", "complex128"
+    ]
+
+    for name in valid_numpy_dtypes:
+        try:
+            env[name] = getattr(np, name)
+        except AttributeError:
+            pass  # Skip if NumPy version doesn't have this dtype
+
+    return env
+
+
+def run_perform_eda(func, df: pd.DataFrame):
+    """Sandbox runner: refuse code whose only callable is not perform_eda."""
+    if getattr(func, "__name__", "") != "perform_eda":
+        raise ValueError("No callable function named 'perform_eda' found in the provided code")
+    return func(df)
+
+
+# Import references resolved inside the sandbox workers
+EDA_ENV = f"{__name__}:make_eda_env"
+EDA_RUNNER = f"{__name__}:run_perform_eda"
 
 class PythonOutputParser(BaseOutputParser):
     """Extract Python code from markdown blocks."""
@@ -24,31 +66,31 @@ class PythonOutputParser(BaseOutputParser):
         return match.group(1).strip() if match else text
 
 class EDA_Node:
-    def __init__(self, llm) -> None:
+    def __init__(self, llm, token_budget: int = DEFAULT_TOKEN_BUDGET, chunked_eda: Optional[bool] = None,
+                 eda_workers: Optional[int] = None, correlation_method: str = "exact") -> None:
+        """
+        chunked_eda: compute the checklist chunk by chunk with mergeable accumulators (None: only for
+                     out-of-core tables, which are then read in full instead of from the sample).
+        eda_workers: threads folding chunks in chunked mode (default: CPU count).
+        correlation_method: "exact", "sample", "projection" or "auto" for the in-memory checklist's
+                            correlated pairs (see Correlation_Engine.correlation_report); chunked mode
+                            is always exact.
+        """
         self.llm = llm
+        self.token_budget = token_budget
+        self.chunked_eda = chunked_eda
+        self.eda_workers = eda_workers or os.cpu_count() or 1
+        self.correlation_method = correlation_method
         self.logger = logging.getLogger(__name__)
+        self.executor = get_sandbox_executor()
 
-    def perform_eda_analysis(self, state: PythonAnalystState) -> dict:
-        """Generates EDA Python function from cleaned data + user query."""
-        # Build a safe, limited markdown sample for the prompt
-        samples = []
-        for i, df in enumerate(state.get("cleaned_data", []) or []):
-            if isinstance(df, pd.DataFrame):
-                try:
-                    md = dynamic_sample(df).to_markdown(index=False)
-                except Exception:
-                    # fallback to a small string if markdown fails
-                    md = dynamic_sample(df).head(10).to_string(index=False)
-                samples.append(f"File {i+1} Sample:\n{md}")
-
-        cleaned_data_sample = "\n\n".join(samples) or "No cleaned data samples available."
-
+    def _eda_chain(self):
         # Prompt template (fixed and with closed code fence)
         eda_prompt = PromptTemplate(
             template="""
     You are a senior data analyst.
 
-    CONTEXT (small representative sample in markdown):
+    CONTEXT (per-table digest: schema, null rates, top values, quantiles and sample rows):
     {cleaned_data_sample}
 
     User question:
@@ -57,6 +99,11 @@ class EDA_Node:
     Task:
     Generate one compact, production-grade, fully-executable Python function named exactly `perform_eda(df)`.
 
+    The standard EDA checklist is ALREADY computed for every table and merged into the results:
+    shape, dtypes, describe() statistics, missing counts, IQR outlier counts, pairs with abs(corr) > 0.5,
+    constant and mixed-type columns, and suspicious values (negative amounts/ages, non-positive prices,
+    sentinel codes, future dates, placeholder strings). Do NOT recompute any of these.
+
     **Mandatory Requirements:**
     1. At the start of the function include:
     import pandas as pd
@@ -66,15 +113,10 @@ class EDA_Node:
     2. Never use deprecated NumPy aliases (`np.float`, `np.int`, `np.bool`, `np.object`).
    - Use built-in `float`, `int`, `bool`, `object` or explicit `np.float64`/`np.int64` instead.
 
-    3. Input validation:.
-
-    3. Implement these EDA steps inside the function:
-    a. Dataset overview: shape, column names, dtypes.
-    b. Descriptive statistics (numeric only): count, mean, std, min, 25%, 50%, 75%, max.
-    c. Outlier detection using IQR: counts per numeric column.
-    d. Correlation analysis (numeric only): list pairs where abs(corr) > 0.5.
-    e. Data quality flags: constant columns, mixed-type columns, missing counts.
-    f. Suspicious values: negative ages, future dates, non-positive prices.
+    3. Compute only the analysis specific to the user question: the groupings, segment comparisons,
+    trends, rankings or derived metrics needed to answer it, using vectorized pandas/numpy operations
+    (no row loops, no apply(axis=1)). Skip columns the question does not need. If the question needs
+    nothing beyond the standard checklist, return an empty dict.
 
     4. Constraints:
     - Use df.shape[0] and df.shape[1] for counts.
@@ -83,7 +125,7 @@ class EDA_Node:
     - Use only pandas/numpy/datetime operations.
 
     OUTPUT:
-    Return a single dict named `eda_results` and nothing else. Wrap the function exactly in a fenced python block, for example:
+    Return a single dict named `eda_results` (question-specific results only) and nothing else. Wrap the function exactly in a fenced python block, for example:
 
     ```python
     def perform_eda(df):
@@ -94,18 +136,34 @@ class EDA_Node:
         input_variables=["cleaned_data_sample", "user_query"],
         )   
 
-        chain = eda_prompt | self.llm | PythonOutputParser()
-        code = chain.invoke({
-            "cleaned_data_sample": cleaned_data_sample,
-            "user_query": state.get("question", "")
-        })
+        return eda_prompt | self.llm | PythonOutputParser()
+
+    def _eda_inputs(self, state: PythonAnalystState) -> dict:
+        # Token-budgeted digest of each cleaned table for the prompt
+        return {
+            "cleaned_data_sample": build_prompt_context(state.get("cleaned_data", []), "File", self.token_budget),
+            "user_query": state.get("question", ""),
+        }
 
+    def _check_eda_code(self, code: str) -> str:
         code = code.strip()
         if "def perform_eda" not in code:
             raise ValueError("LLM did not produce a function named 'perform_eda'. Received:\n" + code[:1000])
 
         logger.info("EDA function generated (length %d chars)", len(code))
-        return {"eda_code": code}
+        return code
+
+    def _accept_eda_code(self, review: Lint_Result) -> dict:
+        return {"eda_code": review.code, "lint_findings": {"eda": review.summary()}}
+
+    def perform_eda_analysis(self, state: PythonAnalystState) -> dict:
+        """Generates EDA Python function from cleaned data + user query."""
+        code = self._check_eda_code(self._eda_chain().invoke(self._eda_inputs(state)))
+        return self._accept_eda_code(review_code(code, self.llm, "perform_eda"))
+
+    async def aperform_eda_analysis(self, state: PythonAnalystState) -> dict:
+        code = self._check_eda_code(await self._eda_chain().ainvoke(self._eda_inputs(state)))
+        return self._accept_eda_code(await areview_code(code, self.llm, "perform_eda"))
 
     def execute_eda_code(self, state: PythonAnalystState) -> dict:
 
@@ -116,6 +174,10 @@ class EDA_Node:
 
         eda_code = state["eda_code"]
         raw_data = state["raw_data"]
+        source_tables = state.get("source_tables") or []
+        # out-of-core tables: the cleaned full table and its sample, where cleaning produced them
+        cleaned_tables = state.get("cleaned_tables") or []
+        cleaned_data = state.get("cleaned_data") or []
         eda_outputs = []
 
         # Replace deprecated tokens in generated code
@@ -126,100 +188,106 @@ class EDA_Node:
                     .replace("np.object", "object")
         )
 
-        # Common dtype name -> numpy dtype mapping
-        common_dtype_names = [
-            "float64", "float32", "int64", "int32", "int16", "int8",
-            "uint64", "uint32", "object", "bool"
-        ]
-
-        # Helper to build base global environment with dtype aliases
-        def make_global_env():
-            """Builds a safe execution environment for running generated EDA code without NumPy alias warnings."""
-            env = {
-                "pd": pd,
-                "np": np,
-                "datetime": datetime,
-                "__builtins__": __builtins__,
-                # Use built-in Python types for these
-                "float": float,
-                "int": int,
-                "bool": bool,
-                "object": object,
-            }
-
-            # Only include valid NumPy dtypes (avoid deprecated aliases like np.object, np.int, np.bool)
-            valid_numpy_dtypes = [
-                "float64", "float32", "int64", "int32", "int16", "int8",
-                "uint64", "uint32", "bool_", "complex64", "complex128"
-            ]
-
-            for name in valid_numpy_dtypes:
+        # perform_eda is compiled once per sandbox worker and reused across tables and runs
+        timings = {"compile_seconds": 0.0, "execute_seconds": 0.0, "compiled_cache_hits": 0, "builtin_seconds": 0.0}
+
+        def run_extras(item):
+            i, df = item
+            table_timings = {"compile_seconds": 0.0, "execute_seconds": 0.0, "compiled_cache_hits": 0}
+
+            started = time.perf_counter()
+            try:
+                # The worker gets its own copy of the DataFrame (non-destructive)
+                run = self.executor.run(eda_code, df, "perform_eda", env=EDA_ENV, env_key="eda", runner=EDA_RUNNER)
+                table_timings["compile_seconds"] += run.compile_seconds
+                table_timings["compiled_cache_hits"] += int(run.compiled_cached)
+                result = run.value
+
+                if not isinstance(result, dict):
+                    raise ValueError("'perform_eda' must return a dictionary")
+
+                self.logger.info("Successfully executed EDA on DataFrame %d", i)
+                return result, table_timings
+
+            except NameError as ne:
+                msg = str(ne)
+                self.logger.error("NameError executing EDA on DataFrame %d: %s", i, msg)
+                m = re.search(r"name '([^']+)' is not defined", msg)
+                missing = m.group(1) if m else None
+                hint = None
+                if missing:
+                    hint = f"Missing name: {missing}. Generated code referenced an unqualified dtype name."
+                return {"error": msg, "hint": hint, "code": eda_code}, table_timings
+
+            except Exception as e:
+                err_msg = str(e)
+                self.logger.error("Failed EDA on DataFrame %d: %s", i, err_msg)
+                hint = None
+                if "cannot be interpreted as an integer" in err_msg or "must be real number" in err_msg:
+                    hint = (
+                        "Likely cause: The EDA code used a DataFrame/Series where an integer was expected "
+                        "(e.g., `range(df)`, `for i in df`, or indexing with a DataFrame). "
+                        "Check the generated code for `range(` or integer-context usage of 'df'."
+                    )
+                return {"error": err_msg, "hint": hint, "code": eda_code}, table_timings
+            finally:
+                table_timings["execute_seconds"] += time.perf_counter() - started
+
+        def run_table(item):
+            i, df = item
+            table = source_tables[i - 1] if i - 1 < len(source_tables) else None
+            if table is not None and i - 1 < len(cleaned_tables) and cleaned_tables[i - 1] is not None:
+                table = cleaned_tables[i - 1]
+                if i - 1 < len(cleaned_data) and isinstance(cleaned_data[i - 1], pd.DataFrame):
+                    df = cleaned_data[i - 1]
+                    item = (i, df)
+            chunked = self.chunked_eda if self.chunked_eda is not None else table is not None
+            # Standard checklist: computed natively, no generated code involved
+            started = time.perf_counter()
+            try:
+                if chunked:
+                    chunks = table.iter_batches() if table is not None else frame_chunks(df)
+                    result = chunked_eda(chunks, workers=self.eda_workers)
+                else:
+                    result = standard_eda(df, correlation_method=self.correlation_method)
+            except Exception as e:
+                self.logger.error("Built-in EDA failed on DataFrame %d: %s", i, e)
+                result = {"standard_eda_error": str(e)}
+            builtin_seconds = time.perf_counter() - started
+
+            extras, table_timings = run_extras(item)
+            table_timings["builtin_seconds"] = builtin_seconds
+            if extras:
+                result["question_specific"] = extras
+
+            if table is not None:
+                # Generated code (and the checklist unless chunked) only saw a bounded sample; add exact
+                # full-table aggregates
+                result["sample_rows"] = int(df.shape[0])
                 try:
-                    env[name] = getattr(np, name)
-                except AttributeError:
-                    pass  # Skip if NumPy version doesn't have this dtype
-
-            return env
+                    result["full_table_summary"] = table.summary()
+                except Exception as summary_exc:
+                    self.logger.warning("Full-table summary failed for %s: %s", table.name, summary_exc)
+            return result, table_timings
 
-        # Attempt execution for each DataFrame
+        items = []
         for i, df in enumerate(raw_data, start=1):
             if not isinstance(df, pd.DataFrame):
                 self.logger.warning("Item %d in raw_data is not a DataFrame. Skipping...", i)
                 continue
-
-            tried_retry = False
-            while True:
-                try:
-                    global_env = make_global_env()
-                    local_vars = {}
-
-                    # Execute the provided EDA code
-                    exec(eda_code, global_env, local_vars)
-
-                    # Retrieve the EDA function
-                    eda_func = local_vars.get("perform_eda")
-                    if not callable(eda_func):
-                        raise ValueError("No callable function named 'perform_eda' found in the provided code")
-
-                    # Execute the function with a copy of the DataFrame (non-destructive)
-                    result = eda_func(df.copy())
-
-                    if not isinstance(result, dict):
-                        raise ValueError("'perform_eda' must return a dictionary")
-
-                    eda_outputs.append(result)
-                    self.logger.info("Successfully executed EDA on DataFrame %d", i)
-                    break  # success -> exit retry loop
-
-                except NameError as ne:
-                    msg = str(ne)
-                    self.logger.error("NameError executing EDA on DataFrame %d: %s", i, msg)
-                    missing = None
-                    m = re.search(r"name '([^']+)' is not defined", msg)
-                    if m:
-                        missing = m.group(1)
-                    if missing and (missing in common_dtype_names) and not tried_retry:
-                        self.logger.info("Mapping missing name '%s' to numpy dtype and retrying", missing)
-                        tried_retry = True
-                        continue
-                    else:
-                        hint = None
-                        if missing:
-                            hint = f"Missing name: {missing}. Generated code referenced an unqualified dtype name."
-                        eda_outputs.append({"error": msg, "hint": hint, "code": eda_code})
-                        break
-
-                except Exception as e:
-                    err_msg = str(e)
-                    self.logger.error("Failed EDA on DataFrame %d: %s", i, err_msg)
-                    hint = None
-                    if "cannot be interpreted as an integer" in err_msg or "must be real number" in err_msg:
-                        hint = (
-                            "Likely cause: The EDA code used a DataFrame/Series where an integer was expected "
-                            "(e.g., `range(df)`, `for i in df`, or indexing with a DataFrame). "
-                            "Check the generated code for `range(` or integer-context usage of 'df'."
-                        )
-                    eda_outputs.append({"error": err_msg, "hint": hint, "code": eda_code})
-                    break
-
-        return {"eda_result": eda_outputs}
+            items.append((i, df))
+
+        # Tables run concurrently on the sandbox pool; outputs keep the table order
+        for output, table_timings in self.executor.map(run_table, items):
+            eda_outputs.append(output)
+            for key, value in table_timings.items():
+                timings[key] += value
+
+        self.logger.info("EDA: built-in checklist %.1f ms, generated code compile %.1f ms, execute %.1f ms",
+                         timings["builtin_seconds"] * 1000, timings["compile_seconds"] * 1000,
+                         timings["execute_seconds"] * 1000)
+        return {"eda_result": eda_outputs, "execution_timings": {"eda": timings}}
+
+    async def aexecute_eda_code(self, state: PythonAnalystState) -> dict:
+        # CPU-bound pandas work: run it off the event loop
+        return await asyncio.to_thread(self.execute_eda_code, state)
@@ -1,6 +1,7 @@
 from Data_Science_Agent.STATE.Python_Analyst_State import PythonAnalystState
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from Data_Science_Agent.PYTHON_Data_Analyst.Context_Builder import DEFAULT_TOKEN_BUDGET, fit_to_budget
 import os
 import logging
 from typing import List
@@ -8,13 +9,14 @@ from typing import List
 logger = logging.getLogger(__name__)
 
 class Output_Node:
-    def __init__(self, llm, report_base_url: str = None):
+    def __init__(self, llm, report_base_url: str = None, token_budget: int = DEFAULT_TOKEN_BUDGET):
         """
         report_base_url: base HTTP URL that serves the report files, e.g. "http://localhost:8001".
                          If None, defaults to "http://localhost:8001".
                          Make sure a file server is serving the folder containing the report files.
         """
         self.llm = llm
+        self.token_budget = token_budget
         self.report_base_url = (report_base_url.rstrip("/") if report_base_url else "http://localhost:8001")
 
     def _make_report_url(self, profiling_report_value: str) -> str:
@@ -46,7 +48,9 @@ class Output_Node:
         lines = []
         for i, item in enumerate(visual_images, start=1):
             if isinstance(item, dict):
-                if "path" in item:
+                if "artifact_id" in item:
+                    lines.append(f"- **Image {i}**: Visualization rendered ({item.get('format', 'png')}, shown in the UI).")
+                elif "path" in item:
                     lines.append(f"- **Image {i}**: Visualization saved (use the UI to open).")
                 elif "error" in item:
                     lines.append(f"- **Image {i}**: Error — {item.get('error')}")
@@ -57,13 +61,7 @@ class Output_Node:
                 lines.append(f"- **Image {i}**: {str(item)}")
         return "\n".join(lines)
 
-    def output_parser(self, state: PythonAnalystState) -> dict:
-        question = state.get("question", "")
-        eda_result = state.get("eda_result", "No EDA results available.")
-        rca_result = state.get("rca_suggestion", "No RCA available.")
-        # Optional: visual plan or other context can be added if available
-        visual_plan = state.get("visual_plan", "")
-
+    def _summary_chain(self):
         final_summary_prompt = PromptTemplate(
         input_variables=["user_query", "eda_result", "rca_result"],
         template="""
@@ -119,13 +117,25 @@ class Output_Node:
     """
     )
 
-        chain = final_summary_prompt | self.llm | StrOutputParser()
-        inputs = {
+        return final_summary_prompt | self.llm | StrOutputParser()
+
+    def _summary_inputs(self, state: PythonAnalystState) -> dict:
+        question = state.get("question", "")
+        eda_result = state.get("eda_result", "No EDA results available.")
+        rca_result = state.get("rca_suggestion", "No RCA available.")
+        # Optional: visual plan or other context can be added if available
+        visual_plan = state.get("visual_plan", "")
+        return {
             "user_query": question,
-            "eda_result": str(eda_result),
+            "eda_result": fit_to_budget(eda_result, self.token_budget),
             "rca_result": str(rca_result),
             "visual_plan": str(visual_plan),
         }
 
-        response = chain.invoke(inputs)
+    def output_parser(self, state: PythonAnalystState) -> dict:
+        response = self._summary_chain().invoke(self._summary_inputs(state))
+        return {"final_result": response}
+
+    async def aoutput_parser(self, state: PythonAnalystState) -> dict:
+        response = await self._summary_chain().ainvoke(self._summary_inputs(state))
         return {"final_result": response}
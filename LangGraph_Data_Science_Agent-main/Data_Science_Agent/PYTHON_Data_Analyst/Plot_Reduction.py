@@ -0,0 +1,219 @@
+import re
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds on what generated plotting code receives, whatever the table size
+LINE_POINTS = 2_000
+SCATTER_POINTS = 50_000
+GRID_BINS = 200
+MAX_BARS = 50
+SAMPLE_ROWS = 200_000
+
+KIND_PATTERNS = [
+    ("line", re.compile(r"\bline|time[\s-]?series|trend|\barea\b", re.IGNORECASE)),
+    ("scatter", re.compile(r"scatter|bubble|hex", re.IGNORECASE)),
+    ("bar", re.compile(r"\bbar|column\s+chart|count\s*plot", re.IGNORECASE)),
+]
+PLAN_FIELD = re.compile(r"\*\*(Title|Type|X|Y)\*\*\s*:\s*(.+)", re.IGNORECASE)
+
+
+def parse_visual_plan(plan: str) -> Dict[str, str]:
+    """Title/Type/X/Y fields of the suggestion format ("- **Type**: ...") as a lower-case keyed dict."""
+    return {m.group(1).lower(): m.group(2).strip() for m in PLAN_FIELD.finditer(plan or "")}
+
+
+def chart_kind(type_text: str) -> Optional[str]:
+    for kind, pattern in KIND_PATTERNS:
+        if pattern.search(type_text or ""):
+            return kind
+    return None
+
+
+def match_column(text: str, columns: List[str]) -> Optional[str]:
+    """The longest column name mentioned in `text` as a whole word (case-insensitive)."""
+    text = (text or "").replace("`", "").replace("*", "").lower()
+    found = [c for c in columns
+             if re.search(rf"(?<![\w]){re.escape(c.lower())}(?![\w])", text)]
+    return max(found, key=len) if found else None
+
+
+def _plottable(s: pd.Series) -> bool:
+    """Numeric or datetime: values that can be binned and downsampled on a continuous axis."""
+    return (pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)) \
+        or pd.api.types.is_datetime64_any_dtype(s)
+
+
+def plan_reduction(plan: str, df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Reduction spec for the chart in `visual_plan`: {"kind": "line"|"scatter"|"bar"|"sample", "x", "y",
+    "count"}. Falls back to "sample" when the type or the columns cannot be resolved against `df`.
+    """
+    fields = parse_visual_plan(plan)
+    kind = chart_kind(fields.get("type", ""))
+    columns = [str(c) for c in df.columns]
+    x, y = match_column(fields.get("x", ""), columns), match_column(fields.get("y", ""), columns)
+    if x is not None and x == y:
+        y = None
+
+    spec: Dict[str, Any] = {"kind": "sample"}
+    if kind == "line" and x and y and _plottable(df[y]):
+        spec = {"kind": "line", "x": x, "y": y}
+    elif kind == "scatter" and x and y and _plottable(df[x]) and _plottable(df[y]):
+        spec = {"kind": "scatter", "x": x, "y": y}
+    elif kind == "bar" and (x or y):
+        # the category axis is the non-numeric one when the plan puts it on Y (horizontal bars)
+        if x is None or (y is not None and _plottable(df[x]) and not _plottable(df[y])):
+            x, y = y, x
+        spec = {"kind": "bar", "x": x, "y": y if y and _plottable(df[y]) else None}
+    if spec["kind"] in ("scatter", "bar"):
+        spec["count"] = "count" if "count" not in (spec["x"], spec["y"]) else "n_rows"
+    return spec
+
+
+def describe_reduction(spec: Dict[str, Any]) -> str:
+    """What the generated function's `df` contains, for the code prompt."""
+    kind = spec.get("kind")
+    if kind == "line":
+        return (f"`df` holds only the line, already reduced: columns '{spec['x']}' and '{spec['y']}', sorted by "
+                f"'{spec['x']}', one row per '{spec['x']}' value (mean of '{spec['y']}' over duplicates), "
+                f"downsampled to at most {LINE_POINTS} points with LTTB. Plot these points directly as a line; "
+                f"do not resample or re-aggregate, and pass errorbar=None to seaborn.")
+    if kind == "scatter":
+        return (f"`df` holds columns '{spec['x']}', '{spec['y']}' and '{spec['count']}'. Tables above "
+                f"{SCATTER_POINTS} points are binned on a {GRID_BINS}x{GRID_BINS} grid: one row per occupied cell "
+                f"at the mean position of its points, with '{spec['count']}' points in the cell (1 for unbinned "
+                f"rows). Encode '{spec['count']}' as point size or colour, or use plt.hexbin with "
+                f"C=df['{spec['count']}'] and reduce_C_function=np.sum; do not re-aggregate.")
+    if kind == "bar":
+        value = f", '{spec['y']}' = mean of '{spec['y']}' per category" if spec.get("y") else ""
+        return (f"`df` is already aggregated: one row per '{spec['x']}' category (the {MAX_BARS} largest by "
+                f"row count){value}, and '{spec['count']}' = rows per category. Plot bars straight from these "
+                f"columns; do not call value_counts/groupby again, and pass errorbar=None to seaborn.")
+    return (f"`df` is the cleaned table, or a uniform random sample of {SAMPLE_ROWS} rows when it is larger. "
+            f"Prefer aggregated or binned charts over plotting every row.")
+
+
+def describe_reductions(specs: List[Dict[str, Any]]) -> str:
+    """
+    describe_reduction for one function that runs on every table: the shared note when every table is
+    reduced the same way, otherwise each distinct shape with the tables it applies to.
+    """
+    distinct: List[Any] = []
+    for i, spec in enumerate(specs, start=1):
+        for seen, tables in distinct:
+            if seen == spec:
+                tables.append(i)
+                break
+        else:
+            distinct.append((spec, [i]))
+    if len(distinct) <= 1:
+        return describe_reduction(distinct[0][0] if distinct else {"kind": "sample"})
+    shapes = "\n".join(f"- Table {', '.join(map(str, tables))}: {describe_reduction(spec)}"
+                       for spec, tables in distinct)
+    return ("The same function runs on every table, and the tables arrive in different shapes:\n"
+            f"{shapes}\nBranch on the columns `df` actually has and plot each shape as described; a table "
+            "without the planned columns gets the closest equivalent chart of its own columns.")
+
+
+def _as_float(s: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+    if _plottable(s):
+        return s.to_numpy(dtype="float64", na_value=np.nan)
+    return np.arange(len(s), dtype="float64")   # ordered categories: equal spacing
+
+
+def _from_float(values: np.ndarray, like: pd.Series):
+    if pd.api.types.is_datetime64_any_dtype(like):
+        out = pd.to_datetime(values.astype("int64"))
+        tz = like.dt.tz
+        return out.tz_localize("UTC").tz_convert(tz) if tz is not None else out
+    return values
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of n_out points (first and last always kept) whose
+    polyline keeps the visual shape of (x, y). x must be sorted. One Python step per output point,
+    each vectorized over its bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        next_hi = edges[b + 2] if b + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        # twice the triangle area (previous point, candidate, next bucket's centroid)
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def _reduce_line(df: pd.DataFrame, x: str, y: str) -> pd.DataFrame:
+    data = df[[x, y]].dropna()
+    xs = data[x]
+    # time-indexed frames are usually sorted with unique x already; skip the hash group-by then
+    sorted_unique = xs.is_monotonic_increasing and not (xs.to_numpy()[1:] == xs.to_numpy()[:-1]).any()
+    if not sorted_unique:
+        data = data.groupby(x, sort=True, observed=True)[y].mean().reset_index()
+    if len(data) > LINE_POINTS:
+        keep = lttb_indices(_as_float(data[x]), data[y].to_numpy(dtype="float64"), LINE_POINTS)
+        data = data.iloc[keep]
+    return data.reset_index(drop=True)
+
+
+def _reduce_scatter(df: pd.DataFrame, x: str, y: str, count: str) -> pd.DataFrame:
+    data = df[[x, y]].dropna()
+    if len(data) <= SCATTER_POINTS:
+        return data.assign(**{count: 1}).reset_index(drop=True)
+    xs, ys = _as_float(data[x]), _as_float(data[y])
+    cells = np.zeros(len(xs), dtype=np.intp)
+    for values in (xs, ys):
+        lo, hi = values.min(), values.max()
+        scale = GRID_BINS / (hi - lo) if hi > lo else 0.0
+        cells = cells * GRID_BINS + np.minimum(((values - lo) * scale).astype(np.intp), GRID_BINS - 1)
+    counts = np.bincount(cells, minlength=GRID_BINS * GRID_BINS)
+    occupied = counts > 0
+    n = counts[occupied]
+    mean_x = np.bincount(cells, weights=xs, minlength=len(counts))[occupied] / n
+    mean_y = np.bincount(cells, weights=ys, minlength=len(counts))[occupied] / n
+    return pd.DataFrame({x: _from_float(mean_x, data[x]), y: _from_float(mean_y, data[y]), count: n})
+
+
+def _reduce_bar(df: pd.DataFrame, x: str, y: Optional[str], count: str) -> pd.DataFrame:
+    groups = df.groupby(x, observed=True, sort=False)
+    out = groups.size().rename(count).to_frame()
+    if y is not None:
+        out.insert(0, y, groups[y].mean())
+    return out.nlargest(MAX_BARS, count).reset_index()
+
+
+def reduce_frame(df: pd.DataFrame, spec: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """Apply a plan_reduction spec; tables missing the spec's columns get the bounded sample."""
+    spec = spec or {"kind": "sample"}
+    kind = spec.get("kind")
+    needed = [c for c in (spec.get("x"), spec.get("y")) if c]
+    if kind != "sample" and all(c in df.columns for c in needed):
+        try:
+            if kind == "line":
+                return _reduce_line(df, spec["x"], spec["y"])
+            if kind == "scatter":
+                return _reduce_scatter(df, spec["x"], spec["y"], spec["count"])
+            if kind == "bar":
+                return _reduce_bar(df, spec["x"], spec.get("y"), spec["count"])
+        except Exception as e:
+            logger.warning("%s reduction failed, plotting a sample instead: %s", kind, e)
+    if len(df) > SAMPLE_ROWS:
+        return df.sample(SAMPLE_ROWS, random_state=0).sort_index()
+    return df
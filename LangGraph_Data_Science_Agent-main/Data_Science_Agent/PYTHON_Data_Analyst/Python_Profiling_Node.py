@@ -1,5 +1,6 @@
 # report_generator.py
 import os
+import asyncio
 import uuid
 import threading
 import socket
@@ -87,3 +88,7 @@ class Report:
                 return {"profiling_report_url": None, "error": str(e)}
 
         return {"profiling_report_url": None, "error": "No DataFrame found"}
+
+    async def apandas_report(self, state: PythonAnalystState) -> dict:
+        # Profiling is CPU-bound: run it off the event loop
+        return await asyncio.to_thread(self.pandas_report, state)
@@ -1,19 +1,17 @@
+import logging
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from Data_Science_Agent.STATE.Python_Analyst_State import PythonAnalystState
-import pandas as pd
-from typing import Dict
+from Data_Science_Agent.PYTHON_Data_Analyst.Context_Builder import DEFAULT_TOKEN_BUDGET, fit_to_budget
 
-def dynamic_sample(df: pd.DataFrame) -> pd.DataFrame:
-    n = len(df)
-    frac = 1.0 if n < 10_000 else 0.1 if n < 100_000 else 0.03 if n < 1_000_000 else 0.01
-    return df.sample(frac=frac, random_state=42)
+logger = logging.getLogger(__name__)
 
 class RCA_Node:
-    def __init__(self, llm):
+    def __init__(self, llm, token_budget: int = DEFAULT_TOKEN_BUDGET):
         self.llm = llm
+        self.token_budget = token_budget
 
-    def rca_node(self, state: PythonAnalystState):
+    def _rca_chain(self):
         prompt = PromptTemplate(
             template="""
         You are a senior data analyst tasked with performing Root Cause and Recommendation Analysis (RCA).
@@ -65,14 +63,20 @@ class RCA_Node:
             input_variables=["user_query", "eda_result"]
         )
 
+        return prompt | self.llm | StrOutputParser()
 
-        eda_summary = state.get("eda_result", "")
+    def _rca_inputs(self, state: PythonAnalystState) -> dict:
+        return {
+            "user_query": state.get("question", ""),
+            "eda_result": fit_to_budget(state.get("eda_result", ""), self.token_budget),
+        }
 
-        chain = prompt | self.llm | StrOutputParser()
-        response = chain.invoke({
-                "user_query": state.get("question", ""),
-                "eda_result": eda_summary,
-            })
+    def rca_node(self, state: PythonAnalystState):
+        response = self._rca_chain().invoke(self._rca_inputs(state))
+        logger.info("RCA done (%d characters)", len(response))
+        return {"rca_suggestion": response}
 
-        print("RCA Done")
+    async def arca_node(self, state: PythonAnalystState):
+        response = await self._rca_chain().ainvoke(self._rca_inputs(state))
+        logger.info("RCA done (%d characters)", len(response))
         return {"rca_suggestion": response}
@@ -1,19 +1,28 @@
 from Data_Science_Agent.STATE.Python_Analyst_State import PythonAnalystState
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser, BaseOutputParser,JsonOutputParser
+from Data_Science_Agent.PYTHON_Data_Analyst.Context_Builder import DEFAULT_TOKEN_BUDGET, fit_to_budget
+from Data_Science_Agent.ENGINE.Sandbox_Executor import get_sandbox_executor
+from Data_Science_Agent.ENGINE.Artifact_Store import get_artifact_store
+from Data_Science_Agent.PYTHON_Data_Analyst.Code_Linter import areview_code, review_code
+from Data_Science_Agent.PYTHON_Data_Analyst.Plot_Reduction import describe_reductions, plan_reduction, reduce_frame
 import re
+import time
+import asyncio
 import pandas as pd
 import matplotlib.pyplot as plt
 from typing import List, Dict, Any
+import io
 import sys
 import matplotlib
-import tempfile
-import os
-import uuid
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Width (px) charts are shown at in the UI; figures are rasterized to match instead of at 300 dpi
+DISPLAY_WIDTH = 750
+IMAGE_FORMATS = {"png": "image/png", "webp": "image/webp", "svg": "image/svg+xml"}
+
 class PythonOutputParser(BaseOutputParser):
     """Parser for extracting Python code from markdown code blocks."""
     
@@ -47,13 +56,72 @@ def fix_palette_deprecation(code: str, default_color: str = "C0") -> str:
     except Exception:
         return code
 
+def render_visualizations(generate_func, df: pd.DataFrame, image_format: str = "png",
+                          width_px: int = DISPLAY_WIDTH) -> List[Any]:
+    """
+    Sandbox runner: call the generated plotting function with plt.show patched to render every figure
+    into an in-memory buffer, at a dpi that makes the figure `width_px` pixels wide (the display width).
+    Returns {"data", "format", "mime_type"} entries, plus an error entry if the function failed midway.
+    """
+    try:
+        matplotlib.use("Agg")
+    except Exception:
+        pass
+    sys.modules.setdefault("matplotlib", matplotlib)
+    sys.modules.setdefault("matplotlib.pyplot", plt)
+
+    images: List[Any] = []
+    original_show = plt.show
+
+    def render_and_track(*args, **kwargs):
+        """Render the current figure to bytes and track them."""
+        try:
+            fig = plt.gcf()
+            # width of the cropped ("tight") figure in inches, plus savefig's default 0.1in padding
+            tight_width = fig.get_tightbbox(fig.canvas.get_renderer()).width + 2 * 0.1
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=image_format, bbox_inches="tight", dpi=width_px / max(tight_width, 1e-3))
+            images.append({"data": buffer.getvalue(), "format": image_format,
+                           "mime_type": IMAGE_FORMATS[image_format]})
+            logger.info("Rendered visualization (%s, %d bytes)", image_format, buffer.tell())
+        except (IOError, ValueError) as e:
+            logger.error("Failed to render image: %(error)s", {"error": str(e)})
+            images.append({"error": f"Failed to render image: {str(e)}"})
+        except Exception as e:
+            logger.error("Unexpected error while rendering image: %(error)s", {"error": str(e)})
+            images.append({"error": f"Unexpected error: {str(e)}"})
+        finally:
+            plt.close("all")
+
+    try:
+        # Patch show to render plots
+        plt.show = render_and_track
+        generate_func(df)
+    except Exception as e:
+        logger.error(f"Error executing visualization: {e}")
+        images.append({"error": str(e)})
+    finally:
+        plt.show = original_show
+    return images
+
+
+# Import reference resolved inside the sandbox workers
+VISUAL_RUNNER = f"{__name__}:render_visualizations"
+
 class Visual_Node:
     """Node for handling data visualization tasks."""
     
-    def __init__(self, llm) -> None:
+    def __init__(self, llm, token_budget: int = DEFAULT_TOKEN_BUDGET, image_format: str = "png") -> None:
+        """image_format: "png", "webp" or "svg" for rendered charts."""
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format {image_format!r}; expected one of {list(IMAGE_FORMATS)}")
         self.llm = llm
+        self.token_budget = token_budget
+        self.image_format = image_format
+        self.executor = get_sandbox_executor()
+        self.artifacts = get_artifact_store()
 
-    def generate_visual_code(self, state: PythonAnalystState) -> dict:
+    def _suggestion_inputs(self, state: PythonAnalystState) -> dict:
         if not state.get("cleaned_data") or not state.get("question"):
             raise ValueError("Missing cleaned_data or question")
 
@@ -62,7 +130,14 @@ class Visual_Node:
             [f"Table {i+1}: {', '.join(map(str, df.columns))}"
             for i, df in enumerate(state["cleaned_data"]) if isinstance(df, pd.DataFrame)]
         )
+        return {
+            "user_query": state["question"],
+            "eda_result": fit_to_budget(state.get("eda_result", ""), self.token_budget),
+            "rca_result": state.get("rca_suggestion", ""),
+            "cleaned_data": column_summary
+        }
 
+    def _suggestion_chain(self):
         # Step 1: Suggest visualizations
         suggestion_prompt = PromptTemplate(
             template="""
@@ -97,14 +172,9 @@ class Visual_Node:
             input_variables=["user_query", "cleaned_data", "eda_result", "rca_result"]
         )
 
-        suggestion_chain = suggestion_prompt | self.llm | StrOutputParser()
-        visual_plan = suggestion_chain.invoke({
-            "user_query": state["question"],
-            "eda_result": state.get("eda_result", ""),
-            "rca_result": state.get("rca_suggestion", ""),
-            "cleaned_data": column_summary
-        })
+        return suggestion_prompt | self.llm | StrOutputParser()
 
+    def _code_chain(self):
         # Step 2: Generate Python code for the visualization
         code_prompt = PromptTemplate(
             template="""
@@ -113,6 +183,9 @@ class Visual_Node:
     Generate a clean, executable Python function for the visualization below:
     {visual_suggestion}
     ---
+    Data passed to the function:
+    {data_note}
+    ---
     Instructions:
     - Function name: `generate_visualizations(df)`
     - Put all imports inside the function
@@ -135,18 +208,53 @@ class Visual_Node:
         ...
         plt.show()
     """,
-        input_variables=["visual_suggestion"]
+        input_variables=["visual_suggestion", "data_note"]
         )
 
-        code_chain = code_prompt | self.llm | PythonOutputParser()
-        visual_code = code_chain.invoke({"visual_suggestion": visual_plan})
+        return code_prompt | self.llm | PythonOutputParser()
+
+    def _reductions(self, state: PythonAnalystState, visual_plan: str) -> List[Dict[str, Any]]:
+        """Reduction spec for the planned chart per cleaned table, each resolved against its own columns."""
+        return [plan_reduction(visual_plan, df) if isinstance(df, pd.DataFrame) else {"kind": "sample"}
+                for df in state.get("cleaned_data", [])]
+
+    def generate_visual_code(self, state: PythonAnalystState) -> dict:
+        visual_plan = self._suggestion_chain().invoke(self._suggestion_inputs(state))
+        reductions = self._reductions(state, visual_plan)
+        visual_code = self._code_chain().invoke(
+            {"visual_suggestion": visual_plan, "data_note": describe_reductions(reductions)})
+        review = review_code(visual_code, self.llm, "generate_visualizations")
+
+        return {
+            "visual_plan": visual_plan,
+            "visual_code": review.code,
+            "plot_reductions": reductions,
+            "lint_findings": {"visual": review.summary()},
+        }
+
+    async def agenerate_visual_code(self, state: PythonAnalystState) -> dict:
+        visual_plan = await self._suggestion_chain().ainvoke(self._suggestion_inputs(state))
+        reductions = self._reductions(state, visual_plan)
+        visual_code = await self._code_chain().ainvoke(
+            {"visual_suggestion": visual_plan, "data_note": describe_reductions(reductions)})
+        review = await areview_code(visual_code, self.llm, "generate_visualizations")
 
         return {
             "visual_plan": visual_plan,
-            "visual_code": visual_code
+            "visual_code": review.code,
+            "plot_reductions": reductions,
+            "lint_findings": {"visual": review.summary()},
         }
 
     
+    def _store_image(self, item: Any) -> Any:
+        """Move rendered bytes into the artifact store; the state keeps only the reference."""
+        if not isinstance(item, dict) or "data" not in item:
+            return item
+        artifact_id = self.artifacts.put(item["data"], item["mime_type"])
+        return {"artifact_id": artifact_id, "format": item["format"], "mime_type": item["mime_type"],
+                "size_bytes": len(item["data"])}
+
     def execute_visual_code(self, state: PythonAnalystState) -> dict:
         code = state.get("visual_code")
         if not code:
@@ -156,60 +264,56 @@ class Visual_Node:
         if not cleaned_dfs:
             raise ValueError("No cleaned data found in state")
             
-        try:
-            matplotlib.use("Agg")
-        except Exception:
-            pass
-
         code = fix_palette_deprecation(code)
+        # Generated code was written for each table's reduced frame of the planned chart type, so
+        # plotting cost is bounded by the reduction limits rather than the row count
+        reductions = state.get("plot_reductions") or []
+
+        images: List[Dict[str, Any]] = []
 
-        image_paths: List[Dict[str, Any]] = []
-        sys.modules.setdefault("matplotlib", matplotlib)
-        sys.modules.setdefault("matplotlib.pyplot", plt)
+        # Compiled once per sandbox worker; every table reuses the plotting function
+        timings = {"compile_seconds": 0.0, "execute_seconds": 0.0, "compiled_cache_hits": 0, "reduce_seconds": 0.0}
+        def render_table(item):
+            idx, df = item
+            table_timings = {"compile_seconds": 0.0, "execute_seconds": 0.0, "compiled_cache_hits": 0,
+                             "reduce_seconds": 0.0}
+            started = time.perf_counter()
+            frame = reduce_frame(df, reductions[idx] if idx < len(reductions) else None)
+            table_timings["reduce_seconds"] = time.perf_counter() - started
+            if len(frame) != len(df):
+                logger.info("Reduced DataFrame %d from %d to %d rows for plotting", idx + 1, len(df), len(frame))
+            started = time.perf_counter()
+            try:
+                run = self.executor.run(code, frame, "generate_visualizations", env_key="visual",
+                                        runner=VISUAL_RUNNER, image_format=self.image_format)
+                table_timings["compile_seconds"] += run.compile_seconds
+                table_timings["compiled_cache_hits"] += int(run.compiled_cached)
+                return [self._store_image(item) for item in run.value], table_timings
+            except Exception as e:
+                logger.error(f"Error executing visualization on DataFrame {idx + 1}: {e}")
+                return [{"error": str(e)}], table_timings
+            finally:
+                table_timings["execute_seconds"] += time.perf_counter() - started
+
+        items = []
         for idx, df in enumerate(cleaned_dfs):
             if not isinstance(df, pd.DataFrame):
                 logger.warning("Item %(idx)s in cleaned_data is not a DataFrame. Skipping.", 
                              {"idx": idx + 1})
                 continue
+            items.append((idx, df))
 
-            local_vars = {"df": df.copy()}
-            original_show = plt.show
-
-            def save_and_track():
-                """Save current plot to a temporary file and track its path."""
-                try:
-                    temp_file = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4().hex}.png")
-                    plt.savefig(temp_file, bbox_inches="tight", dpi=300)
-                    plt.close("all")
-                    
-                    # Verify the file was created successfully
-                    if not os.path.exists(temp_file):
-                        raise IOError("Failed to create image file")
-                        
-                    image_paths.append(temp_file)
-                    logger.info("Successfully saved visualization to %(path)s", {"path": temp_file})
-                    
-                except (IOError, ValueError) as e:
-                    logger.error("Failed to save image: %(error)s", {"error": str(e)})
-                    image_paths.append({"error": f"Failed to save image: {str(e)}"})
-                except Exception as e:
-                    logger.error("Unexpected error while saving image: %(error)s", {"error": str(e)})
-                    image_paths.append({"error": f"Unexpected error: {str(e)}"})
+        # Tables are plotted concurrently on the sandbox pool; images keep the table order
+        for table_images, table_timings in self.executor.map(render_table, items):
+            images.extend(table_images)
+            for key, value in table_timings.items():
+                timings[key] += value
 
-            try:
-                exec(code, {}, local_vars)
-                generate_func = next((val for val in local_vars.values() if callable(val)), None)
-                if generate_func is None:
-                    raise ValueError("No function found in generated code.")
-
-                # Patch show to save plots
-                plt.show = save_and_track
-                generate_func(df)
-
-            except Exception as e:
-                logger.error(f"Error executing visualization on DataFrame {idx + 1}: {e}")
-                image_paths.append({"error": str(e)})
-            finally:
-                plt.show = original_show
+        logger.info("Visualization: reduce %.1f ms, code compile %.1f ms, execute %.1f ms",
+                    timings["reduce_seconds"] * 1000, timings["compile_seconds"] * 1000,
+                    timings["execute_seconds"] * 1000)
+        return {"visual_images": images, "execution_timings": {"visual": timings}}
 
-        return {"visual_images": image_paths}
\ No newline at end of file
+    async def aexecute_visual_code(self, state: PythonAnalystState) -> dict:
+        # Plotting is blocking matplotlib work: run it off the event loop
+        return await asyncio.to_thread(self.execute_visual_code, state)
@@ -1,15 +1,29 @@
 from typing_extensions import Annotated , TypedDict , Literal, Any,List
 import pandas as pd
-from typing import Union
+from typing import Union, Dict, Optional
+
+
+def merge_dicts(left: Dict, right: Dict) -> Dict:
+    """Reducer for keys written by parallel branches."""
+    return {**(left or {}), **(right or {})}
 
 class PythonAnalystState(TypedDict):
 
     question: str
     raw_data: List[pd.DataFrame]
+    source_tables: List[Any]
 
     cleaning_code: str
+    cleaning_codes: List[str]
+    schema_fingerprints: List[str]
+    cleaning_from_cache: bool
     cleaned_data: List[pd.DataFrame]
+    cleaned_tables: List[Any]
+    # per raw table, the error the cleaning function raised on it (None when it ran)
+    cleaning_errors: List[Optional[str]]
     cleaned_or_not : str
+    cleaning_attempts: int
+    validation_report: dict
 
     eda_code: str
     eda_result: str
@@ -20,6 +34,15 @@ class PythonAnalystState(TypedDict):
 
     visual_code: str
     visual_plan : str
-    visual_images: List[Union[str, dict]]  
+    # per cleaned table, {"kind": "line"|"scatter"|"bar"|"sample", "x", "y", "count"}: how it is reduced
+    # before plotting
+    plot_reductions: List[Dict[str, Any]]
+    # {"artifact_id", "format", "mime_type", "size_bytes"} per chart (bytes live in the artifact store) or {"error"}
+    visual_images: List[Union[str, dict]]
     
-    final_result: str  
\ No newline at end of file
+    final_result: str
+
+    # node -> {"compile_seconds", "execute_seconds", "compiled_cache_hits"} for generated code
+    execution_timings: Annotated[Dict[str, Dict[str, float]], merge_dicts]
+    # node -> {"findings", "rewritten", "regenerated"} from the generated-code linter
+    lint_findings: Annotated[Dict[str, Dict[str, Any]], merge_dicts]
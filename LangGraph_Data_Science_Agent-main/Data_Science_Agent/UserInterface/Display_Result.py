@@ -1,19 +1,75 @@
 import os
-from typing import List, Any, Optional, Dict
+import time
+import queue
+import asyncio
+import threading
+from typing import List, Any, Optional, Dict, Iterator
 import streamlit as st
 import pandas as pd
 from Data_Science_Agent.STATE.Python_Analyst_State import PythonAnalystState
+from Data_Science_Agent.LLM.Response_Cache import count_cache_calls
+from Data_Science_Agent.LLM.Rate_Limiter import count_governor_calls
+from Data_Science_Agent.ENGINE.Sandbox_Executor import cancel_scope
+from Data_Science_Agent.ENGINE.Artifact_Store import get_artifact_store
+from Data_Science_Agent.PYTHON_Data_Analyst.Visual_Node import DISPLAY_WIDTH
 import streamlit.components.v1 as components
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Minimum interval between redraws of a section that is receiving streamed tokens
+STREAM_REDRAW_SECONDS = 0.05
+
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_event_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Process-wide event loop running in a daemon thread. Async graphs are driven on it rather than with
+    asyncio.run per message, because cached LLM clients keep connections bound to the loop they first ran on.
+    """
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name="graph-event-loop", daemon=True).start()
+        return _event_loop
+
+
+def _message_text(message: Any) -> str:
+    """Text of a streamed message chunk; some providers send a list of content parts."""
+    content = getattr(message, "content", "")
+    if isinstance(content, list):
+        return "".join(p.get("text", "") if isinstance(p, dict) else str(p) for p in content)
+    return content if isinstance(content, str) else ""
+
+
+def _as_frame(value: Any) -> Optional[pd.DataFrame]:
+    """Tabular view of an EDA value (per-column stats, flat mappings, lists of records), if it has one."""
+    if isinstance(value, dict) and value:
+        if all(isinstance(v, dict) for v in value.values()):
+            return pd.DataFrame(value)
+        if not any(isinstance(v, (dict, list)) for v in value.values()):
+            return pd.Series(value, name="value").to_frame()
+    if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+        return pd.DataFrame(value)
+    return None
+
 class DisplayResultStreamlit:
-    def __init__(self, usecase: str, graph: Any, user_message: str, raw_data: List[pd.DataFrame]):
+    # Nodes whose LLM tokens are rendered while they arrive: node -> (state key, section heading)
+    STREAMED_NODES = {
+        "RCA_Node": ("rca_suggestion", "## 🔍 Root Cause Analysis"),
+        "Output": ("final_result", "## ✅ Final Report"),
+    }
+
+    def __init__(self, usecase: str, graph: Any, user_message: str, raw_data: List[pd.DataFrame],
+                 source_tables: Optional[List[Any]] = None):
         self.usecase = usecase
         self.graph = graph
         self.user_message = user_message
         self.raw_data = raw_data
+        self.source_tables = source_tables or []
 
     def _extract_report_path_or_url(self, step: Dict) -> Optional[str]:
         if not step:
@@ -63,8 +119,150 @@ class DisplayResultStreamlit:
             return item
         return None
 
-    def display_result_on_ui(self):
-        """Main entry: stream graph, collect items, and display in Streamlit UI."""
+    def _render_eda_result(self, container: Any, eda_result: Any) -> None:
+        results = eda_result if isinstance(eda_result, list) else [eda_result]
+        with container.expander("📊 EDA results", expanded=False):
+            for i, result in enumerate(results, start=1):
+                if len(results) > 1:
+                    st.markdown(f"#### Table {i}")
+                if not isinstance(result, dict):
+                    st.write(result)
+                    continue
+                if "error" in result:
+                    st.warning(f"⚠️ EDA failed: {result['error']}")
+                    continue
+                for key, value in result.items():
+                    frame = _as_frame(value)
+                    if frame is not None:
+                        st.markdown(f"**{key}**")
+                        st.dataframe(frame)
+                    elif isinstance(value, (dict, list)):
+                        st.markdown(f"**{key}**")
+                        st.write(value)
+                    else:
+                        st.markdown(f"**{key}:** {value}")
+
+    def _live_section(self, live: Dict[str, Any], node: str) -> Dict[str, Any]:
+        """Heading and placeholder for a streamed node, created in its reserved slot on first use."""
+        section = live["sections"].get(node)
+        if section is None:
+            box = live["boxes"][node]
+            box.markdown(self.STREAMED_NODES[node][1])
+            section = live["sections"][node] = {"slot": box.empty(), "text": "", "drawn": 0.0}
+        return section
+
+    def _process_message(self, message: Any, metadata: Dict, live: Dict[str, Any]) -> None:
+        """Append a streamed token chunk to its node's section, redrawing at most every STREAM_REDRAW_SECONDS."""
+        node = metadata.get("langgraph_node")
+        if node not in self.STREAMED_NODES:
+            return
+        text = _message_text(message)
+        if not text:
+            return
+        section = self._live_section(live, node)
+        section["text"] += text
+        now = time.monotonic()
+        if now - section["drawn"] >= STREAM_REDRAW_SECONDS:
+            section["slot"].markdown(section["text"] + "▌")
+            section["drawn"] = now
+
+    def _finish_section(self, live: Dict[str, Any], node: str, text: str) -> None:
+        section = self._live_section(live, node)
+        section["text"] = text
+        section["slot"].markdown(text, unsafe_allow_html=True)
+
+    def _process_step(self, step: Dict, status: Any, collected: Dict[str, Any], shown_steps: set,
+                      live: Dict[str, Any]) -> None:
+        """Write progress messages for a streamed state snapshot and collect the parts rendered at the end."""
+        # basic progress messages
+        if "cleaning_code" in step and "cleaning_code" not in shown_steps:
+            if step.get("cleaning_from_cache"):
+                status.write("♻️ Reusing a validated cleaning function for this schema...")
+            status.write("🧹 Cleaning data...")
+            shown_steps.add("cleaning_code")
+
+        if "cleaned_data" in step and "cleaned_data" not in shown_steps:
+            status.write("✨ Data cleaned...")
+            shown_steps.add("cleaned_data")
+
+        if "eda_code" in step and "eda_code" not in shown_steps:
+            status.write("📊 Performing EDA...")
+            shown_steps.add("eda_code")
+
+        if "eda_result" in step and "eda_result" not in shown_steps:
+            status.write("📈 Processing EDA results...")
+            self._render_eda_result(live["boxes"]["eda"], step["eda_result"])
+            shown_steps.add("eda_result")
+
+        if "rca_suggestion" in step and "rca_suggestion" not in shown_steps:
+            status.write("🔍 Analyzing root causes...")
+            self._finish_section(live, "RCA_Node", step["rca_suggestion"])
+            shown_steps.add("rca_suggestion")
+
+        if "answer" in step and "answer" not in shown_steps:
+            collected["final_answer"] = step["answer"]
+            status.write("📝 Collecting insights...")
+            shown_steps.add("answer")
+
+        if "visual_images" in step and "visual_images" not in shown_steps:
+            collected["visual_images"] = step["visual_images"]
+            status.write("🖼️ Loading visualizations...")
+            shown_steps.add("visual_images")
+
+        if "final_result" in step and "final_result" not in shown_steps:
+            collected["final_result"] = step["final_result"]
+            status.write("✨ Preparing final summary...")
+            self._finish_section(live, "Output", step["final_result"])
+            shown_steps.add("final_result")
+
+        if step.get("execution_timings"):
+            collected["execution_timings"] = step["execution_timings"]
+        if step.get("lint_findings"):
+            collected["lint_findings"] = step["lint_findings"]
+
+        # detect profiling report path/url (first found wins)
+        if not collected["profiling_report_ref"]:
+            candidate = self._extract_report_path_or_url(step)
+            if candidate:
+                collected["profiling_report_ref"] = candidate
+
+    def _stream_async(self, state: Dict, stream_mode: Any, cancel: threading.Event,
+                      cache_calls: Dict[str, int], llm_calls: Dict[str, float]) -> Iterator[Any]:
+        """
+        Drive `graph.astream` on the shared background event loop and hand each streamed item to the
+        Streamlit script thread, which is the only thread allowed to write to the page.
+        """
+        steps: "queue.Queue[Any]" = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                # The loop thread has its own context: re-enter the caller's cancel and call-count scopes
+                with cancel_scope(cancel), count_cache_calls(cache_calls), count_governor_calls(llm_calls):
+                    async for step in self.graph.astream(state, stream_mode=stream_mode):
+                        steps.put(step)
+            except Exception as e:
+                steps.put(e)
+            finally:
+                steps.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+        try:
+            while True:
+                item = steps.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            future.cancel()  # the script was stopped or errored: abandon the run
+
+    def display_result_on_ui(self, use_async: bool = False):
+        """Main entry: stream graph, collect items, and display in Streamlit UI.
+
+        use_async: the graph was built with async nodes and is streamed with `astream`.
+        """
         if self.usecase != "Data Analyst Agent":
             return
 
@@ -72,59 +270,72 @@ class DisplayResultStreamlit:
             "question": self.user_message,
             "raw_data": self.raw_data
         }
+        if any(t is not None for t in self.source_tables):
+            state["source_tables"] = self.source_tables
 
-        with st.status("🔄 Processing analysis...", expanded=False) as status:
-            final_answer = None
-            visual_images: List[Any] = []
-            final_result = None
-            profiling_report_ref: Optional[str] = None  # can be URL or path
+        status_box = st.status("🔄 Processing analysis...", expanded=False)
+        # Slots reserved in page order, filled as soon as their node streams or finishes
+        live: Dict[str, Any] = {
+            "boxes": {"eda": st.container(), "RCA_Node": st.container(), "Output": st.container()},
+            "sections": {},
+        }
+
+        with status_box as status:
+            collected: Dict[str, Any] = {
+                "final_answer": None,
+                "visual_images": [],
+                "final_result": None,
+                "profiling_report_ref": None,  # can be URL or path
+                "execution_timings": {},
+                "lint_findings": {},
+            }
             shown_steps = set()
 
+            # Stopping or rerunning the script leaves the scope: sandboxed code still running is killed
+            cancel = threading.Event()
             try:
-                # stream through graph steps
-                for step in self.graph.stream(state, stream_mode="values"):
-                    # basic progress messages
-                    if "cleaning_code" in step and "cleaning_code" not in shown_steps:
-                        status.write("🧹 Cleaning data...")
-                        shown_steps.add("cleaning_code")
-
-                    if "cleaned_data" in step and "cleaned_data" not in shown_steps:
-                        status.write("✨ Data cleaned...")
-                        shown_steps.add("cleaned_data")
-
-                    if "eda_code" in step and "eda_code" not in shown_steps:
-                        status.write("📊 Performing EDA...")
-                        shown_steps.add("eda_code")
-
-                    if "eda_result" in step and "eda_result" not in shown_steps:
-                        status.write("📈 Processing EDA results...")
-                        shown_steps.add("eda_result")
-
-                    if "rca_suggestion" in step and "rca_suggestion" not in shown_steps:
-                        status.write("🔍 Analyzing root causes...")
-                        shown_steps.add("rca_suggestion")
-
-                    if "answer" in step and "answer" not in shown_steps:
-                        final_answer = step["answer"]
-                        status.write("📝 Collecting insights...")
-                        shown_steps.add("answer")
-
-                    if "visual_images" in step and "visual_images" not in shown_steps:
-                        visual_images = step["visual_images"]
-                        status.write("🖼️ Loading visualizations...")
-                        shown_steps.add("visual_images")
-
-                    if "final_result" in step and "final_result" not in shown_steps:
-                        final_result = step["final_result"]
-                        status.write("✨ Preparing final summary...")
-                        shown_steps.add("final_result")
-
-                    # detect profiling report path/url (first found wins)
-                    if not profiling_report_ref:
-                        candidate = self._extract_report_path_or_url(step)
-                        if candidate:
-                            profiling_report_ref = candidate
+                # state snapshots drive progress and artifacts; message chunks stream RCA/summary tokens
+                stream_mode = ["values", "messages"]
+                # LLM cache hits/misses and queue waits of this run only; the cache and the rate limiters
+                # are shared by every session
+                with cancel_scope(cancel), count_cache_calls() as cache_calls, count_governor_calls() as llm_calls:
+                    try:
+                        if use_async:
+                            items = self._stream_async(state, stream_mode, cancel, cache_calls, llm_calls)
+                        else:
+                            items = self.graph.stream(state, stream_mode=stream_mode)
+                        for mode, payload in items:
+                            if mode == "messages":
+                                self._process_message(*payload, live)
+                            else:
+                                self._process_step(payload, status, collected, shown_steps, live)
+                    finally:
+                        cancel.set()
 
+                status.write(
+                    f"💾 LLM cache: {cache_calls['hits']} hits / {cache_calls['misses']} misses"
+                    + (f" / {cache_calls['bypassed']} retries bypassed" if cache_calls["bypassed"] else "")
+                )
+                for node, lint in collected["lint_findings"].items():
+                    if lint["findings"]:
+                        rules = ", ".join(sorted({f["rule"] for f in lint["findings"]}))
+                        status.write(
+                            f"🧹 {node} code: {len(lint['findings'])} row-wise pattern(s) ({rules}), "
+                            f"{lint['rewritten']} rewritten{', regenerated once' if lint['regenerated'] else ''}, "
+                            f"{lint['remaining']} left"
+                        )
+                for node, timing in collected["execution_timings"].items():
+                    status.write(
+                        f"⚙️ {node} code: compile {timing['compile_seconds'] * 1000:.0f} ms, "
+                        f"execute {timing['execute_seconds'] * 1000:.0f} ms"
+                        + (f", built-in checklist {timing['builtin_seconds'] * 1000:.0f} ms"
+                           if "builtin_seconds" in timing else "")
+                        + (f", data reduction {timing['reduce_seconds'] * 1000:.0f} ms"
+                           if "reduce_seconds" in timing else "")
+                    )
+                if llm_calls["calls"]:
+                    status.write(f"⏳ LLM queue wait: {llm_calls['queue_wait_seconds']:.1f}s over "
+                                 f"{llm_calls['calls']} calls ({llm_calls['retries']} retries)")
                 status.update(label="✅ Analysis complete!", state="complete")
 
             except Exception as e:
@@ -133,23 +344,34 @@ class DisplayResultStreamlit:
                 logger.exception("Error streaming graph: %s", e)
                 return
 
-        with st.container():
-            st.markdown("## ✅ Final Report")
+        visual_images = collected["visual_images"]
+        profiling_report_ref = collected["profiling_report_ref"]
 
-            if final_result:
-                st.markdown(final_result, unsafe_allow_html=True)
-            else:
-                st.markdown("No textual result produced by the agent.")
+        if not collected["final_result"]:
+            self._finish_section(live, "Output", "No textual result produced by the agent.")
 
+        with st.container():
             if visual_images:
                 st.markdown("---")
                 st.markdown("## 🖼️ Visualization")
                 for idx, img_item in enumerate(visual_images, start=1):
+                    if isinstance(img_item, dict) and "artifact_id" in img_item:
+                        artifact = get_artifact_store().get(img_item["artifact_id"])
+                        if artifact is None:
+                            st.warning(f"⚠️ Image {idx} is no longer in the artifact store (evicted)")
+                            continue
+                        # st.image takes SVG as markup text, raster formats as bytes
+                        data = artifact.data.decode("utf-8") if img_item.get("format") == "svg" else artifact.data
+                        st.image(data, caption=f"Image {idx}", width=DISPLAY_WIDTH)
+                        continue
+                    if isinstance(img_item, dict) and "error" in img_item:
+                        st.warning(f"⚠️ Image {idx} failed: {img_item['error']}")
+                        continue
                     path = self._get_image_path(img_item)
                     if path and os.path.exists(path):
                         try:
                             with open(path, "rb") as img_file:
-                                st.image(img_file.read(), caption=f"Image {idx}", width=750)
+                                st.image(img_file.read(), caption=f"Image {idx}", width=DISPLAY_WIDTH)
                         except Exception as e:
                             st.warning(f"⚠️ Failed to open image {path}: {e}")
                     else:
@@ -1,5 +1,6 @@
 import streamlit as st
 from Data_Science_Agent.UserInterface.config import Config
+from Data_Science_Agent.INGESTION.File_Readers import SUPPORTED_EXTENSIONS
 
 class SidebarUI:
     def __init__(self):
@@ -25,14 +26,44 @@ class SidebarUI:
                 if not self.user_controls["GOOGLE_API_KEY"]:
                     st.warning("⚠️ Please enter your Google Gemini API key to proceed. Don't have? refer : https://aistudio.google.com/")
 
+            self.user_controls["use_response_cache"] = st.checkbox(
+                "Cache LLM responses",
+                value=True,
+                help="Reuse stored answers for identical prompts (SQLite cache in .cache/). Untick to force fresh responses."
+            )
+            self.user_controls["use_async"] = st.checkbox(
+                "Async pipeline",
+                value=False,
+                help="Run graph nodes as coroutines: cleaning code for tables with different schemas is generated concurrently."
+            )
+            self.user_controls["visual_from_eda"] = st.checkbox(
+                "Charts in parallel with RCA",
+                value=False,
+                help="Plan the visualizations right after EDA, concurrently with the root-cause analysis. Faster, but the chart plan does not see the RCA summary."
+            )
+
             mode = "Upload File"
             self.user_controls["mode"] = mode
             if mode == "Upload File":
                 uploaded_files = st.sidebar.file_uploader(
                     "Upload your dataset",
-                    type=["csv", "xlsx", "json"],
+                    type=[ext.lstrip(".") for ext in SUPPORTED_EXTENSIONS],
                     accept_multiple_files=True
                 )
                 self.user_controls["file"] = uploaded_files
 
+            self.user_controls["compact_dtypes"] = st.checkbox(
+                "Compact dtypes on load",
+                value=False,
+                help="Downcast numbers and store strings as categoricals / Arrow strings to cut memory."
+            )
+            self.user_controls["out_of_core"] = st.checkbox(
+                "Out-of-core mode (DuckDB)",
+                value=False,
+                help="Keep datasets on disk and query them with DuckDB; only samples and aggregates are loaded into memory."
+            )
+            if self.user_controls["out_of_core"]:
+                paths = st.text_area("Local dataset paths (one per line)", placeholder="/data/events.parquet")
+                self.user_controls["local_paths"] = [p.strip() for p in paths.splitlines() if p.strip()]
+
         return self.user_controls
@@ -1,4 +1,6 @@
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from typing import Optional, Dict, Any
 import streamlit as st
 import pandas as pd
@@ -8,8 +10,14 @@ from streamlit.components.v1 import html
 from Data_Science_Agent.LLM.gemini import GeminiLLM
 from Data_Science_Agent.LLM.groq import GroqLLM
 from Data_Science_Agent.GRAPH.Python_Analyst_Graph import Graph_Builder
+from Data_Science_Agent.GRAPH.Graph_Registry import credentials_fingerprint, get_graph_registry
 from Data_Science_Agent.UserInterface.Display_Result import DisplayResultStreamlit
 from Data_Science_Agent.UserInterface.Sidebar import SidebarUI
+from Data_Science_Agent.INGESTION.File_Readers import is_supported
+from Data_Science_Agent.INGESTION.Ingestion_Cache import get_ingestion_cache
+from Data_Science_Agent.INGESTION.Dtype_Compaction import format_bytes
+from Data_Science_Agent.ENGINE.Out_Of_Core_Engine import open_table, supports_out_of_core
+from Data_Science_Agent.ENGINE.Sandbox_Executor import enable_copy_on_write
 
 # --- Streamlit Page Setup ---
 st.set_page_config(
@@ -18,6 +26,50 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Frames are shared between nodes and sessions; derived frames must not copy them eagerly
+enable_copy_on_write()
+
+
+# Upper bound on files parsed at the same time; each parse can hold a full copy of its file in memory
+MAX_INGEST_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _load_in_memory(ingestion_cache, file, compact: bool):
+    return ingestion_cache.load(file, compact=compact), None
+
+
+def _open_out_of_core(store_upload, source):
+    path = store_upload(source) if store_upload else source
+    table = open_table(path, name=getattr(source, "name", None))
+    # row count and sample are computed here, off the script thread, and memoized on the handle
+    table.shape
+    return table.sample(), table
+
+
+def _load_sources_in_parallel(sources):
+    """
+    Run every loader on a bounded thread pool, showing per-file progress.
+    Returns [(result, error)] in the same order as `sources`; a failing file only affects its own slot.
+    """
+    results = [(None, None)] * len(sources)
+    if not sources:
+        return results
+
+    progress = st.progress(0.0, text=f"Loading {len(sources)} file(s)...")
+    done = 0
+    with ThreadPoolExecutor(max_workers=min(MAX_INGEST_WORKERS, len(sources))) as pool:
+        futures = {pool.submit(loader): idx for idx, (_, loader) in enumerate(sources)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                results[idx] = (future.result(), None)
+            except Exception as e:
+                results[idx] = (None, e)
+            done += 1
+            progress.progress(done / len(sources), text=f"Loaded {sources[idx][0]} ({done}/{len(sources)})")
+    progress.empty()
+    return results
+
 
 def load_app():
     # --- Optional LangSmith Setup ---
@@ -39,31 +91,52 @@ def load_app():
     user_control_input = ui.Load_UI()
     user_message = st.chat_input("What would you like to analyze?")
     uploaded_files = user_control_input.get("file", [])
-    dataframes = []
+    out_of_core = user_control_input.get("out_of_core", False)
+    compact = user_control_input.get("compact_dtypes", False)
+    ingestion_cache = get_ingestion_cache()
+
+    # Everything to load, in upload order: (display name, loader returning (df, out-of-core table or None))
+    sources = []
     for file in uploaded_files:
-            try:
-                if file.name.endswith(".csv"):
-                    df = pd.read_csv(file)
-                elif file.name.endswith(".xlsx"):
-                    df = pd.read_excel(file)
-                elif file.name.endswith(".json"):
-                    df = pd.read_json(file)
-                else:
-                    st.warning(f"⚠️ Unsupported file format: {file.name}")
-                    continue
-
-                # Check for empty or broken DataFrame
-                if df.empty or len(df.columns) == 0:
-                    st.error(f"❌ {file.name} was read, but contains no usable data (no columns or all empty). Skipping.")
-                    continue
-
-                st.success(f"✅ Loaded: {file.name} — Shape: {df.shape}")
-                st.dataframe(df.head(), use_container_width=True)
-
-                dataframes.append(df)
+        if not is_supported(file.name):
+            st.warning(f"⚠️ Unsupported file format: {file.name}")
+            continue
+        if out_of_core and supports_out_of_core(file.name):
+            # Stored on disk as-is; only a bounded sample is materialized
+            sources.append((file.name, partial(_open_out_of_core, ingestion_cache.source_path, file)))
+        else:
+            # Parsed once per unique upload; reruns are served from the ingestion cache
+            sources.append((file.name, partial(_load_in_memory, ingestion_cache, file, compact)))
+    for path in user_control_input.get("local_paths", []) if out_of_core else []:
+        if not os.path.exists(path) or not supports_out_of_core(path):
+            st.warning(f"⚠️ Not a readable dataset for out-of-core mode: {path}")
+            continue
+        sources.append((os.path.basename(path), partial(_open_out_of_core, None, path)))
+
+    results = _load_sources_in_parallel(sources)
 
-            except Exception as e:
-                st.error(f"❌ Failed to read {file.name}: {e}")
+    dataframes = []
+    source_tables = []  # aligned with dataframes; None for frames held fully in memory
+    for (name, _), (loaded, error) in zip(sources, results):
+        if error is not None:
+            st.error(f"❌ Failed to read {name}: {error}")
+            continue
+        df, table = loaded
+
+        # Check for empty or broken DataFrame
+        if df.empty or len(df.columns) == 0:
+            st.error(f"❌ {name} was read, but contains no usable data (no columns or all empty). Skipping.")
+            continue
+
+        shape = table.shape if table is not None else df.shape
+        note = " (out-of-core)" if table is not None else ""
+        if "compaction_saved_bytes" in df.attrs:
+            note += f" — Compacted, saved {format_bytes(df.attrs['compaction_saved_bytes'])}"
+        st.success(f"✅ Loaded: {name} — Shape: {shape}{note}")
+        st.dataframe(df.head(), use_container_width=True)
+
+        dataframes.append(df)
+        source_tables.append(table)
 
     if user_message:
         with st.chat_message("user"):
@@ -83,12 +156,21 @@ def load_app():
                     st.error("❌ Google Gemini API Key is missing.")
                     return
                 llm_object = GeminiLLM(user_contols_input=user_control_input)
+                model_name = user_control_input.get("select_gemini_model")
 
             else:
                 st.error("❌ Invalid LLM selected. Please choose Groq or Google Gemini.")
                 return
 
-            llm = llm_object.get_llm_model()
+            # Clients and compiled graphs are built once per model/credentials and reused across reruns and sessions
+            registry = get_graph_registry()
+            llm_key = (
+                llm_type,
+                model_name,
+                credentials_fingerprint(api_key),
+                user_control_input.get("use_response_cache", True),
+            )
+            llm = registry.get_llm(llm_key, llm_object.get_llm_model)
 
             # --- Use Case Selection ---
             usecase = user_control_input.get("selected_usecase")
@@ -99,10 +181,15 @@ def load_app():
             if usecase == "Data Analyst Agent":
                 try:
                     # --- Run the Graph ---
-                    graph_builder = Graph_Builder(llm)
-                    graph = graph_builder.setup_graph(usecase)
-                    
-                    DisplayResultStreamlit(usecase, graph, user_message, dataframes).display_result_on_ui()
+                    use_async = bool(user_control_input.get("use_async", False))
+                    visual_from_eda = bool(user_control_input.get("visual_from_eda", False))
+                    # every Graph_Builder option changes the compiled graph, so each is part of the key
+                    graph = registry.get_graph(
+                        (usecase, use_async, visual_from_eda) + llm_key,
+                        lambda: Graph_Builder(llm, use_async=use_async, visual_from_eda=visual_from_eda).setup_graph(usecase),
+                    )
+
+                    DisplayResultStreamlit(usecase, graph, user_message, dataframes, source_tables).display_result_on_ui(use_async)
                 except Exception as e:
                     st.error("❌ Error in analysis pipeline.")
                     st.exception(e)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests import the app as `Data_Science_Agent.*`, like main.py run from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: multi-GB cases, run only with RUN_SLOW_TESTS=1")
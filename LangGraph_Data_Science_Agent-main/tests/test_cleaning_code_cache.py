@@ -0,0 +1,59 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from Data_Science_Agent.PYTHON_Data_Analyst.Cleaning_Code_Cache import Cleaning_Code_Cache
+from Data_Science_Agent.PYTHON_Data_Analyst.Data_Cleaning_Node import Data_Cleaning_Node
+
+# Cached functions that leave the missing values and duplicates in place
+STALE_A = "def clean_data(df):\n    return df\n"
+STALE_B = "def clean_data(df):\n    return df.reset_index(drop=True)\n"
+FRESH = (
+    "def clean_data(df):\n"
+    "    import pandas as pd\n"
+    "    return df.dropna().drop_duplicates().reset_index(drop=True)\n"
+)
+
+
+def _tables():
+    rng = np.random.default_rng(0)
+    a = pd.DataFrame({"id": np.arange(200), "value": rng.normal(size=200)})
+    a.loc[::7, "value"] = np.nan
+    b = pd.DataFrame({"name": [f"n{i % 50}" for i in range(200)], "score": rng.normal(size=200)})
+    b = pd.concat([b, b.head(40)], ignore_index=True)
+    return [a, b]
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_rejected_cache_hit_is_regenerated(tmp_path, use_async):
+    node = Data_Cleaning_Node(FakeListChatModel(responses=[f"```python\n{FRESH}```"] * 4))
+    node.code_cache = Cleaning_Code_Cache(str(tmp_path / "cleaning.sqlite"))
+
+    state = {"question": "summarize", "raw_data": _tables()}
+    state.update(node.lookup_cached_cleaning(state))
+    for fp, code in zip(state["schema_fingerprints"], (STALE_A, STALE_B)):
+        node.code_cache.put(fp, code)
+
+    # cache hit with a different stale function per table
+    state.update(node.lookup_cached_cleaning(state))
+    assert state["cleaning_from_cache"] and state["cleaning_codes"] == [STALE_A, STALE_B]
+    state.update(node.execute_cleaning_code(state))
+    state.update(node.check(state))
+    assert state["cleaned_or_not"] == "Reject"
+    assert all(node.code_cache.get(fp) is None for fp in state["schema_fingerprints"])
+
+    # regeneration must replace the per-table stale codes
+    generated = (asyncio.run(node.agenerate_cleaning_code(state)) if use_async
+                 else node.generate_cleaning_code(state))
+    # sync: one function, no per-table codes; async: one fresh function per schema group
+    assert "cleaning_codes" in generated
+    assert not {STALE_A, STALE_B} & set(generated["cleaning_codes"])
+    state.update(generated)
+    state.update(node.execute_cleaning_code(state))
+    assert all(not df.isna().any().any() and not df.duplicated().any() for df in state["cleaned_data"])
+    state.update(node.check(state))
+    assert state["cleaned_or_not"] == "Valid"
+    assert all(node.code_cache.get(fp) == state["cleaning_code"] for fp in state["schema_fingerprints"])
@@ -0,0 +1,28 @@
+from Data_Science_Agent.PYTHON_Data_Analyst.Context_Builder import fit_to_budget
+
+
+def _eda_result(answer: str) -> dict:
+    # standard checklist first, question_specific appended last as EDA_Node does
+    return {
+        "shape": [1000, 60],
+        "missing_counts": {f"col{i}": i for i in range(60)},
+        "describe": {f"col{i}": {"mean": 0.5, "std": 0.1, "min": 0.0, "max": 1.0} for i in range(60)},
+        "question_specific": {"answer": answer},
+    }
+
+
+def test_question_specific_survives_trimming():
+    result = [_eda_result("revenue grew 12% in Q3"), _eda_result("churn is highest in March")]
+    text = fit_to_budget(result, token_budget=400)
+    assert len(str(result)) > 400 * 4
+    assert len(text) <= 400 * 4 * 1.1
+    assert "revenue grew 12% in Q3" in text and "churn is highest in March" in text
+    # small standard sections stay whole; the large ones are trimmed
+    assert "shape: [1000, 60]" in text
+    assert "describe: " in text and "truncated" in text
+
+
+def test_small_results_and_plain_text_are_unchanged():
+    result = [_eda_result("ok")]
+    assert fit_to_budget(result, token_budget=10_000) == str(result)
+    assert fit_to_budget("x" * 100, token_budget=10).startswith("x" * 40 + "\n... [truncated 60")
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Data_Science_Agent.PYTHON_Data_Analyst.Correlation_Engine import (
+    PAIR_BAND_ROWS, SAMPLE_ROWS, correlation_matrix, correlation_report, projected_correlation,
+    sampled_correlation,
+)
+
+
+def _factor_frame(rows: int, k: int, seed: int, missing: float = 0.0) -> pd.DataFrame:
+    """Columns loading on a few shared factors with varying noise, so |r| spans the whole range."""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(rows, 5))
+    loadings = rng.normal(size=(5, k)) * (rng.random(k) < 0.5)
+    data = factors @ loadings + rng.normal(size=(rows, k)) * rng.uniform(0.3, 3.0, k)
+    data[rng.random((rows, k)) < missing] = np.nan
+    return pd.DataFrame(data, columns=[f"c{i}" for i in range(k)])
+
+
+@pytest.fixture(scope="module")
+def wide():
+    # more columns than one band of extract_pairs, with missing values for pairwise-complete counts
+    return _factor_frame(rows=2_000, k=PAIR_BAND_ROWS + 44, seed=1, missing=0.02)
+
+
+def _columns(df: pd.DataFrame):
+    return [df[c].to_numpy(dtype="float64") for c in df.columns]
+
+
+def _pandas_pairs(df: pd.DataFrame):
+    corr = df.corr().to_numpy()
+    i, j = np.triu_indices(len(corr), k=1)
+    return pd.DataFrame({"a": df.columns[i], "b": df.columns[j], "r": corr[i, j]})
+
+
+def test_blockwise_matrix_matches_pandas(wide):
+    np.testing.assert_allclose(correlation_matrix(_columns(wide)), wide.corr().to_numpy(), atol=1e-5)
+
+
+def test_threshold_pairs_match_pandas(wide):
+    report = correlation_report(list(wide.columns), _columns(wide), threshold=0.5)
+    assert report["method"] == "exact" and report["error_bound"] == 0.0
+    found = {(p["column_a"], p["column_b"]): p["corr"] for p in report["pairs"]}
+    expected = _pandas_pairs(wide)
+    # float32 blocks move r by ~1e-6: leave out pairs that close to the threshold
+    clear = expected[(expected["r"].abs() - 0.5).abs() > 1e-4]
+    strong = clear[clear["r"].abs() > 0.5]
+    assert len(strong) > 100
+    clear_keys = set(zip(clear["a"], clear["b"]))
+    assert {key for key in found if key in clear_keys} == set(zip(strong["a"], strong["b"]))
+    for a, b, r in strong.itertuples(index=False):
+        assert found[(a, b)] == pytest.approx(r, abs=1e-4)
+    strengths = [abs(p["corr"]) for p in report["pairs"]]
+    assert strengths == sorted(strengths, reverse=True)
+
+
+def test_top_k_pairs_match_pandas(wide):
+    report = correlation_report(list(wide.columns), _columns(wide), threshold=None, top_k=20)
+    expected = _pandas_pairs(wide)
+    expected = expected.reindex(expected["r"].abs().sort_values(ascending=False).index).head(20)
+    assert [(p["column_a"], p["column_b"]) for p in report["pairs"]] == list(zip(expected["a"], expected["b"]))
+    np.testing.assert_allclose([p["corr"] for p in report["pairs"]], expected["r"], atol=1e-4)
+
+
+@pytest.mark.parametrize("estimate", [sampled_correlation, projected_correlation])
+def test_approximations_stay_within_their_bound(estimate):
+    df = _factor_frame(rows=3 * SAMPLE_ROWS, k=24, seed=2, missing=0.01)
+    columns = _columns(df)
+    corr, bound = estimate(columns)
+    exact = df.corr().to_numpy()
+    off_diagonal = ~np.eye(len(exact), dtype=bool)
+    assert 0 < bound < 0.2
+    assert np.abs(corr - exact)[off_diagonal].max() <= bound
+
+
+@pytest.mark.parametrize("method", ["sample", "projection"])
+def test_report_carries_the_method_and_bound(method):
+    df = _factor_frame(rows=3 * SAMPLE_ROWS, k=24, seed=2)
+    report = correlation_report(list(df.columns), _columns(df), method=method)
+    assert report["method"] == method and report["error_bound"] > 0
+    exact = {(a, b): r for a, b, r in _pandas_pairs(df).itertuples(index=False)}
+    for pair in report["pairs"]:
+        assert abs(pair["corr"] - exact[(pair["column_a"], pair["column_b"])]) <= report["error_bound"] + 1e-4
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Data_Science_Agent.PYTHON_Data_Analyst.Data_Validator import THRESHOLDS, validate_frame, validate_tables
+
+
+def _clean(rows: int = 100) -> pd.DataFrame:
+    return pd.DataFrame({"x": np.arange(rows, dtype="float64"), "s": [f"v{i}" for i in range(rows)]})
+
+
+def _verdict(df: pd.DataFrame, rule: str):
+    report = validate_frame(df)
+    return report["verdict"], report["metrics"][rule]
+
+
+def test_clean_frame_is_valid():
+    report = validate_frame(_clean())
+    assert report["verdict"] == "Valid" and report["issues"] == []
+
+
+def test_thresholds_are_the_documented_ones():
+    # the boundary cases below are built around these values
+    assert THRESHOLDS == {"null_rate": (0.0, 0.01), "duplicate_rate": (0.0, 0.01), "mixed_type_columns": (0, 0),
+                          "outlier_rate": (0.01, 0.05), "constant_columns": (0, 1)}
+
+
+# 200 cells: a rate equal to the fail threshold (1%) is still borderline, only above it rejects
+@pytest.mark.parametrize("nulls, verdict", [(0, "Valid"), (1, "Borderline"), (2, "Borderline"), (3, "Reject")])
+def test_residual_nulls(nulls, verdict):
+    df = _clean()
+    df.loc[:nulls - 1, "x"] = np.nan
+    assert _verdict(df, "null_rate") == (verdict, nulls / 200)
+
+
+@pytest.mark.parametrize("duplicates, verdict", [(0, "Valid"), (1, "Borderline"), (2, "Reject")])
+def test_duplicate_rate(duplicates, verdict):
+    df = _clean()
+    df.iloc[100 - duplicates:] = df.iloc[:duplicates].to_numpy()
+    assert _verdict(df, "duplicate_rate") == (verdict, duplicates / 100)
+
+
+def test_mixed_types_reject():
+    df = _clean().astype({"s": object})
+    df.loc[3, "s"] = 3
+    report = validate_frame(df)
+    assert report["verdict"] == "Reject" and report["metrics"]["mixed_type_columns"] == 1
+    assert "mixed-type columns: s" in report["issues"]
+
+
+@pytest.mark.parametrize("extremes, verdict", [(1, "Valid"), (2, "Borderline"), (5, "Borderline"), (6, "Reject")])
+def test_iqr_outliers(extremes, verdict):
+    df = _clean()
+    df.loc[:extremes - 1, "x"] = 1e6
+    assert _verdict(df, "outlier_rate") == (verdict, extremes / 100)
+
+
+def test_skewed_column_clipped_with_other_quartiles_is_valid():
+    # fences from another sample's quartiles, as when cleaning clips with table-wide statistics
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(0.0, 1.0, 20_000)
+    q1, q3 = np.percentile(values[:2_000], [25, 75])
+    clipped = np.clip(values, q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+    ids = np.arange(len(values))  # clipped values repeat; keep the rows distinct
+    assert _verdict(pd.DataFrame({"id": ids, "x": clipped}), "outlier_rate") == ("Valid", 0.0)
+    # never clipped: flagged, but a natural skew alone does not reject the table
+    assert _verdict(pd.DataFrame({"id": ids, "x": values}), "outlier_rate")[0] == "Borderline"
+
+
+@pytest.mark.parametrize("constant, verdict", [(0, "Valid"), (1, "Borderline"), (2, "Reject")])
+def test_constant_columns(constant, verdict):
+    df = _clean().assign(**{f"c{i}": 1.0 for i in range(constant)})
+    assert _verdict(df, "constant_columns") == (verdict, constant)
+
+
+def test_failed_cleaning_rejects_the_table():
+    report = validate_tables([_clean(), _clean()], [None, "boom"])
+    assert report["verdict"] == "Reject"
+    assert [t["verdict"] for t in report["tables"]] == ["Valid", "Reject"]
+    assert report["issues"] == ["Table 2: the cleaning function failed: boom"]
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from Data_Science_Agent.INGESTION.Dtype_Compaction import compact_dtypes
+from Data_Science_Agent.PYTHON_Data_Analyst.Data_Cleaning_Node import Data_Cleaning_Node
+
+CLEAN = (
+    "def clean_data(df):\n"
+    "    df['city'] = df['city'].fillna('Unknown')\n"
+    "    df.loc[0, 'city'] = 'Elsewhere'\n"
+    "    return df\n"
+)
+
+
+def _frame() -> pd.DataFrame:
+    n = 400
+    city = pd.Series(["Paris", "Rome", None, "Oslo"] * (n // 4), dtype=object)
+    name = pd.Series([f"user{i}" if i % 10 else None for i in range(n)], dtype=object)
+    return pd.DataFrame({"city": city, "name": name, "n": np.arange(n)})
+
+
+def test_compacted_strings_keep_nan_for_missing_values():
+    compacted, _ = compact_dtypes(_frame())
+    assert isinstance(compacted["city"].dtype, pd.CategoricalDtype)
+    missing = compacted["name"].iloc[0]
+    assert missing is not pd.NA and pd.isna(missing)
+
+
+def test_cleaning_can_write_values_outside_the_categories():
+    compacted, _ = compact_dtypes(_frame())
+    node = Data_Cleaning_Node(FakeListChatModel(responses=["unused"]))
+    state = {"raw_data": [compacted], "cleaning_code": CLEAN}
+    cleaned = node.execute_cleaning_code(state)["cleaned_data"][0]
+    assert cleaned is not compacted
+    assert cleaned["city"].iloc[0] == "Elsewhere"
+    assert (cleaned["city"] == "Unknown").sum() == 100
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from Data_Science_Agent.PYTHON_Data_Analyst.EDA_Accumulators import Co_Moments, HyperLogLog, KLL_Sketch, Moments
+from Data_Science_Agent.PYTHON_Data_Analyst.EDA_Engine import chunked_eda, frame_chunks, standard_eda
+from Data_Science_Agent.PYTHON_Data_Analyst.EDA_Node import EDA_Node
+
+EDA = (
+    "def perform_eda(df):\n"
+    "    return {'rows': int(len(df))}\n"
+)
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(7)
+    n = 40_000
+    x = rng.normal(10.0, 3.0, n)
+    z = rng.lognormal(0.0, 1.0, n)
+    z[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "x": x,
+        "y": 2.0 * x + rng.normal(0.0, 1.0, n),
+        "z": z,
+        "id": rng.integers(0, 25_000, n),
+        "label": rng.choice([f"v{i}" for i in range(300)], n),
+    })
+
+
+def _parts(df: pd.DataFrame):
+    """Uneven row slices, folded into three partials that are merged at the end (as chunked_eda's workers)."""
+    bounds = [0, 1, 3_000, 3_001, 17_000, 29_999, len(df)]
+    return [df.iloc[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def _fold(df: pd.DataFrame, make, update):
+    partials = [make() for _ in range(3)]
+    for i, part in enumerate(_parts(df)):
+        update(partials[i % 3], part)
+    total = partials[0]
+    for partial in partials[1:]:
+        total.merge(partial)
+    return total
+
+
+def test_moments_match_pandas(frame):
+    for name in ["x", "z"]:
+        moments = _fold(frame, Moments, lambda m, part: m.update(part[name].dropna().to_numpy()))
+        col = frame[name]
+        assert moments.n == col.count()
+        assert moments.mean == pytest.approx(col.mean(), rel=1e-12)
+        assert moments.std == pytest.approx(col.std(), rel=1e-10)
+        assert (moments.min, moments.max) == (col.min(), col.max())
+
+
+def test_kll_iqr_fences_are_within_the_rank_error(frame):
+    sketch = _fold(frame, KLL_Sketch, lambda s, part: s.update(part["z"].dropna().to_numpy()))
+    values = frame["z"].dropna()
+    eps = 1.7 / sketch.k
+    q1, q3 = sketch.quantiles([0.25, 0.75])
+    for estimate, q in ((q1, 0.25), (q3, 0.75)):
+        assert abs((values <= estimate).mean() - q) <= eps
+
+    # the fence q1 - 1.5 * IQR grows with q1 and shrinks with q3, so rank errors of eps bound it
+    def fence(lo, hi):
+        return lo - 1.5 * (hi - lo), hi + 1.5 * (hi - lo)
+
+    exact = values.quantile([0.25 - eps, 0.25 + eps, 0.75 - eps, 0.75 + eps]).to_numpy()
+    lower, upper = fence(q1, q3)
+    assert fence(exact[0], exact[3])[0] <= lower <= fence(exact[1], exact[2])[0]
+    assert fence(exact[1], exact[2])[1] <= upper <= fence(exact[0], exact[3])[1]
+
+
+@pytest.mark.parametrize("name", ["id", "label"])
+def test_hyperloglog_is_within_its_error(frame, name):
+    hll = _fold(frame, HyperLogLog, lambda h, part: h.update(part[name]))
+    exact = frame[name].nunique()
+    # three standard errors of 1.04 / sqrt(2**p)
+    assert abs(hll.estimate() - exact) <= 3 * 1.04 / np.sqrt(2 ** hll.p) * exact
+
+
+def test_co_moments_match_pairwise_pandas_correlation(frame):
+    numeric = frame[["x", "y", "z", "id"]]
+    # partials start on NaN-free single rows (scalar counts) and switch to pairwise counts on the first NaN
+    co = _fold(numeric, lambda: Co_Moments(4), lambda c, part: c.update(part.to_numpy(dtype="float64")))
+    np.testing.assert_allclose(co.correlation(), numeric.astype("float64").corr().to_numpy(), atol=1e-9)
+
+
+def test_chunked_checklist_has_the_standard_shape(frame):
+    standard = standard_eda(frame)
+    chunked = chunked_eda(frame_chunks(frame, rows=7_000), workers=2)
+    assert set(chunked) == set(standard) | {"chunked"}
+    assert {k: set(v) for k, v in chunked["describe"].items()} == {k: set(v) for k, v in standard["describe"].items()}
+    # exact fields agree with the in-memory checklist
+    assert chunked["shape"] == standard["shape"] and chunked["missing_counts"] == standard["missing_counts"]
+    assert chunked["high_correlations"] == standard["high_correlations"]
+
+    node = EDA_Node(FakeListChatModel(responses=["unused"]), chunked_eda=True, eda_workers=2)
+    results = []
+    for chunked_mode in (False, True):
+        node.chunked_eda = chunked_mode
+        results.append(node.execute_eda_code({"raw_data": [frame], "eda_code": EDA})["eda_result"][0])
+    assert set(results[1]) == set(results[0]) | {"chunked"}
+    assert results[0]["question_specific"] == results[1]["question_specific"] == {"rows": len(frame)}
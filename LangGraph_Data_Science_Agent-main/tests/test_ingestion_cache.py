@@ -0,0 +1,45 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from Data_Science_Agent.INGESTION import Ingestion_Cache as ingestion
+from Data_Science_Agent.INGESTION.Ingestion_Cache import Ingestion_Cache
+
+
+class Upload(io.BytesIO):
+    """Stand-in for Streamlit's UploadedFile."""
+
+    def __init__(self, data: bytes, name: str, file_id: str):
+        super().__init__(data)
+        self.name = name
+        self.file_id = file_id
+        self.size = len(data)
+
+
+def _csv() -> bytes:
+    return pd.DataFrame({"a": range(100), "b": ["x", "y"] * 50}).to_csv(index=False).encode()
+
+
+def test_reruns_do_not_rehash_the_upload(tmp_path, monkeypatch):
+    hashed = []
+    fingerprint = ingestion.fingerprint_bytes
+    monkeypatch.setattr(ingestion, "fingerprint_bytes", lambda data: hashed.append(len(data)) or fingerprint(data))
+    cache = Ingestion_Cache(spill_dir=str(tmp_path))
+    upload = Upload(_csv(), "t.csv", "id-1")
+    first = cache.load(upload)
+    for _ in range(3):
+        assert cache.load(upload) is first
+    assert len(hashed) == 1
+    # same bytes uploaded again (new file id): hashed once more, then served from the same entry
+    assert cache.load(Upload(_csv(), "t.csv", "id-2")) is first
+    assert len(hashed) == 2
+
+
+def test_counters_are_exact_under_concurrent_loads(tmp_path):
+    cache = Ingestion_Cache(spill_dir=str(tmp_path))
+    upload = Upload(_csv(), "t.csv", "id-1")
+    cache.load(upload)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: cache.load(upload), range(2000)))
+    assert (cache.hits, cache.misses) == (2000, 1)
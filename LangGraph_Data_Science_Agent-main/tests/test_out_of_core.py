@@ -0,0 +1,144 @@
+import gc
+import os
+import itertools
+
+import pandas as pd
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from Data_Science_Agent.ENGINE.Out_Of_Core_Engine import Out_Of_Core_Table
+from Data_Science_Agent.ENGINE.Sandbox_Executor import Sandbox_Executor
+from Data_Science_Agent.PYTHON_Data_Analyst.Batch_Cleaning import frame_cleaning_stats, plan_batches
+from Data_Science_Agent.PYTHON_Data_Analyst.Data_Cleaning_Node import CLEANING_RUNNER, Data_Cleaning_Node
+from Data_Science_Agent.PYTHON_Data_Analyst.EDA_Node import EDA_Node
+
+CLEAN = (
+    "def clean_data(df):\n"
+    "    return df.dropna().drop_duplicates().reset_index(drop=True)\n"
+)
+# fences and constant columns from the table-wide statistics, so every batch clips the same way
+CLIP = (
+    "def clean_data(df):\n"
+    "    stats = df.attrs['table_stats']\n"
+    "    df = df.drop(columns=stats['constant_columns'])\n"
+    "    q1, q3 = stats['quartiles']['a']\n"
+    "    return df.assign(a=df['a'].clip(q1 - 0.5 * (q3 - q1), q3 + 0.5 * (q3 - q1)))\n"
+)
+EDA = (
+    "def perform_eda(df):\n"
+    "    return {'rows': int(len(df))}\n"
+)
+
+
+@pytest.fixture
+def table(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    # duplicates span batches of 2 rows, and one row has a missing value
+    pd.DataFrame({"a": [3, 1, 3, 2, 1, None, 4, 2], "b": list("xyxzywvz"), "c": [7] * 8}).to_csv(
+        data / "t.csv", index=False)
+    return Out_Of_Core_Table(str(data / "t.csv"), temp_dir=str(tmp_path / "duckdb"))
+
+
+def _files(path):
+    return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+
+def test_results_go_to_temp_dir_and_are_removed_with_the_table(table):
+    result = table.map_batches(lambda df: df, batch_rows=2)
+    assert _files(os.path.dirname(table.path)) == ["t.csv"]
+    assert os.path.dirname(result.path) == os.path.join(table.temp_dir, "results")
+    path = result.path
+    del result
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_dedup_is_opt_in_and_keeps_first_occurrences_in_order(table):
+    kept = table.map_batches(lambda df: df, batch_rows=2)
+    assert len(pd.read_parquet(kept.path)) == 8
+    deduped = table.map_batches(lambda df: df, distinct=True, batch_rows=2)
+    assert pd.read_parquet(deduped.path)["b"].tolist() == list("xyzwv")
+    last = table.map_batches(lambda df: df, distinct=True, subset=["b"], keep="last", batch_rows=2)
+    assert pd.read_parquet(last.path)["a"].fillna(-1).tolist() == [3, 1, -1, 4, 2]  # x, y, w, v, z
+
+
+def test_dedup_plan_comes_from_the_syntax_tree():
+    assert not plan_batches("def clean_data(df):\n    # no drop_duplicates here\n    return df.dropna()\n").dedup
+    plan = plan_batches("def clean_data(df):\n    return df.drop_duplicates(subset='b', keep='last')\n")
+    assert plan == (True, ["b"], "last")
+    with pytest.raises(ValueError, match="keep=False"):
+        plan_batches("def clean_data(df):\n    return df.drop_duplicates(keep=False)\n")
+
+
+def test_batch_statistics_are_refused():
+    with pytest.raises(ValueError, match=r"line 2.*\.quantile\(\)"):
+        plan_batches("def clean_data(df):\n    q1 = df['a'].quantile(0.25)\n    return df\n")
+    assert not plan_batches(CLIP).dedup
+
+
+def test_batches_are_cleaned_with_table_wide_statistics(table):
+    stats = table.cleaning_stats()
+    full = pd.read_csv(table.path)
+    assert stats["constant_columns"] == frame_cleaning_stats(full)["constant_columns"] == ["c"]
+    assert stats["quartiles"]["a"] == pytest.approx(frame_cleaning_stats(full)["quartiles"]["a"], abs=0.5)
+
+    executor = Sandbox_Executor(max_workers=1)
+    try:
+        def clean(df):
+            return executor.run(CLIP, df, "clean_data", runner=CLEANING_RUNNER, return_frame=True,
+                                table_stats=stats).value
+        result = table.map_batches(clean, batch_rows=2)
+        batched = pd.read_parquet(result.path)
+        whole = clean(full)
+    finally:
+        executor.shutdown()
+    pd.testing.assert_frame_equal(batched, whole, check_dtype=False)
+    assert list(batched.columns) == ["a", "b"]
+
+
+def test_mismatched_batch_fails_instead_of_truncating(table):
+    calls = itertools.count()
+
+    def shift(df):
+        # int64 first, float64 with fractions afterwards
+        return df.assign(a=range(len(df))) if next(calls) == 0 else df.assign(a=df["a"] + 0.5)
+
+    with pytest.raises(ValueError, match="first batch"):
+        table.map_batches(shift, batch_rows=2)
+    assert _files(os.path.join(table.temp_dir, "results")) == []
+
+
+def test_failing_batch_leaves_no_files(table):
+    def fail(df):
+        if df["b"].eq("w").any():
+            raise RuntimeError("boom")
+        return df
+
+    with pytest.raises(RuntimeError):
+        table.map_batches(fail, batch_rows=2)
+    assert _files(os.path.join(table.temp_dir, "results")) == []
+
+
+def test_eda_summarizes_the_cleaned_table(table):
+    state = {"question": "summarize", "raw_data": [table.sample()], "source_tables": [table],
+             "cleaning_code": CLEAN}
+    state.update(Data_Cleaning_Node(FakeListChatModel(responses=["unused"])).execute_cleaning_code(state))
+    assert state["cleaned_tables"][0] is not table
+    state["eda_code"] = EDA
+    result = EDA_Node(FakeListChatModel(responses=["unused"])).execute_eda_code(state)["eda_result"][0]
+    # 8 rows, one with a missing value and three duplicates
+    assert result["full_table_summary"]["row_count"] == 4
+    assert result["question_specific"] == {"rows": 4}
+
+
+def test_failed_out_of_core_cleaning_is_reported(table):
+    node = Data_Cleaning_Node(FakeListChatModel(responses=["unused"]), reuse_cleaning_code=False)
+    state = {"question": "clean", "raw_data": [table.sample()], "source_tables": [table],
+             "cleaning_code": "def clean_data(df):\n    return df[df['a'] < df['a'].median()]\n"}
+    state.update(node.execute_cleaning_code(state))
+    assert state["cleaned_tables"] == [None]
+    assert "median" in state["cleaning_errors"][0]
+    checked = node.check(state)
+    assert checked["cleaned_or_not"] == "Reject"
+    assert "the cleaning function failed" in checked["validation_report"]["issues"][0]
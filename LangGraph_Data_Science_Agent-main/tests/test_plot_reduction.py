@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from Data_Science_Agent.PYTHON_Data_Analyst.Plot_Reduction import describe_reduction, describe_reductions
+from Data_Science_Agent.PYTHON_Data_Analyst.Visual_Node import Visual_Node
+
+PLAN = """### Suggested Visualization:
+- **Title**: Average price per region
+- **Type**: Bar chart
+- **X**: region
+- **Y**: price
+- **Description**: Mean price for each region.
+"""
+CODE = """```python
+def generate_visualizations(df):
+    import matplotlib.pyplot as plt
+    plt.bar(range(len(df)), df.iloc[:, -1])
+    plt.show()
+```"""
+
+
+def _tables():
+    rng = np.random.default_rng(0)
+    sales = pd.DataFrame({"region": rng.choice(list("NESW"), 5000), "price": rng.random(5000)})
+    other = pd.DataFrame({"day": np.arange(300), "visits": rng.integers(0, 100, 300)})
+    return [sales, other]
+
+
+def test_reduction_is_planned_per_table():
+    node = Visual_Node(FakeListChatModel(responses=[PLAN, CODE]))
+    state = {"question": "prices by region", "cleaned_data": _tables(), "eda_result": [], "rca_suggestion": ""}
+    out = node.generate_visual_code(state)
+    assert [r["kind"] for r in out["plot_reductions"]] == ["bar", "sample"]
+
+    state.update(out)
+    images = node.execute_visual_code(state)["visual_images"]
+    assert len(images) == 2 and all("artifact_id" in image for image in images)
+
+
+def test_prompt_describes_every_shape():
+    bar = {"kind": "bar", "x": "region", "y": "price", "count": "count"}
+    note = describe_reductions([bar, {"kind": "sample"}])
+    assert "Table 1: " + describe_reduction(bar) in note
+    assert "Table 2: " + describe_reduction({"kind": "sample"}) in note
+    assert describe_reductions([bar, dict(bar)]) == describe_reduction(bar)
@@ -0,0 +1,150 @@
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from Data_Science_Agent.LLM.Rate_Limiter import Governed_Chat_Model, LLM_Governor, count_governor_calls
+
+
+class Throttled(Exception):
+    """Provider 429, optionally with a Retry-After header."""
+    status_code = 429
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__("429 Too Many Requests")
+        self.response = SimpleNamespace(headers={"retry-after": str(retry_after)} if retry_after else {})
+
+
+class Flaky_Chat_Model(BaseChatModel):
+    """Raises `Throttled` for the first `failures` calls, then answers "ok"."""
+    failures: int = 0
+    retry_after: Optional[float] = None
+    calls: List[int] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "flaky"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls.append(1)
+        if len(self.calls) <= self.failures:
+            raise Throttled(self.retry_after)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+class Slow_Chat_Model(BaseChatModel):
+    """Holds every call for a moment and records how many run at once (sync and async share the count)."""
+    tracker: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        with self.tracker:
+            time.sleep(0.05)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        with self.tracker:
+            await asyncio.sleep(0.05)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+class Concurrency:
+    def __init__(self):
+        self.current = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+def _governed(inner: BaseChatModel, sleeps: list, **limits: Any) -> Governed_Chat_Model:
+    limits = {"requests_per_minute": None, "tokens_per_minute": None, "base_delay": 0.5, **limits}
+    return Governed_Chat_Model(inner=inner, governor=LLM_Governor(sleep=sleeps.append, **limits))
+
+
+def test_throttled_calls_are_retried_with_backoff():
+    sleeps = []
+    inner = Flaky_Chat_Model(failures=2)
+    model = _governed(inner, sleeps, max_retries=3)
+    assert model.invoke("hi").content == "ok"
+    assert len(inner.calls) == 3
+    # full jitter: retry n waits at most base_delay * 2**n
+    assert len(sleeps) == 2 and sleeps[0] <= 0.5 and sleeps[1] <= 1.0
+    stats = model.governor.stats()
+    assert (stats["calls"], stats["retries"], stats["throttled"], stats["failures"]) == (3, 2, 2, 0)
+    assert stats["in_flight"] == 0
+
+
+def test_retry_after_header_sets_the_delay_up_to_max_delay():
+    sleeps = []
+    _governed(Flaky_Chat_Model(failures=1, retry_after=7), sleeps).invoke("hi")
+    assert sleeps == [7.0]
+    sleeps = []
+    _governed(Flaky_Chat_Model(failures=1, retry_after=120), sleeps, max_delay=10).invoke("hi")
+    assert sleeps == [10.0]
+
+
+def test_gives_up_after_max_retries():
+    sleeps = []
+    inner = Flaky_Chat_Model(failures=10)
+    model = _governed(inner, sleeps, max_retries=2)
+    with pytest.raises(Throttled):
+        model.invoke("hi")
+    assert len(inner.calls) == 3 and len(sleeps) == 2
+    stats = model.governor.stats()
+    assert (stats["retries"], stats["throttled"], stats["failures"], stats["in_flight"]) == (2, 2, 1, 0)
+
+
+def test_request_bucket_delays_calls_over_the_rate():
+    sleeps = []
+    model = _governed(Flaky_Chat_Model(), sleeps, requests_per_minute=1)
+    model.invoke("first")
+    model.invoke("second")
+    # the bucket holds one request; the second waits for a refill at 1/60 per second
+    assert len(sleeps) == 1 and sleeps[0] == pytest.approx(60.0, abs=1.0)
+
+
+def test_in_flight_cap_holds_for_sync_and_async_callers():
+    tracker = Concurrency()
+    model = _governed(Slow_Chat_Model(tracker=tracker), [], max_in_flight=2)
+
+    async def async_callers():
+        await asyncio.gather(*(model.ainvoke(f"async {i}") for i in range(6)))
+
+    threads = [threading.Thread(target=model.invoke, args=(f"sync {i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(async_callers())
+    for thread in threads:
+        thread.join()
+    assert tracker.peak == 2
+    stats = model.governor.stats()
+    assert stats["calls"] == 12 and stats["in_flight"] == 0
+
+
+def test_run_counts_cover_only_calls_in_scope():
+    model = _governed(Flaky_Chat_Model(failures=1), [])
+    model.invoke("before")
+    with count_governor_calls() as counts:
+        model.invoke("mine")
+        # another session's call on a different thread (fresh context) is not counted here
+        other = threading.Thread(target=model.invoke, args=("other",))
+        other.start()
+        other.join()
+    assert (counts["calls"], counts["retries"]) == (1, 0)
+    assert model.governor.stats()["calls"] == 4  # the first call was retried once
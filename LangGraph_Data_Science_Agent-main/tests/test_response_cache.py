@@ -0,0 +1,49 @@
+import threading
+
+import pandas as pd
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from Data_Science_Agent.LLM.Response_Cache import SQLite_Response_Cache, bypass_response_cache, count_cache_calls
+from Data_Science_Agent.PYTHON_Data_Analyst.Data_Cleaning_Node import Data_Cleaning_Node
+
+FIRST = "def clean_data(df):\n    return df\n"
+SECOND = "def clean_data(df):\n    return df.dropna()\n"
+
+
+def test_bypass_skips_lookup_and_update(tmp_path):
+    cache = SQLite_Response_Cache(str(tmp_path / "responses.sqlite"))
+    llm = FakeListChatModel(responses=["first", "second", "third"], cache=cache)
+    assert llm.invoke("prompt").content == "first"
+    assert llm.invoke("prompt").content == "first"
+    with bypass_response_cache():
+        assert llm.invoke("prompt").content == "second"
+    # the bypassed answer was not stored over the cached one
+    assert llm.invoke("prompt").content == "first"
+
+
+def test_counts_cover_only_calls_in_scope(tmp_path):
+    cache = SQLite_Response_Cache(str(tmp_path / "responses.sqlite"))
+    llm = FakeListChatModel(responses=["a", "b"], cache=cache)
+    llm.invoke("shared")
+    with count_cache_calls() as counts:
+        llm.invoke("shared")
+        llm.invoke("new")
+        # another session's call on a different thread (fresh context) is not counted here
+        other = threading.Thread(target=llm.invoke, args=("other",))
+        other.start()
+        other.join()
+        with bypass_response_cache():
+            llm.invoke("shared")
+    assert counts == {"hits": 1, "misses": 1, "bypassed": 1}
+    assert cache.stats() == {"hits": 1, "misses": 3}
+
+
+def test_cleaning_retry_after_rejection_is_not_served_from_cache(tmp_path):
+    cache = SQLite_Response_Cache(str(tmp_path / "responses.sqlite"))
+    llm = FakeListChatModel(responses=[f"```python\n{FIRST}```", f"```python\n{SECOND}```"], cache=cache)
+    node = Data_Cleaning_Node(llm)
+    state = {"question": "clean", "raw_data": [pd.DataFrame({"x": [1.0, None, 3.0]})]}
+    assert node.generate_cleaning_code(state)["cleaning_code"].strip() == FIRST.strip()
+    # rejected by the LLM judge, so the prompt carries no validator feedback and is unchanged
+    state.update(cleaned_or_not="Reject", validation_report={"verdict": "Borderline", "issues": []})
+    assert node.generate_cleaning_code(state)["cleaning_code"].strip() == SECOND.strip()
@@ -0,0 +1,114 @@
+import os
+import sys
+import subprocess
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from Data_Science_Agent.ENGINE.Sandbox_Executor import Sandbox_Executor, SandboxMemoryError, read_frame, write_frame
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/<pid>/status")
+
+MB = 1024 ** 2
+
+# Reads every column a few times, so the parent polls the worker while the input is mapped
+READ_ONLY = """
+def summarize(df):
+    total = 0.0
+    for _ in range(5):
+        total += float(df.sum().sum())
+    return total
+"""
+
+# Builds a private copy of the whole input
+COPY_ALL = """
+def summarize(df):
+    import time
+    doubled = df * 2.0
+    time.sleep(1.0)
+    return float(doubled.iloc[0, 0])
+"""
+
+
+@pytest.fixture(scope="module")
+def large_frame():
+    # 384 MB of float64, well above the limit used below
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({f"c{i}": rng.random(8_000_000) for i in range(6)})
+
+
+@pytest.fixture
+def executor():
+    executor = Sandbox_Executor(max_workers=1, timeout=120, max_rss_bytes=300 * MB)
+    yield executor
+    executor.shutdown()
+
+
+def test_read_only_job_on_large_input_is_not_killed(executor, large_frame):
+    result = executor.run(READ_ONLY, large_frame, name="summarize")
+    assert result.value == pytest.approx(5 * float(large_frame.to_numpy().sum()))
+
+
+def test_job_copying_large_input_is_killed(executor, large_frame):
+    with pytest.raises(SandboxMemoryError):
+        executor.run(COPY_ALL, large_frame, name="summarize")
+
+
+# Peak resident memory of write_frame in a fresh interpreter; writing "5" to clear_refs resets VmHWM
+# after the frame is built, so the peak covers the write alone
+PEAK_SCRIPT = """
+import sys
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from Data_Science_Agent.ENGINE.Sandbox_Executor import write_frame
+
+def kb(field):
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ":"))
+
+layout, rows, path = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+names = [f"c{i}" for i in range(8)]
+# rows of the transposed array are the frame's columns: one float64 block, built without a second copy
+values = np.random.default_rng(0).random((8, rows))
+if layout == "chunked":
+    part = pa.table({name: column[:rows // 4] for name, column in zip(names, values)})
+    df = pa.concat_tables([part] * 4).to_pandas(types_mapper=pd.ArrowDtype)
+    del values
+else:
+    df = pd.DataFrame(values.T, columns=names, copy=False)
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+before = kb("VmRSS")
+write_frame(df, path)
+print(kb("VmHWM") - before)
+"""
+
+
+# The default 244 MB frame is enough to tell a copy (about the frame's size) from none: the overhead
+# measured is per column, not per row. The 2 GB case reproduces the multi-GB sizes the limit is meant
+# for and runs only with RUN_SLOW_TESTS=1, since it needs about 2 GB of RAM and 2 GB of disk.
+SLOW = pytest.mark.skipif(os.environ.get("RUN_SLOW_TESTS") != "1", reason="set RUN_SLOW_TESTS=1 to run")
+SIZES = [pytest.param(4_000_000, id="244MB"), pytest.param(32_000_000, id="2GB", marks=[pytest.mark.slow, SLOW])]
+
+
+@pytest.mark.parametrize("rows", SIZES)
+@pytest.mark.parametrize("layout", ["numpy", "chunked"])
+def test_write_frame_does_not_copy_numeric_frames(layout, rows, tmp_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", PEAK_SCRIPT, layout, str(rows), str(tmp_path / "frame.arrow")],
+                         cwd=root, env={**os.environ, "PYTHONPATH": root}, capture_output=True, text=True,
+                         check=True)
+    peak_mb = int(out.stdout) / 1024
+    # a full copy would show up as about the frame's size (8 float64 columns)
+    assert peak_mb < 48, f"write_frame peaked {peak_mb:.0f} MB above the {rows * 64 / MB:.0f} MB frame"
+
+
+def test_chunked_frame_round_trips(tmp_path):
+    part = pa.table({"x": [0.0, 1.0, 2.0], "n": [1, 2, 3]})
+    df = pa.concat_tables([part, part]).to_pandas(types_mapper=pd.ArrowDtype)
+    path = str(tmp_path / "frame.arrow")
+    assert write_frame(df, path) == "arrow"
+    pd.testing.assert_frame_equal(read_frame(path, "arrow", zero_copy=True), df)